@@ -1,30 +1,103 @@
+import hashlib
 import os
+import sys
+import tempfile
+import threading
 import pandas as pd
 import mysql.connector as mysql
 from mysql.connector import Error
 
-def DBConnect(dbName=None):
+from db_pool import ConnectionPool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from term_frequencies import TermFrequencies
+
+# connections kept open per database, overridable with TWEETS_DB_POOL_SIZE
+POOL_SIZE = int(os.environ.get("TWEETS_DB_POOL_SIZE", 5))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _connect(dbName=None, allow_local_infile=False):
+    return mysql.connect(host='localhost', user='root', password="",
+                         database=dbName, buffered=True, allow_local_infile=allow_local_infile)
+
+
+def DBConnect(dbName=None, allow_local_infile=False):
     """
 
+    Opens a new connection outside of the pool, prefer get_pool.
+
     Parameters
     ----------
     dbName :
         Default value = None
+    allow_local_infile :
+        allow LOAD DATA LOCAL INFILE on the connection (Default value = False)
 
     Returns
     -------
 
     """
-    conn = mysql.connect(host='localhost', user='root', password="",
-                         database=dbName, buffered=True)
+    conn = _connect(dbName, allow_local_infile)
     cur = conn.cursor()
     return conn, cur
 
+
+def get_pool(dbName=None, allow_local_infile=False, size=None) -> ConnectionPool:
+    """
+
+    Returns the connection pool shared by every helper using the same database,
+    creating it on first use.
+
+    Parameters
+    ----------
+    dbName :
+        Default value = None
+    allow_local_infile :
+        pool of connections allowing LOAD DATA LOCAL INFILE (Default value = False)
+    size :
+        pool size used when the pool is created, defaults to POOL_SIZE (Default value = None)
+
+    Returns
+    -------
+    ConnectionPool
+    """
+    key = (dbName, allow_local_infile)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(lambda: _connect(dbName, allow_local_infile), size or POOL_SIZE,
+                                         validate=lambda conn: conn.is_connected())
+        return _pools[key]
+
+
+def pool_metrics() -> dict:
+    """
+
+    Returns
+    -------
+    metrics of every open pool keyed by database name
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {f"{dbName}{' (local infile)' if infile else ''}": pool.metrics()
+            for (dbName, infile), pool in pools.items()}
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 def emojiDB(dbName: str) -> None:
-    conn, cur = DBConnect(dbName)
-    dbQuery = f"ALTER DATABASE {dbName} CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci;"
-    cur.execute(dbQuery)
-    conn.commit()
+    with get_pool(dbName).cursor() as (conn, cur):
+        dbQuery = f"ALTER DATABASE {dbName} CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci;"
+        cur.execute(dbQuery)
+        conn.commit()
 
 def createDB(dbName: str) -> None:
     """
@@ -38,42 +111,49 @@ def createDB(dbName: str) -> None:
     -------
 
     """
-    conn, cur = DBConnect()
-    cur.execute(f"CREATE DATABASE IF NOT EXISTS {dbName};")
-    conn.commit()
-    cur.close()
+    with get_pool().cursor() as (conn, cur):
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS {dbName};")
+        conn.commit()
 
-def createTables(dbName: str) -> None:
+def createTables(dbName: str, sqlFile: str = 'day5_schema.sql') -> None:
     """
 
+    Runs the statements of a sql file, the schema by default or a file from migrations/.
+
     Parameters
     ----------
     dbName :
         str
+    sqlFile :
+        str (Default value = 'day5_schema.sql')
 
     Returns
     -------
 
     """
-    conn, cur = DBConnect(dbName)
-    sqlFile = 'day5_schema.sql'
     fd = open(sqlFile, 'r')
     readSqlFile = fd.read()
     fd.close()
 
-    sqlCommands = readSqlFile.split(';')
+    sqlCommands = [command for command in readSqlFile.split(';') if command.strip()]
 
-    for command in sqlCommands:
-        try:
-            res = cur.execute(command)
-        except Exception as ex:
-            print("Command skipped: ", command)
-            print(ex)
-    conn.commit()
-    cur.close()
+    with get_pool(dbName).cursor() as (conn, cur):
+        for command in sqlCommands:
+            try:
+                res = cur.execute(command)
+            except Exception as ex:
+                print("Command skipped: ", command)
+                print(ex)
+        conn.commit()
 
     return
 
+# possibly_sensitive values as read from the extractor or the processed csv
+SENSITIVITY_VALUES = {True: 1, False: 0, "True": 1, "False": 0}
+# bounded VARCHAR columns of the tweet table, keyed by their name in the processed csv
+VARCHAR_LENGTHS = {"source": 200, "lang": 8, "original_author": 50, "place": 255}
+
+
 def preprocess_df(df: pd.DataFrame) -> pd.DataFrame:
     """
 
@@ -88,18 +168,209 @@ def preprocess_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     cols_2_drop = ['original_text']
     try:
-        df = df.drop(columns=cols_2_drop, axis=1)
-        values={"hashtags": "", "user_mentions": ""}
+        df = df.drop(columns=cols_2_drop)
+        # categoricals from get_tweet_df can't be filled with values outside their categories
+        df = df.astype({column: object for column, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)})
+        # unknown sensitivity is stored as NULL rather than filled with 0
+        sensitive = df["possibly_sensitive"].map(SENSITIVITY_VALUES).astype("Int8")
+        # only the counts and the entity lists get a value, the other missing values are stored as NULL
+        values = {"hashtags": "", "user_mentions": "", **{column: 0 for column in UPSERT_COLUMNS}}
         df = df.fillna(value=values)
-        df = df.fillna(0)
+        df["possibly_sensitive"] = sensitive
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True).dt.strftime("%Y-%m-%d %H:%M:%S")
+        for column, length in VARCHAR_LENGTHS.items():
+            df[column] = df[column].astype(str).str.slice(0, length).where(df[column].notna())
     except KeyError as e:
         print("Error:", e)
 
     return df
 
 
-def insert_to_tweet_table(dbName: str, df: pd.DataFrame, table_name: str) -> None:
+# columns of the tweet table in the order of the processed csv once original_text is dropped
+TWEET_COLUMNS = ["created_at", "source", "clean_text", "sentiment", "polarity", "subjectivity", "language",
+                 "favorite_count", "retweet_count", "original_author", "followers_count", "friends_count",
+                 "possibly_sensitive", "hashtags", "user_mentions", "place"]
+# counts that keep changing after a tweet was first loaded, refreshed on upsert
+UPSERT_COLUMNS = ["favorite_count", "retweet_count", "followers_count", "friends_count"]
+# columns preprocess_df leaves missing, loaded as NULL
+NULLABLE_COLUMNS = ["clean_text", "sentiment", "polarity", "subjectivity", "language", "original_author",
+                    "possibly_sensitive", "place"]
+WATERMARK_TABLE = "IngestWatermark"
+# normalized link tables filled from the space separated entity columns: column -> (table, entity column, max length)
+LINK_TABLES = {"hashtags": ("TweetHashtag", "hashtag", 140), "user_mentions": ("TweetMention", "mention", 50)}
+# summary tables read by the dashboard charts, refreshed by refresh_rollups after every load.
+# unknown sentiment is stored as '' and unknown sensitivity as -1 so that they can be part of the keys
+HOURLY_ROLLUP = "TweetRollupHourly"
+AUTHOR_ROLLUP = "TweetAuthorRollup"
+# keyword of DataFrame.to_csv setting the line terminator, renamed in pandas 1.5 and the old name dropped in 2.0
+LINE_TERMINATOR = "lineterminator" if tuple(int(v) for v in pd.__version__.split(".")[:2]) >= (1, 5) else "line_terminator"
+
+
+def tweet_key(created_at: str, original_author: str, clean_text: str) -> str:
+    """
+
+    Natural key of a tweet: the same author can't post the same text twice in
+    the same second, so the sha1 of the three identifies a tweet across loads.
+
+    Returns
+    -------
+    40 character hex digest
     """
+    value = f"{created_at}\x1f{original_author}\x1f{clean_text}"
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def tweet_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+
+    Preprocesses a processed tweets dataframe into the columns of the tweet
+    table followed by the tweet_key column.
+
+    Parameters
+    ----------
+    df :
+        pd.DataFrame
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    df = preprocess_df(df).iloc[:, :len(TWEET_COLUMNS)].copy()
+    df.columns = TWEET_COLUMNS
+    # a missing author or text is hashed as an empty string, as migration 001 does
+    df["tweet_key"] = [tweet_key(*values) for values in
+                       zip(df["created_at"].astype(str), df["original_author"].fillna("").astype(str),
+                           df["clean_text"].fillna("").astype(str))]
+    return df
+
+
+def _insert_rows(conn, cur, sqlQuery: str, rows: list) -> list:
+    """
+
+    Inserts a batch of rows in one transaction with executemany. When the batch
+    fails it is rolled back and the rows are inserted one by one so that only
+    the failing rows are left out.
+
+    Parameters
+    ----------
+    conn :
+        mysql connection
+    cur :
+        cursor of conn
+    sqlQuery :
+        str
+    rows :
+        list of tuples
+
+    Returns
+    -------
+    list of (row, error) tuples for the rows that could not be inserted
+    """
+    try:
+        cur.executemany(sqlQuery, rows)
+        conn.commit()
+        return []
+    except Exception:
+        conn.rollback()
+
+    rejected = []
+    for row in rows:
+        try:
+            cur.execute(sqlQuery, row)
+        except Exception as e:
+            rejected.append((row, str(e)))
+    conn.commit()
+    return rejected
+
+
+def _insert_links(conn, cur, table_name: str, rows: list) -> None:
+    """
+
+    Fills the hashtag and mention link tables for rows already in table_name,
+    looking their ids up by tweet_key. Existing links are left alone.
+
+    Parameters
+    ----------
+    conn :
+        mysql connection
+    cur :
+        cursor of conn
+    table_name :
+        str
+    rows :
+        list of tuples in TWEET_COLUMNS order followed by the tweet_key
+    """
+    keys = list({row[-1] for row in rows})
+    ids = {}
+    for start in range(0, len(keys), 1000):
+        batch = keys[start:start + 1000]
+        cur.execute(f"SELECT tweet_key, id FROM {table_name} WHERE tweet_key IN ({', '.join(['%s'] * len(batch))});", batch)
+        ids.update(cur.fetchall())
+
+    for column, (link_table, link_column, length) in LINK_TABLES.items():
+        index = TWEET_COLUMNS.index(column)
+        links = {(ids[row[-1]], entity[:length]) for row in rows if row[-1] in ids
+                 for entity in str(row[index] or "").split()}
+        if links:
+            cur.executemany(f"INSERT IGNORE INTO {link_table} (tweet_id, {link_column}) VALUES (%s, %s);", sorted(links))
+    conn.commit()
+
+
+def _write_rejects(reject_file: str, rejected: list) -> None:
+    rejects = pd.DataFrame([row for row, _ in rejected], columns=TWEET_COLUMNS + ["tweet_key"])
+    rejects["error"] = [error for _, error in rejected]
+    write_header = not os.path.exists(reject_file)
+    rejects.to_csv(reject_file, mode="a", header=write_header, index=False)
+
+
+def _upsert_tweets(dbName: str, df: pd.DataFrame, table_name: str, batch_size: int, link_entities: bool) -> tuple:
+    """
+
+    Upserts the tweets of df batch by batch, see insert_to_tweet_table.
+
+    Returns
+    -------
+    number of inserted rows and the list of (row, error) tuples of the rejected rows
+    """
+    df = tweet_rows(df)
+    # object dtype turns numpy scalars into python values the connector accepts
+    df = df.astype(object)
+    df = df.where(df.notna(), None)
+    rows = list(df.itertuples(index=False, name=None))
+
+    columns = TWEET_COLUMNS + ["tweet_key"]
+    sqlQuery = f"""INSERT INTO {table_name} ({", ".join(columns)})
+             VALUES({", ".join(["%s"] * len(columns))})
+             ON DUPLICATE KEY UPDATE {", ".join(f"{c} = VALUES({c})" for c in UPSERT_COLUMNS)};"""
+
+    rejected = []
+    with get_pool(dbName).cursor() as (conn, cur):
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            rejected += _insert_rows(conn, cur, sqlQuery, batch)
+            if link_entities:
+                _insert_links(conn, cur, table_name, batch)
+
+    return len(rows) - len(rejected), rejected
+
+
+def _refresh_loaded_rollups(dbName: str, table_name: str, df: pd.DataFrame) -> None:
+    """
+
+    Refreshes the rollups the tweets of df fall into, from the oldest one on.
+    """
+    created_at = pd.to_datetime(df["created_at"], utc=True)
+    if created_at.notna().any():
+        refresh_rollups(dbName, table_name, created_at.min())
+
+
+def insert_to_tweet_table(dbName: str, df: pd.DataFrame, table_name: str, batch_size: int = 1000,
+                          reject_file: str = "rejected_rows.csv", link_entities: bool = True) -> tuple:
+    """
+
+    Upserts the tweets on their tweet_key, so loading the same rows twice
+    only refreshes their counts, fills the hashtag and mention link tables
+    and refreshes the rollups from the oldest loaded tweet on.
 
     Parameters
     ----------
@@ -109,32 +380,228 @@ def insert_to_tweet_table(dbName: str, df: pd.DataFrame, table_name: str) -> Non
         pd.DataFrame
     table_name :
         str
+    batch_size :
+        number of rows sent with one executemany and committed together (Default value = 1000)
+    reject_file :
+        csv file the rows that fail to insert are appended to (Default value = "rejected_rows.csv")
+    link_entities :
+        fill the TweetHashtag and TweetMention link tables (Default value = True)
 
     Returns
     -------
+    number of inserted rows and number of rejected rows
+    """
+    inserted, rejected = _upsert_tweets(dbName, df, table_name, batch_size, link_entities)
+    _refresh_loaded_rollups(dbName, table_name, df)
+    if rejected and reject_file:
+        _write_rejects(reject_file, rejected)
+    print(f"{inserted} rows inserted into {table_name}, {len(rejected)} rejected")
+
+    return inserted, len(rejected)
+
 
+def load_tweet_table_infile(dbName: str, df: pd.DataFrame, table_name: str,
+                            reject_file: str = "rejected_rows.csv", link_entities: bool = True) -> tuple:
     """
-    conn, cur = DBConnect(dbName)
 
-    df = preprocess_df(df)
+    Fast path for large loads: writes the preprocessed dataframe to a temporary
+    csv file and loads it with LOAD DATA LOCAL INFILE. The server has to allow
+    local_infile. Rows the server skips, including tweets already in the
+    table, are reported as warnings, which are appended to the reject file.
+    The rollups are refreshed from the oldest loaded tweet on.
 
-    for _, row in df.iterrows():
-        sqlQuery = f"""INSERT INTO {table_name} (created_at, source, clean_text, sentiment, polarity, subjectivity, language,
-                    favorite_count, retweet_count, original_author, followers_count, friends_count, possibly_sensitive, hashtags, user_mentions, place)
-             VALUES(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);"""
-        data = (row[0], row[1], row[2], row[3], (row[4]), (row[5]), row[6], row[7], row[8], row[9], row[10], row[11],
-                row[12], row[13], row[14], row[15])
+    Parameters
+    ----------
+    dbName :
+        str
+    df :
+        pd.DataFrame
+    table_name :
+        str
+    reject_file :
+        csv file the load warnings are appended to (Default value = "rejected_rows.csv")
+    link_entities :
+        fill the TweetHashtag and TweetMention link tables (Default value = True)
 
-        try:
-            # Execute the SQL command
-            cur.execute(sqlQuery, data)
-            # Commit your changes in the database
+    Returns
+    -------
+    number of loaded rows and number of warnings
+    """
+    df = tweet_rows(df)
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        # LINES TERMINATED BY '\n' below, whatever the platform's line separator
+        df.to_csv(csv_path, index=False, header=False, **{LINE_TERMINATOR: "\n"})
+        # missing values are written as empty fields and loaded as NULL
+        load_columns = [f"@{c}" if c in NULLABLE_COLUMNS else c for c in TWEET_COLUMNS + ["tweet_key"]]
+        set_nulls = ", ".join(f"{c} = NULLIF(@{c}, '')" for c in NULLABLE_COLUMNS)
+        sqlQuery = f"""LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} CHARACTER SET utf8mb4
+                 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                 LINES TERMINATED BY '\\n' ({", ".join(load_columns)})
+                 SET {set_nulls};"""
+        with get_pool(dbName, allow_local_infile=True).cursor() as (conn, cur):
+            cur.execute(sqlQuery, (csv_path,))
+            loaded = cur.rowcount
+            cur.execute("SHOW WARNINGS")
+            warnings = cur.fetchall()
             conn.commit()
-            print("Data Inserted Successfully")
-        except Exception as e:
-            conn.rollback()
-            print("Error: ", e)
-    return
+            if link_entities:
+                rows = list(df.astype(object).itertuples(index=False, name=None))
+                for start in range(0, len(rows), 1000):
+                    _insert_links(conn, cur, table_name, rows[start:start + 1000])
+    finally:
+        os.remove(csv_path)
+    _refresh_loaded_rollups(dbName, table_name, df)
+
+    if warnings and reject_file:
+        pd.DataFrame(warnings, columns=["level", "code", "message"]).to_csv(
+            reject_file, mode="a", header=not os.path.exists(reject_file), index=False)
+    print(f"{loaded} rows loaded into {table_name}, {len(warnings)} warnings")
+
+    return loaded, len(warnings)
+
+
+def get_watermark(dbName: str, table_name: str):
+    """
+
+    Returns
+    -------
+    created_at of the newest tweet loaded into table_name as a utc pd.Timestamp,
+    None before the first incremental load
+    """
+    with get_pool(dbName).cursor() as (conn, cur):
+        cur.execute(f"SELECT high_water_mark FROM {WATERMARK_TABLE} WHERE table_name = %s;", (table_name,))
+        row = cur.fetchone()
+    return pd.Timestamp(row[0], tz="UTC") if row else None
+
+
+def set_watermark(dbName: str, table_name: str, watermark: pd.Timestamp) -> None:
+    """
+
+    Moves the high-water mark of table_name forward, it never goes back.
+    """
+    value = watermark.tz_convert("UTC").tz_localize(None).to_pydatetime()
+    with get_pool(dbName).cursor() as (conn, cur):
+        cur.execute(f"""INSERT INTO {WATERMARK_TABLE} (table_name, high_water_mark) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE high_water_mark = GREATEST(high_water_mark, VALUES(high_water_mark));""",
+                    (table_name, value))
+        conn.commit()
+
+
+def refresh_rollups(dbName: str, table_name: str, since: pd.Timestamp = None) -> None:
+    """
+
+    Recomputes the rollup rows that tweets created at or after `since` fall
+    into: the hours from the one holding `since` on, and every author who
+    tweeted since then. Those tweets may have been inserted or had their
+    counts upserted, so their groups are rebuilt from table_name rather than
+    incremented. Without `since` the rollups are rebuilt from scratch.
+
+    Parameters
+    ----------
+    dbName :
+        str
+    table_name :
+        str
+    since :
+        Default value = None
+    """
+    if since is None:
+        hour_params, author_params = None, None
+    else:
+        since = since.tz_convert("UTC").tz_localize(None)
+        hour_params, author_params = (since.floor("h").to_pydatetime(),), (since.to_pydatetime(),)
+    hour_where = "" if since is None else "WHERE hour >= %s"
+    created_where = "" if since is None else "WHERE created_at >= %s"
+    author_where = "" if since is None else f"WHERE original_author IN (SELECT original_author FROM {table_name} WHERE created_at >= %s)"
+    statements = [
+        (f"DELETE FROM {HOURLY_ROLLUP} {hour_where};", hour_params),
+        (f"""INSERT INTO {HOURLY_ROLLUP} (hour, source, sentiment, possibly_sensitive, tweet_count,
+                                          favorite_count, retweet_count, friends_count)
+             SELECT TIMESTAMP(DATE(created_at), MAKETIME(HOUR(created_at), 0, 0)), source, COALESCE(sentiment, ''),
+                    COALESCE(possibly_sensitive, -1), COUNT(*), COALESCE(SUM(favorite_count), 0),
+                    COALESCE(SUM(retweet_count), 0), COALESCE(SUM(friends_count), 0)
+             FROM {table_name} {created_where}
+             GROUP BY 1, 2, 3, 4;""", hour_params),
+        (f"DELETE FROM {AUTHOR_ROLLUP} {author_where};", author_params),
+        (f"""INSERT INTO {AUTHOR_ROLLUP} (original_author, sentiment, tweet_count, retweet_count)
+             SELECT COALESCE(original_author, ''), COALESCE(sentiment, ''), COUNT(*), COALESCE(SUM(retweet_count), 0)
+             FROM {table_name} {author_where}
+             GROUP BY 1, 2;""", author_params),
+    ]
+    with get_pool(dbName).cursor() as (conn, cur):
+        for query, query_params in statements:
+            cur.execute(query, query_params)
+        conn.commit()
+
+
+def ingest_incremental(dbName: str, df: pd.DataFrame, table_name: str, batch_size: int = 1000,
+                       reject_file: str = "rejected_rows.csv", frequencies_file: str = None) -> tuple:
+    """
+
+    Loads only the tweets created at or after the table's high-water mark,
+    refreshes the rollups they fall into, then moves the mark to the newest
+    created_at. Tweets from the watermark second itself are upserted again,
+    which leaves them unchanged, so re-running on the same file is a no-op and
+    each run costs time proportional to the new tweets. When rows are
+    rejected the mark stops short of the oldest of them, so that the next run
+    tries them again.
+
+    Parameters
+    ----------
+    dbName :
+        str
+    df :
+        pd.DataFrame
+    table_name :
+        str
+    batch_size :
+        Default value = 1000
+    reject_file :
+        Default value = "rejected_rows.csv"
+    frequencies_file :
+        json file of the dashboard's TermFrequencies, updated with the tweets
+        between the old and the new watermark once the new one is stored, so
+        that a failed run doesn't count them twice (Default value = None)
+
+    Returns
+    -------
+    number of inserted rows and number of rejected rows
+    """
+    created_at = pd.to_datetime(df["created_at"], utc=True)
+    watermark = get_watermark(dbName, table_name)
+    if watermark is not None:
+        df = df[(created_at >= watermark).to_numpy()]
+        created_at = created_at[created_at >= watermark]
+    if df.empty:
+        print(f"{table_name} is up to date")
+        return 0, 0
+
+    inserted, rejected = _upsert_tweets(dbName, df, table_name, batch_size, link_entities=True)
+    if rejected and reject_file:
+        _write_rejects(reject_file, rejected)
+    print(f"{inserted} rows inserted into {table_name}, {len(rejected)} rejected")
+
+    watermark_to = created_at.max()
+    rejected_at = pd.to_datetime(pd.Series([row[0] for row, _ in rejected], dtype=object), utc=True).dropna()
+    if len(rejected_at):
+        # the next run loads from the mark on, so it has to stay below the rejected rows
+        watermark_to = min(watermark_to, rejected_at.min() - pd.Timedelta(seconds=1))
+
+    refresh_rollups(dbName, table_name, None if watermark is None else created_at.min())
+    set_watermark(dbName, table_name, watermark_to)
+    if frequencies_file:
+        # the tweets up to the watermark second were counted by the previous run, those after the new mark
+        # are left to the next one
+        counted = created_at <= watermark_to
+        if watermark is not None:
+            counted &= created_at > watermark
+        term_frequencies = TermFrequencies.load(frequencies_file) if os.path.exists(frequencies_file) else TermFrequencies()
+        term_frequencies.update_df(df[counted.to_numpy()])
+        term_frequencies.save(frequencies_file)
+
+    return inserted, len(rejected)
 
 def db_execute_fetch(*args, many=False, tablename='', rdf=True, **kwargs) -> pd.DataFrame:
     """
@@ -156,25 +623,22 @@ def db_execute_fetch(*args, many=False, tablename='', rdf=True, **kwargs) -> pd.
     -------
 
     """
-    connection, cursor1 = DBConnect(**kwargs)
-    if many:
-        cursor1.executemany(*args)
-    else:
-        cursor1.execute(*args)
-
-    # get column names
-    field_names = [i[0] for i in cursor1.description]
+    with get_pool(**kwargs).cursor() as (connection, cursor1):
+        if many:
+            cursor1.executemany(*args)
+        else:
+            cursor1.execute(*args)
 
-    # get column values
-    res = cursor1.fetchall()
+        # get column names
+        field_names = [i[0] for i in cursor1.description]
 
-    # get row count and show info
-    nrow = cursor1.rowcount
-    if tablename:
-        print(f"{nrow} records fetched from {tablename} table")
+        # get column values
+        res = cursor1.fetchall()
 
-    cursor1.close()
-    connection.close()
+        # get row count and show info
+        nrow = cursor1.rowcount
+        if tablename:
+            print(f"{nrow} records fetched from {tablename} table")
 
     # return result
     if rdf:
@@ -188,6 +652,7 @@ if __name__ == "__main__":
     emojiDB(dbName='tweets')
     createTables(dbName='tweets')
 
-    df = pd.read_csv('../data/processed_tweets.csv')
+    df = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else '../data/processed_tweets.csv')
 
-    insert_to_tweet_table(dbName='tweets', df=df, table_name='TweetInformation')
+    ingest_incremental(dbName='tweets', df=df, table_name='TweetInformation',
+                       frequencies_file=os.environ.get("TWEETS_TERM_FREQUENCIES", "term_frequencies.json"))
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+
+from add_data import AUTHOR_ROLLUP, HOURLY_ROLLUP, db_execute_fetch
+
+DB_NAME = "tweets"
+TABLE = "TweetInformation"
+# sidebar filters that map straight to a column of the tweet table
+FILTER_COLUMNS = ["place", "source", "language", "sentiment", "possibly_sensitive"]
+DISPLAY_COLUMNS = ["created_at", "source", "clean_text", "sentiment", "polarity", "subjectivity", "language",
+                   "favorite_count", "retweet_count", "original_author", "followers_count", "friends_count",
+                   "possibly_sensitive", "hashtags", "user_mentions", "place"]
+SENSITIVITY_LABELS = {1: "True", 0: "False"}
+# columns profiling samples are stratified on, so that rare sentiments and sensitivities stay represented
+SAMPLE_STRATA = ["sentiment", "possibly_sensitive"]
+# the charts group by these columns, each read from the smallest rollup holding it
+ROLLUP_TABLES = {"original_author": AUTHOR_ROLLUP, "source": HOURLY_ROLLUP}
+
+
+def _fetch(query: str, params: tuple = ()) -> pd.DataFrame:
+    return db_execute_fetch(query, params, dbName=DB_NAME, rdf=True)
+
+
+def label_sensitivity(df: pd.DataFrame) -> pd.DataFrame:
+    """
+
+    Turns the 1/0/NULL possibly_sensitive column into True/False/unknown labels,
+    so charts treat it as a category rather than a number.
+    """
+    if "possibly_sensitive" in df.columns:
+        df["possibly_sensitive"] = df["possibly_sensitive"].map(SENSITIVITY_LABELS).fillna("unknown")
+    return df
+
+
+def build_where(filters: dict) -> tuple:
+    """
+
+    Builds a parameterized WHERE clause from the sidebar filters.
+
+    Parameters
+    ----------
+    filters :
+        dict mapping a FILTER_COLUMNS column or "hashtags" to the list of accepted
+        values, empty lists are ignored. A tweet matches the hashtags filter when
+        it has any of them, looked up in the TweetHashtag link table.
+
+    Returns
+    -------
+    the clause (empty without filters) and its parameters
+    """
+    clauses, params = [], []
+    for column, values in (filters or {}).items():
+        if not values:
+            continue
+        placeholders = ", ".join(["%s"] * len(values))
+        if column == "hashtags":
+            clauses.append(f"EXISTS (SELECT 1 FROM TweetHashtag h WHERE h.tweet_id = t.id AND h.hashtag IN ({placeholders}))")
+        elif column in FILTER_COLUMNS:
+            clauses.append(f"t.{column} IN ({placeholders})")
+        else:
+            raise ValueError(f"can't filter on {column}")
+        params.extend(values)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, tuple(params)
+
+
+def fetch_tweets(filters: dict = None, columns: list = DISPLAY_COLUMNS, limit: int = 1000) -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    the newest `limit` tweets matching the filters, with the given columns only
+    """
+    where, params = build_where(filters)
+    query = f"SELECT {', '.join(f't.{c}' for c in columns)} FROM {TABLE} t {where} ORDER BY t.created_at DESC LIMIT %s"
+    return label_sensitivity(_fetch(query, params + (limit,)))
+
+
+def count_tweets(filters: dict = None) -> int:
+    where, params = build_where(filters)
+    return int(_fetch(f"SELECT COUNT(*) AS n FROM {TABLE} t {where}", params)["n"][0])
+
+
+def filter_options(column: str, limit: int = 500) -> list:
+    """
+
+    Returns
+    -------
+    the `limit` most frequent values of a FILTER_COLUMNS column, or of the
+    hashtags when column is "hashtags"
+    """
+    if column == "hashtags":
+        query = "SELECT hashtag AS value FROM TweetHashtag GROUP BY hashtag ORDER BY COUNT(*) DESC LIMIT %s"
+    elif column in FILTER_COLUMNS:
+        query = f"SELECT {column} AS value FROM {TABLE} WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY COUNT(*) DESC LIMIT %s"
+    else:
+        raise ValueError(f"no options for {column}")
+    return _fetch(query, (limit,))["value"].tolist()
+
+
+def sentiment_sensitivity_totals() -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    tweet count and total friends_count per sentiment and sensitivity
+    """
+    query = f"""SELECT NULLIF(sentiment, '') AS sentiment, possibly_sensitive, CAST(SUM(tweet_count) AS SIGNED) AS tweet_count,
+                       CAST(SUM(friends_count) AS SIGNED) AS friends_count
+                FROM {HOURLY_ROLLUP} GROUP BY sentiment, possibly_sensitive"""
+    return label_sensitivity(_fetch(query))
+
+
+def author_tweet_counts(min_count: int = 5) -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    tweet count per original author, authors with fewer than min_count
+    tweets are summed up as "Other authors"
+    """
+    query = f"""SELECT IF(c < %s, 'Other authors', original_author) AS original_author, CAST(SUM(c) AS SIGNED) AS Tweet_count
+                FROM (SELECT original_author, SUM(tweet_count) AS c FROM {AUTHOR_ROLLUP} GROUP BY original_author) a
+                GROUP BY 1 ORDER BY Tweet_count DESC"""
+    return _fetch(query, (min_count,))
+
+
+def top_retweets_by(column: str, n: int) -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    total retweet_count per sentiment for the n values of column
+    (original_author or source) with the most tweets
+    """
+    if column not in ROLLUP_TABLES:
+        raise ValueError(f"can't group retweets by {column}")
+    table = ROLLUP_TABLES[column]
+    query = f"""SELECT r.{column}, NULLIF(r.sentiment, '') AS sentiment, CAST(SUM(r.retweet_count) AS SIGNED) AS retweet_count
+                FROM {table} r
+                JOIN (SELECT {column} FROM {table} GROUP BY {column} ORDER BY SUM(tweet_count) DESC LIMIT %s) top
+                  ON top.{column} = r.{column}
+                GROUP BY r.{column}, r.sentiment"""
+    return _fetch(query, (n,))
+
+
+def top_sources_friends(n: int = 3) -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    total friends_count per sentiment and sensitivity for the n sources with the most tweets
+    """
+    query = f"""SELECT r.source, NULLIF(r.sentiment, '') AS sentiment, r.possibly_sensitive, CAST(SUM(r.friends_count) AS SIGNED) AS friends_count
+                FROM {HOURLY_ROLLUP} r
+                JOIN (SELECT source FROM {HOURLY_ROLLUP} GROUP BY source ORDER BY SUM(tweet_count) DESC LIMIT %s) top
+                  ON top.source = r.source
+                GROUP BY r.source, r.sentiment, r.possibly_sensitive"""
+    return label_sensitivity(_fetch(query, (n,)))
+
+
+def allocate_sample(counts: pd.Series, n: int) -> pd.Series:
+    """
+
+    Splits n sampled rows between strata in proportion to their sizes. Every
+    non empty stratum gets at least one row while n allows it, and the rows
+    left over by rounding go to the largest remainders.
+
+    Parameters
+    ----------
+    counts :
+        pd.Series of rows per stratum
+    n :
+        int
+
+    Returns
+    -------
+    rows to sample per stratum, never more than the stratum holds
+    """
+    counts = counts[counts > 0]
+    if counts.sum() <= n:
+        return counts.copy()
+    quota = counts * n / counts.sum()
+    allocation = np.floor(quota).astype(int)
+    if n >= len(counts):
+        allocation = allocation.clip(lower=1)
+    remaining = n - allocation.sum()
+    if remaining > 0:
+        allocation[(quota - allocation).sort_values(ascending=False, kind="stable").index[:remaining]] += 1
+    while remaining < 0:
+        # the strata raised to one row are paid for by the largest ones
+        allocation[allocation.idxmax()] -= 1
+        remaining += 1
+    return allocation.clip(upper=counts)
+
+
+def stratified_sample(df: pd.DataFrame, n: int, strata: list = SAMPLE_STRATA, seed: int = 0) -> pd.DataFrame:
+    """
+
+    Returns
+    -------
+    about n rows of df sampled within each combination of the strata columns,
+    in proportion to its size
+    """
+    groups = df.groupby(strata, dropna=False, sort=False)
+    allocation = allocate_sample(groups.size(), n)
+    parts = [groups.get_group(key).sample(k, random_state=seed) for key, k in allocation.items() if k > 0]
+    return pd.concat(parts, ignore_index=True) if parts else df.head(0)
+
+
+def sample_tweets(n: int, seed: int = 0, columns: list = DISPLAY_COLUMNS) -> pd.DataFrame:
+    """
+
+    Samples about n tweets stratified by sentiment and sensitivity in a single
+    scan of the tweet table. The strata sizes come from the hourly rollup, each
+    row is kept with its stratum's sampling rate plus a margin, and the exact
+    allocation is drawn from those rows.
+
+    Returns
+    -------
+    the sampled tweets with the given columns
+    """
+    counts = _fetch(f"""SELECT NULLIF(sentiment, '') AS sentiment, NULLIF(possibly_sensitive, -1) AS possibly_sensitive,
+                               CAST(SUM(tweet_count) AS SIGNED) AS n
+                        FROM {HOURLY_ROLLUP} GROUP BY 1, 2""")
+    counts = counts.set_index(SAMPLE_STRATA)["n"]
+    counts = counts[counts > 0]
+    allocation = allocate_sample(counts, n)
+    if allocation.empty:
+        return pd.DataFrame(columns=columns)
+
+    cases, params = [], []
+    for (sentiment, sensitive), k, size in zip(allocation.index, allocation.to_numpy(), counts.to_numpy()):
+        cases.append("WHEN t.sentiment <=> %s AND t.possibly_sensitive <=> %s THEN %s")
+        params += [None if pd.isna(sentiment) else sentiment, None if pd.isna(sensitive) else int(sensitive),
+                   min(1.0, 1.2 * k / size)]
+    query = f"""SELECT {', '.join(f't.{c}' for c in columns)} FROM {TABLE} t
+                WHERE RAND(%s) < CASE {' '.join(cases)} ELSE 0 END"""
+    df = _fetch(query, (seed, *params))
+    df = stratified_sample(df, int(allocation.sum()), seed=seed) if len(df) > allocation.sum() else df
+    return label_sensitivity(df)
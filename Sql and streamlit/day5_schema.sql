@@ -1,24 +1,84 @@
-DROP TABLE IF EXISTS `TweetInformation`;
-
 CREATE TABLE IF NOT EXISTS `TweetInformation`
 (
-    `id` INT NOT NULL AUTO_INCREMENT,
-    `created_at` TEXT NOT NULL,
+    `id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+    `created_at` DATETIME NOT NULL,
     `source` VARCHAR(200) NOT NULL,
     `clean_text` TEXT DEFAULT NULL,
-    `sentiment` TEXT DEFAULT NULL,
+    `sentiment` ENUM('negative', 'neutral', 'positive') DEFAULT NULL,
     `polarity` FLOAT DEFAULT NULL,
     `subjectivity` FLOAT DEFAULT NULL,
-    `language` TEXT DEFAULT NULL,
-    `favorite_count` INT DEFAULT NULL,
-    `retweet_count` INT DEFAULT NULL,
-    `original_author` TEXT DEFAULT NULL,
-    `followers_count` INT DEFAULT NULL,
-    `friends_count` INT DEFAULT NULL,
-    `possibly_sensitive` TEXT DEFAULT NULL,
+    `language` VARCHAR(8) DEFAULT NULL,
+    `favorite_count` INT UNSIGNED DEFAULT NULL,
+    `retweet_count` INT UNSIGNED DEFAULT NULL,
+    `original_author` VARCHAR(50) DEFAULT NULL,
+    `followers_count` INT UNSIGNED DEFAULT NULL,
+    `friends_count` INT UNSIGNED DEFAULT NULL,
+    `possibly_sensitive` TINYINT(1) DEFAULT NULL,
     `hashtags` TEXT DEFAULT NULL,
     `user_mentions` TEXT DEFAULT NULL,
-    `place` TEXT DEFAULT NULL,
-    PRIMARY KEY (`id`)
+    `place` VARCHAR(255) DEFAULT NULL,
+    `tweet_key` CHAR(40) NOT NULL,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_tweet_key` (`tweet_key`),
+    KEY `idx_created_at` (`created_at`),
+    KEY `idx_sentiment_sensitive` (`sentiment`, `possibly_sensitive`),
+    KEY `idx_language` (`language`),
+    KEY `idx_source` (`source`),
+    KEY `idx_original_author` (`original_author`),
+    KEY `idx_place` (`place`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetHashtag`
+(
+    `hashtag` VARCHAR(140) NOT NULL,
+    `tweet_id` INT UNSIGNED NOT NULL,
+    PRIMARY KEY (`hashtag`, `tweet_id`),
+    KEY `idx_tweet_id` (`tweet_id`),
+    CONSTRAINT `fk_hashtag_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `TweetInformation` (`id`) ON DELETE CASCADE
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetMention`
+(
+    `mention` VARCHAR(50) NOT NULL,
+    `tweet_id` INT UNSIGNED NOT NULL,
+    PRIMARY KEY (`mention`, `tweet_id`),
+    KEY `idx_tweet_id` (`tweet_id`),
+    CONSTRAINT `fk_mention_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `TweetInformation` (`id`) ON DELETE CASCADE
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `IngestWatermark`
+(
+    `table_name` VARCHAR(64) NOT NULL,
+    `high_water_mark` DATETIME NOT NULL,
+    `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`table_name`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetRollupHourly`
+(
+    `hour` DATETIME NOT NULL,
+    `source` VARCHAR(200) NOT NULL,
+    `sentiment` VARCHAR(8) NOT NULL,
+    `possibly_sensitive` TINYINT NOT NULL,
+    `tweet_count` INT UNSIGNED NOT NULL,
+    `favorite_count` BIGINT UNSIGNED NOT NULL,
+    `retweet_count` BIGINT UNSIGNED NOT NULL,
+    `friends_count` BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (`hour`, `source`, `sentiment`, `possibly_sensitive`),
+    KEY `idx_source` (`source`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetAuthorRollup`
+(
+    `original_author` VARCHAR(50) NOT NULL,
+    `sentiment` VARCHAR(8) NOT NULL,
+    `tweet_count` INT UNSIGNED NOT NULL,
+    `retweet_count` BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (`original_author`, `sentiment`)
 )
 ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
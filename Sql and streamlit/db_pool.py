@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    A small thread safe pool of DB-API connections.
+
+    Connections are created lazily with `connect` up to `size` of them and
+    handed out with the `connection` and `cursor` context managers, which
+    give them back to the pool when the block exits. The pool doesn't import
+    any driver, so the same code runs on mysql.connector in production and on
+    sqlite3 in the tests.
+
+    Parameters
+    ----------
+    connect :
+        callable returning a new DB-API connection
+    size :
+        maximum number of open connections (Default value = 5)
+    timeout :
+        seconds to wait for a free connection before raising, None waits forever (Default value = 30)
+    validate :
+        optional callable telling whether an idle connection is still usable (Default value = None)
+    """
+
+    def __init__(self, connect, size: int = 5, timeout: float = 30, validate=None):
+        if size < 1:
+            raise ValueError("size must be a positive integer")
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._validate = validate
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self._stats = {"acquired": 0, "released": 0, "created": 0, "discarded": 0, "waits": 0, "wait_time": 0.0}
+
+    def _count(self, name: str, value=1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _new_connection(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        self._count("created")
+        return conn
+
+    def _discard(self, conn) -> None:
+        with self._lock:
+            self._created -= 1
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+
+        Returns an idle connection, opens a new one while the pool is below its
+        size, or waits for another thread to release one.
+
+        Returns
+        -------
+        a DB-API connection that must be given back with release
+        """
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    conn = self._new_connection()
+                    break
+                start = time.perf_counter()
+                self._count("waits")
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"no free connection after {self.timeout} seconds") from None
+                finally:
+                    self._count("wait_time", time.perf_counter() - start)
+
+            if self._validate is None or self._validate(conn):
+                break
+            self._discard(conn)
+
+        self._count("acquired")
+        return conn
+
+    def release(self, conn, broken: bool = False) -> None:
+        """
+
+        Gives a connection back to the pool, broken connections are closed.
+        The transaction left open on the connection is rolled back first, so
+        work that wasn't committed is dropped as closing the connection would,
+        and the next user doesn't read from the snapshot of a finished read
+        (REPEATABLE READ keeps one per transaction in mysql).
+
+        Parameters
+        ----------
+        conn :
+            connection returned by acquire
+        broken :
+            close the connection instead of reusing it (Default value = False)
+        """
+        self._count("released")
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        if broken or self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+
+        Context managed acquire/release of a connection. The block has to
+        commit its writes, the rest is rolled back when the connection is
+        given back, whether the block succeeds or raises.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self):
+        """
+
+        Context managed (connection, cursor) pair, the cursor is closed on exit.
+        """
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield conn, cur
+            finally:
+                cur.close()
+
+    def metrics(self) -> dict:
+        """
+
+        Returns
+        -------
+        dict of pool counters: size, open, idle and in_use connections, how many
+        were acquired, released, created and discarded, and how many acquires had
+        to wait and for how long in total
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = self._created
+        stats["size"] = self.size
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["open"] - stats["idle"]
+        return stats
+
+    def close(self) -> None:
+        """
+
+        Closes the idle connections; connections in use are closed when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -0,0 +1,85 @@
+-- Migrates a TweetInformation table created by the untyped schema to the typed
+-- and indexed one in day5_schema.sql, then fills the hashtag and mention link
+-- tables from the space separated columns. Needs MySQL 8.0 for JSON_TABLE.
+-- It also adds the tweet_key natural key the upserts of add_data rely on,
+-- keeping only the newest row of the tweets that were loaded more than once.
+-- Run it from the parent directory with add_data.createTables('tweets', 'migrations/001_typed_indexed_schema.sql').
+-- Statements are separated by semicolons and comments must not contain one.
+
+UPDATE `TweetInformation`
+SET `created_at` = LEFT(`created_at`, 19),
+    `possibly_sensitive` = CASE `possibly_sensitive` WHEN 'True' THEN '1' WHEN '1' THEN '1'
+                                                     WHEN 'False' THEN '0' WHEN '0' THEN '0' ELSE NULL END,
+    `sentiment` = IF(`sentiment` IN ('negative', 'neutral', 'positive'), `sentiment`, NULL),
+    `language` = NULLIF(LEFT(`language`, 8), '0'),
+    `original_author` = NULLIF(LEFT(`original_author`, 50), '0'),
+    `place` = NULLIF(LEFT(`place`, 255), '0');
+
+ALTER TABLE `TweetInformation`
+    MODIFY `id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+    MODIFY `created_at` DATETIME NOT NULL,
+    MODIFY `sentiment` ENUM('negative', 'neutral', 'positive') DEFAULT NULL,
+    MODIFY `language` VARCHAR(8) DEFAULT NULL,
+    MODIFY `favorite_count` INT UNSIGNED DEFAULT NULL,
+    MODIFY `retweet_count` INT UNSIGNED DEFAULT NULL,
+    MODIFY `original_author` VARCHAR(50) DEFAULT NULL,
+    MODIFY `followers_count` INT UNSIGNED DEFAULT NULL,
+    MODIFY `friends_count` INT UNSIGNED DEFAULT NULL,
+    MODIFY `possibly_sensitive` TINYINT(1) DEFAULT NULL,
+    MODIFY `place` VARCHAR(255) DEFAULT NULL,
+    ADD COLUMN `tweet_key` CHAR(40) NULL,
+    ADD KEY `idx_tweet_key` (`tweet_key`),
+    ADD KEY `idx_created_at` (`created_at`),
+    ADD KEY `idx_sentiment_sensitive` (`sentiment`, `possibly_sensitive`),
+    ADD KEY `idx_language` (`language`),
+    ADD KEY `idx_source` (`source`),
+    ADD KEY `idx_original_author` (`original_author`),
+    ADD KEY `idx_place` (`place`);
+
+-- the natural keys are computed the way add_data.tweet_key does, with missing values hashed as empty strings
+UPDATE `TweetInformation`
+SET `tweet_key` = SHA1(CONCAT(DATE_FORMAT(`created_at`, '%Y-%m-%d %H:%i:%s'), CHAR(31),
+                              COALESCE(`original_author`, ''), CHAR(31), COALESCE(`clean_text`, '')));
+
+-- the same tweet loaded several times keeps its last loaded row, which has the most recent counts
+DELETE t
+FROM `TweetInformation` t
+JOIN `TweetInformation` newer ON newer.`tweet_key` = t.`tweet_key` AND newer.`id` > t.`id`;
+
+ALTER TABLE `TweetInformation`
+    MODIFY `tweet_key` CHAR(40) NOT NULL,
+    DROP KEY `idx_tweet_key`,
+    ADD UNIQUE KEY `uq_tweet_key` (`tweet_key`);
+
+CREATE TABLE IF NOT EXISTS `TweetHashtag`
+(
+    `hashtag` VARCHAR(140) NOT NULL,
+    `tweet_id` INT UNSIGNED NOT NULL,
+    PRIMARY KEY (`hashtag`, `tweet_id`),
+    KEY `idx_tweet_id` (`tweet_id`),
+    CONSTRAINT `fk_hashtag_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `TweetInformation` (`id`) ON DELETE CASCADE
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetMention`
+(
+    `mention` VARCHAR(50) NOT NULL,
+    `tweet_id` INT UNSIGNED NOT NULL,
+    PRIMARY KEY (`mention`, `tweet_id`),
+    KEY `idx_tweet_id` (`tweet_id`),
+    CONSTRAINT `fk_mention_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `TweetInformation` (`id`) ON DELETE CASCADE
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+-- hashtags and mentions only hold [#@a-z0-9_-] so they can be spliced into a json array as is
+INSERT IGNORE INTO `TweetHashtag` (`hashtag`, `tweet_id`)
+SELECT LEFT(j.`entity`, 140), t.`id`
+FROM `TweetInformation` t,
+     JSON_TABLE(CONCAT('["', REPLACE(TRIM(t.`hashtags`), ' ', '","'), '"]'), '$[*]' COLUMNS (`entity` VARCHAR(255) PATH '$')) j
+WHERE TRIM(t.`hashtags`) <> '';
+
+INSERT IGNORE INTO `TweetMention` (`mention`, `tweet_id`)
+SELECT LEFT(j.`entity`, 50), t.`id`
+FROM `TweetInformation` t,
+     JSON_TABLE(CONCAT('["', REPLACE(TRIM(t.`user_mentions`), ' ', '","'), '"]'), '$[*]' COLUMNS (`entity` VARCHAR(255) PATH '$')) j
+WHERE TRIM(t.`user_mentions`) <> '';
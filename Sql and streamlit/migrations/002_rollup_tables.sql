@@ -0,0 +1,47 @@
+-- Adds the summary tables the dashboard charts read and fills them from the
+-- tweets already loaded. Later loads keep them up to date through
+-- add_data.refresh_rollups, called by ingest_incremental.
+-- Run it from the parent directory with add_data.createTables('tweets', 'migrations/002_rollup_tables.sql').
+-- Statements are separated by semicolons and comments must not contain one.
+
+CREATE TABLE IF NOT EXISTS `TweetRollupHourly`
+(
+    `hour` DATETIME NOT NULL,
+    `source` VARCHAR(200) NOT NULL,
+    `sentiment` VARCHAR(8) NOT NULL,
+    `possibly_sensitive` TINYINT NOT NULL,
+    `tweet_count` INT UNSIGNED NOT NULL,
+    `favorite_count` BIGINT UNSIGNED NOT NULL,
+    `retweet_count` BIGINT UNSIGNED NOT NULL,
+    `friends_count` BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (`hour`, `source`, `sentiment`, `possibly_sensitive`),
+    KEY `idx_source` (`source`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `TweetAuthorRollup`
+(
+    `original_author` VARCHAR(50) NOT NULL,
+    `sentiment` VARCHAR(8) NOT NULL,
+    `tweet_count` INT UNSIGNED NOT NULL,
+    `retweet_count` BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (`original_author`, `sentiment`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+DELETE FROM `TweetRollupHourly`;
+
+INSERT INTO `TweetRollupHourly` (`hour`, `source`, `sentiment`, `possibly_sensitive`, `tweet_count`,
+                                 `favorite_count`, `retweet_count`, `friends_count`)
+SELECT TIMESTAMP(DATE(`created_at`), MAKETIME(HOUR(`created_at`), 0, 0)), `source`, COALESCE(`sentiment`, ''),
+       COALESCE(`possibly_sensitive`, -1), COUNT(*), COALESCE(SUM(`favorite_count`), 0),
+       COALESCE(SUM(`retweet_count`), 0), COALESCE(SUM(`friends_count`), 0)
+FROM `TweetInformation`
+GROUP BY 1, 2, 3, 4;
+
+DELETE FROM `TweetAuthorRollup`;
+
+INSERT INTO `TweetAuthorRollup` (`original_author`, `sentiment`, `tweet_count`, `retweet_count`)
+SELECT COALESCE(`original_author`, ''), COALESCE(`sentiment`, ''), COUNT(*), COALESCE(SUM(`retweet_count`), 0)
+FROM `TweetInformation`
+GROUP BY 1, 2;
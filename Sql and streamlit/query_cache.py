@@ -0,0 +1,259 @@
+import atexit
+import functools
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_shared = {}
+_shared_lock = threading.Lock()
+_MISSING = object()
+
+
+def _sizeof(value) -> int:
+    """estimated memory of a cached value, without serializing it"""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    # ndarrays, and the TweetFilter, EntityIndex and TermFrequencies the dashboard caches
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(key) + _sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item) for item in value)
+    return size
+
+
+class QueryCache:
+    """
+    A thread safe cache for the results of dashboard queries.
+
+    Every entry expires after its own TTL, and the least recently used entries
+    are evicted once the estimated size of the cached values goes over
+    `max_bytes`. The whole cache is dropped when the data version reported by
+    `version` changes, e.g. when the ingestion watermark moves, which is checked
+    at most every `check_interval` seconds. The entries are written to
+    `snapshot_file` now and then and at exit, and read back on creation so that
+    a restarted dashboard serves them without querying the database again.
+    The snapshots due after a new entry are written by a background thread,
+    so the request that cached it doesn't wait for the pickling.
+
+    Parameters
+    ----------
+    max_bytes :
+        memory ceiling of the cached values (Default value = 512 MiB)
+    default_ttl :
+        seconds an entry stays valid when `cached` gets no ttl (Default value = 600)
+    version :
+        optional callable returning the current data version, a failing call keeps the entries (Default value = None)
+    check_interval :
+        seconds between two calls of `version` (Default value = 30)
+    snapshot_file :
+        optional pickle file the entries are saved to and warmed from (Default value = None)
+    snapshot_interval :
+        minimum seconds between two snapshots written after a new entry (Default value = 60)
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2 ** 20, default_ttl: float = 600, version=None,
+                 check_interval: float = 30, snapshot_file: str = None, snapshot_interval: float = 60):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._version_fn = version
+        self.check_interval = check_interval
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._version = None
+        self._checked_at = 0.0
+        self._saved_at = time.monotonic()
+        self._saver = None
+        self._save_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidations": 0}
+        if snapshot_file:
+            self.load_snapshot()
+            atexit.register(self.save_snapshot)
+
+    def _check_version(self) -> None:
+        if self._version_fn is None or time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            version = self._version_fn()
+        except Exception as e:
+            print("Error:", e)
+            return
+        with self._lock:
+            # entries cached before the first check were computed from the current data
+            if self._version is not None and version != self._version:
+                self._clear()
+                self._stats["invalidations"] += 1
+            self._version = version
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _pop(self, key) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        """
+
+        Returns
+        -------
+        the cached value of key, or default when it is missing or expired
+        """
+        self._check_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                self._pop(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, value, ttl: float = None) -> None:
+        """
+
+        Caches value under key for ttl seconds, evicting the least recently
+        used entries to stay under max_bytes. Values larger than the whole
+        cache are not kept.
+        """
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._stats["evicted"] += 1
+            snapshot_due = self.snapshot_file and time.monotonic() - self._saved_at >= self.snapshot_interval
+            if snapshot_due and (self._saver is None or not self._saver.is_alive()):
+                self._saved_at = time.monotonic()
+                self._saver = threading.Thread(target=self.save_snapshot, name="query-cache-snapshot", daemon=True)
+                self._saver.start()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+            self._stats["invalidations"] += 1
+
+    def cached(self, ttl: float = None):
+        """
+
+        Decorator caching a function's results per arguments, which must have
+        a stable repr. The function's module and name are part of the key, so
+        one cache can serve several functions.
+        """
+        def decorator(func):
+            name = f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (name, repr(args), repr(sorted(kwargs.items())))
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    self.put(key, value, ttl)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def close(self) -> None:
+        """
+
+        Saves a last snapshot and stops saving at exit.
+        """
+        if self.snapshot_file:
+            atexit.unregister(self.save_snapshot)
+            if self._saver is not None:
+                self._saver.join()
+            self.save_snapshot()
+
+    def save_snapshot(self) -> None:
+        """
+
+        Writes the unexpired entries and the data version to snapshot_file,
+        replacing it atomically.
+        """
+        if not self.snapshot_file:
+            return
+        with self._lock:
+            now = time.time()
+            entries = [(key, entry) for key, entry in self._entries.items() if entry[1] > now]
+            data = {"version": self._version, "entries": entries}
+            self._saved_at = time.monotonic()
+        tmp_file = f"{self.snapshot_file}.tmp"
+        # the background saver and the save at exit or close write the same tmp file
+        with self._save_lock:
+            try:
+                with open(tmp_file, "wb") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, self.snapshot_file)
+            except (OSError, pickle.PicklingError) as e:
+                print("Error:", e)
+
+    def load_snapshot(self) -> int:
+        """
+
+        Reads the unexpired entries saved by save_snapshot, they are dropped
+        by the next version check if the data changed meanwhile.
+
+        Returns
+        -------
+        number of entries loaded
+        """
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return 0
+        try:
+            with open(self.snapshot_file, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            print("Error:", e)
+            return 0
+        now = time.time()
+        with self._lock:
+            self._version = data["version"]
+            for key, (value, expires_at, size) in data["entries"]:
+                if expires_at > now and self._bytes + size <= self.max_bytes:
+                    self._entries[key] = (value, expires_at, size)
+                    self._bytes += size
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, version=self._version)
+
+
+def shared_cache(name: str, **kwargs) -> QueryCache:
+    """
+
+    Returns the QueryCache called name, created with kwargs on first use.
+    Streamlit re-executes the dashboard script on every interaction, so the
+    cache has to live in an imported module to outlive a rerun.
+    """
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = QueryCache(**kwargs)
+        return _shared[name]
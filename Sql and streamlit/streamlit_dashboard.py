@@ -1,160 +1,191 @@
+import os
+import sys
 from random import choices
 import numpy as np
 import pandas as pd
-import pandas_profiling
 import streamlit as st
+import streamlit.components.v1 as components
 import altair as alt
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.figure_factory as ff
-from wordcloud import WordCloud
+from wordcloud import STOPWORDS, WordCloud
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
-from streamlit_pandas_profiling import st_profile_report
-from add_data import db_execute_fetch
+from add_data import get_watermark
+import dashboard_queries
+from query_cache import shared_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from entity_index import EntityIndex
+from term_frequencies import TermFrequencies
+from tweet_filter import TweetFilter
+from tweet_storage import read_tweets
+
+# rows fetched for the data table and for the word clouds
+DISPLAY_ROWS = 1000
+WORDCLOUD_ROWS = 50000
+# a processed tweets parquet dataset or csv file; when set, the data table and the
+# word clouds filter it in memory instead of querying the database
+DATA_PATH = os.environ.get("TWEETS_DATA_PATH")
+# word counts kept up to date by add_data.ingest_incremental
+TERM_FREQUENCIES_FILE = os.environ.get("TWEETS_TERM_FREQUENCIES", "term_frequencies.json")
+# sidebar filter names that have another column name in the processed files
+LOCAL_COLUMNS = {"language": "lang"}
+# tweets profiled on the advanced data exploration page, by default
+PROFILE_SAMPLE_ROWS = int(os.environ.get("TWEETS_PROFILE_SAMPLE_ROWS", 20000))
+# memory ceiling and startup snapshot of the query cache
+CACHE_MAX_BYTES = int(os.environ.get("TWEETS_CACHE_MAX_MB", 512)) * 2 ** 20
+CACHE_SNAPSHOT_FILE = os.environ.get("TWEETS_CACHE_SNAPSHOT", "dashboard_cache.pkl")
 
 st.set_page_config(page_title="Tweets Data", layout="wide")
 
-# cache the result so that it doesn't load everytime
-@st.cache()
-def loadData():
-    query = "select * from TweetInformation"
-    df = db_execute_fetch(query, dbName="tweets", rdf=True)
-    return df
 
-def list_of_hashtags(df):
-    hashtags_list_df = df.loc[df["hashtags"] != " "]
-    hashtags_list_df = hashtags_list_df['hashtags']
-    flattened_hashtags = []
-    for hashtags_list in hashtags_list_df:
-        hashtags_list = hashtags_list.split(" ")
-        for hashtag in hashtags_list:
-            flattened_hashtags.append(hashtag)
-    flattened_hashtags_df = pd.DataFrame(flattened_hashtags, columns=['hashtags'])
+def dataVersion():
+    # the ingestion watermark, and the newest change to the local data files
+    local = None
+    if DATA_PATH:
+        local = max((os.path.getmtime(root) for root, _, _ in os.walk(DATA_PATH)), default=os.path.getmtime(DATA_PATH))
+    return get_watermark(dashboard_queries.DB_NAME, dashboard_queries.TABLE), local
+
+
+# every cached result is dropped as soon as new tweets are ingested
+cache = shared_cache("dashboard", max_bytes=CACHE_MAX_BYTES, version=dataVersion, snapshot_file=CACHE_SNAPSHOT_FILE)
+fetch_tweets = cache.cached(ttl=60)(dashboard_queries.fetch_tweets)
+count_tweets = cache.cached(ttl=60)(dashboard_queries.count_tweets)
+filter_options = cache.cached(ttl=600)(dashboard_queries.filter_options)
+sentiment_sensitivity_totals = cache.cached(ttl=300)(dashboard_queries.sentiment_sensitivity_totals)
+author_tweet_counts = cache.cached(ttl=300)(dashboard_queries.author_tweet_counts)
+top_retweets_by = cache.cached(ttl=300)(dashboard_queries.top_retweets_by)
+top_sources_friends = cache.cached(ttl=300)(dashboard_queries.top_sources_friends)
+
+@cache.cached(ttl=3600)
+def loadTweetFilter():
+    return TweetFilter(read_tweets(DATA_PATH))
+
+@cache.cached(ttl=3600)
+def loadTermFrequencies():
+    if DATA_PATH:
+        return TermFrequencies.from_df(loadTweetFilter().df)
+    if os.path.exists(TERM_FREQUENCIES_FILE):
+        return TermFrequencies.load(TERM_FREQUENCIES_FILE)
+    # no counts saved by the ingestion yet, count the newest tweets instead
+    return TermFrequencies.from_df(fetch_tweets(columns=["clean_text", "sentiment", "possibly_sensitive"], limit=WORDCLOUD_ROWS))
+
+@cache.cached(ttl=600)
+def loadFilterOptions(column):
+    if DATA_PATH:
+        return loadTweetFilter().options(LOCAL_COLUMNS.get(column, column))
+    return filter_options(column)
 
-    return list(flattened_hashtags_df["hashtags"].unique())
+def list_of_hashtags(df):
+    return EntityIndex(df["hashtags"]).vocabulary.tolist()
 
 def list_of_user_mentions(df):
-    user_mentions_list_df = df.loc[df["user_mentions"] != " "]
-    user_mentions_list_df = user_mentions_list_df['user_mentions']
-    flattened_user_mentions = []
-    for user_mentions_list in user_mentions_list_df:
-        user_mentions_list = user_mentions_list.split(" ")
-        for user_mentions in user_mentions_list:
-            flattened_user_mentions.append(user_mentions)
-    flattened_user_mentions_df = pd.DataFrame(flattened_user_mentions, columns=['user_mentions'])
-
-    return list(flattened_user_mentions_df["user_mentions"].unique())
-
-def displayData(df):
+    return EntityIndex(df["user_mentions"]).vocabulary.tolist()
+
+def displayData():
     st.sidebar.title("Filter tweets data")
-    hashTags = st.sidebar.multiselect("Choose hashtags", list_of_hashtags(df))
-    location = st.sidebar.multiselect("Choose location of tweets", list(df['place'].unique()))
-    source = st.sidebar.multiselect("Choose source of tweets", list(df['source'].unique()))
-    language = st.sidebar.multiselect("Choose language of tweets", list(df['language'].unique()))
+    filters = {
+        "hashtags": st.sidebar.multiselect("Choose hashtags", loadFilterOptions("hashtags")),
+        "place": st.sidebar.multiselect("Choose location of tweets", loadFilterOptions("place")),
+        "source": st.sidebar.multiselect("Choose source of tweets", loadFilterOptions("source")),
+        "language": st.sidebar.multiselect("Choose language of tweets", loadFilterOptions("language")),
+    }
 
     st.write("Filter the data to your specification. To order the data by a certain column click on the name of the column.")
-    if hashTags:
-        df = df[df["hashtags"].str.contains('|'.join(hashTags))].reset_index(drop=True)
-    if location:
-        df = df[np.isin(df, location).any(axis=1)].reset_index(drop=True)
-    if source:
-        df = df[np.isin(df, source).any(axis=1)].reset_index(drop=True)
-    if language:
-        df = df[np.isin(df, language).any(axis=1)].reset_index(drop=True)
-
-    st.write(df)
+    if DATA_PATH:
+        df = loadTweetFilter().filter(**{LOCAL_COLUMNS.get(column, column): values for column, values in filters.items()})
+        st.write(f"{len(df)} tweets match, showing the first {DISPLAY_ROWS}.")
+        st.write(df.head(DISPLAY_ROWS))
+    else:
+        # the filters run in the database, only the rows shown are fetched
+        st.write(f"{count_tweets(filters)} tweets match, showing the newest {DISPLAY_ROWS}.")
+        st.write(fetch_tweets(filters, limit=DISPLAY_ROWS))
 
 
 def selectHashTag(df):
-    hashTags = st.multiselect("choose combaniation of hashtags", list(df['hashtags'].unique()))
+    tweet_filter = TweetFilter(df)
+    hashTags = st.multiselect("choose combaniation of hashtags", tweet_filter.options("hashtags"))
     if hashTags:
-        df = df[np.isin(df, hashTags).any(axis=1)]
+        df = tweet_filter.filter(hashtags=hashTags)
         st.write(df)
 
 
-def wordCloud(df):
+def showWordCloud(frequencies):
+    if not frequencies:
+        st.write("No tweets in this category.")
+        return
+    wc = WordCloud(width=650, height=450, background_color='white', min_font_size=5).generate_from_frequencies(frequencies)
+    st.image(wc.to_array())
+
+def wordCloud(term_frequencies):
     st.markdown("## **WordCloud**")
     st.write("### 1.  A word cloud for positve, negative and neutral tweets.")
-    sentiment = st.selectbox("Select a sentiment category", list(df['sentiment'].unique()))
-    if sentiment:
-        df = df[np.isin(df, sentiment).any(axis=1)].reset_index(drop=True)
-    cleanText = ''
-    for text in df['clean_text']:
-        tokens = str(text).lower().split()
-
-        cleanText += " ".join(tokens) + " "
-
-    wc = WordCloud(width=650, height=450, background_color='white', min_font_size=5).generate(cleanText)
+    sentiment = st.selectbox("Select a sentiment category", term_frequencies.sentiments())
     if sentiment:
         st.markdown(f"### **{sentiment.capitalize()} Tweets Word Cloud**")
     else:
         st.title("Tweet Text Word Cloud")
-    st.image(wc.to_array())
+    showWordCloud(term_frequencies.frequencies(sentiment=sentiment, stopwords=STOPWORDS))
     st.write("### 2.  A word cloud for possibly sensitve or not tweets.")
 
-    sensitive = st.selectbox("Select a category", list(df['possibly_sensitive'].unique()))
-    if sensitive:
-        df = df[np.isin(df, sensitive).any(axis=1)].reset_index(drop=True)
-    cleanText = ''
-    for text in df['clean_text']:
-        tokens = str(text).lower().split()
-
-        cleanText += " ".join(tokens) + " "
-
-    wc = WordCloud(width=650, height=450, background_color='white', min_font_size=5).generate(cleanText)
-    st.image(wc.to_array())
+    sensitive = st.selectbox("Select a category", term_frequencies.sensitivities(sentiment))
+    showWordCloud(term_frequencies.frequencies(sentiment=sentiment, sensitive=sensitive, stopwords=STOPWORDS))
 
+@cache.cached(ttl=3600)
+def loadProfileReport(sample_rows):
+    # the profiling stack is slow to import, only this page needs it
+    from pandas_profiling import ProfileReport
+    if DATA_PATH:
+        df = dashboard_queries.stratified_sample(loadTweetFilter().df, sample_rows)
+    else:
+        df = dashboard_queries.sample_tweets(sample_rows)
+    return ProfileReport(df, title="Tweets profile", explorative=True).to_html()
 
-def advanced_exploration(df, suppress_st_warning=True):
-    df = df.drop(columns=["id"])
-    pr = df.profile_report(explorative=True)
-    st_profile_report(pr)
+def advanced_exploration(sample_rows=PROFILE_SAMPLE_ROWS):
+    sample_rows = st.sidebar.number_input("Tweets to profile", min_value=1000, max_value=1000000, value=sample_rows, step=1000)
+    st.write(f"Profile of about {sample_rows:,} tweets sampled in proportion to each sentiment and sensitivity.")
+    components.html(loadProfileReport(int(sample_rows)), height=1500, scrolling=True)
 
 
-def plotly_bar_sentiment_friends(df):
+def plotly_bar_sentiment_friends():
+    df = sentiment_sensitivity_totals()
     st.markdown("## 1. Sentiment vs Friends count")
     st.write("The following bar chart shows the number of friends based on the sentiment of each tweet.")
     fig = px.bar(df, x='sentiment', y='friends_count', color="possibly_sensitive", barmode='group', width=1000)
     st.plotly_chart(fig)
 
-def plotly_bar_original_author_retweet(df):
-    count = list(df["original_author"].value_counts().head(10).index)
-    df = df[np.isin(df, count).any(axis=1)]
+def plotly_bar_original_author_retweet():
+    df = top_retweets_by("original_author", 10)
     st.markdown("## 3. Original authors vs Retweet count")
     st.write("The following bar chart shows the number of retweets for the top 10 original authors. Here we can understand that even if PuneUpdater is the highest original author of all, he has very few retweets.")
     fig = px.bar(df, x='original_author', y='retweet_count', color="sentiment", barmode='group', width=1000)
     st.plotly_chart(fig)
 
-def plotly_bar_source_retweet(df):
-    count = list(df["source"].value_counts().head(5).index)
-    df = df[np.isin(df, count).any(axis=1)]
+def plotly_bar_source_retweet():
+    df = top_retweets_by("source", 5)
     st.markdown("## 4. Source vs Retweet count")
     st.write("The following bar chart shows the number of retweets for the top 5 sources.")
     fig = px.bar(df, x='source', y='retweet_count', color="sentiment", barmode='group', width=1000)
     st.plotly_chart(fig)
 
-def plotly_facet(df):
-    source = list(df["source"].value_counts().head(3).index)
-    df = df[np.isin(df, source).any(axis=1)]
+def plotly_facet():
+    df = top_sources_friends(3)
     fig = px.bar(df, x="sentiment", y="friends_count",
              facet_row="possibly_sensitive", facet_col="source", width=1000, height=600)
     st.markdown("## 5. Sentiment vs Retweet count vs Source vs Possibly sensitive")
     st.write("The following faceted subplots show the number of friends based on sentiments and sensetiveness for the top 3 sources grouped .")
     st.plotly_chart(fig)
 
-def authorPie(df):
-    dflocationCount = pd.DataFrame({'Tweet_count': df.groupby(['original_author'])['clean_text'].count()}).reset_index()
-    dflocationCount = dflocationCount.sort_values("Tweet_count", ascending=False)
-    dflocationCount.loc[dflocationCount['Tweet_count'] < 5, 'original_author'] = 'Other authors'
+def authorPie():
+    dflocationCount = author_tweet_counts(min_count=5)
     fig = px.pie(dflocationCount, values='Tweet_count', names='original_author', width=800, height=500)
     fig.update_traces(textposition='inside', textinfo='percent+label')
     st.markdown("## 2. Original authors")
     st.write("The following pie chart shows top original authors based on their count of tweets. Note that authors with less than 5 tweets are grouped as other authors.")
     st.plotly_chart(fig)
 
-# bacause the data in the database doesn't change, we need to call loadData() only once
-df = loadData()
 st.sidebar.title("Pages")
 choices = ["Data table", "Charts", "WordCloud", "Advanced data exploration"]
 page = st.sidebar.selectbox("Choose Page",choices)
@@ -162,15 +193,15 @@ page = st.sidebar.selectbox("Choose Page",choices)
 if page == "Data table":
     st.title("Data")
     st.write("\n")
-    displayData(df)
+    displayData()
 elif page == "WordCloud":
-    wordCloud(df)
+    wordCloud(loadTermFrequencies())
 elif page == "Charts":
     st.title("Charts")
-    plotly_bar_sentiment_friends(df)
-    authorPie(df)
-    plotly_bar_original_author_retweet(df)
-    plotly_bar_source_retweet(df)
-    plotly_facet(df)
+    plotly_bar_sentiment_friends()
+    authorPie()
+    plotly_bar_original_author_retweet()
+    plotly_bar_source_retweet()
+    plotly_facet()
 else:
-    advanced_exploration(df)
+    advanced_exploration()
@@ -0,0 +1 @@
+"""Benchmarks for the extraction, cleaning and loading pipeline."""
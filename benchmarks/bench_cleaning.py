@@ -0,0 +1,61 @@
+"""
+compares cleaning tweets with the Clean_Tweets steps one by one, as the
+preprocessing notebook does, against the fused Clean_Tweets.clean, which
+filters the rows once and cleans each column once per distinct value.
+
+usage: python benchmarks/bench_cleaning.py [--tweets 200000] [--untyped]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from clean_tweets_dataframe import Clean_Tweets
+from extract_dataframe import TweetDfExtractor
+from benchmarks.synthetic import make_tweets
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def clean_stepwise(clean_tweets: Clean_Tweets, df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    clean_tweets.drop_duplicates(df)
+    df = clean_tweets.remove_non_english_tweets(df)
+    df = clean_tweets.fill_missing(df, "place", "Not provided")
+    df = clean_tweets.fill_missing(df, "possibly_sensitive", "unknown")
+    df = clean_tweets.remove_characters(df, "place")
+    df = clean_tweets.replace_empty_string(df, "place", "Not provided")
+    df = clean_tweets.convert_to_datetime(df)
+    df["source"] = df["source"].apply(clean_tweets.extract_device_name)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=200_000, help="number of synthetic tweets")
+    parser.add_argument("--untyped", action="store_true", help="clean the object columns instead of the compact dtypes")
+    args = parser.parse_args()
+
+    df = TweetDfExtractor(list(make_tweets(args.tweets))).get_tweet_df(typed=not args.untyped)
+    clean_tweets = Clean_Tweets(df)
+
+    stepwise, stepwise_time = timed(clean_stepwise, clean_tweets, df)
+    fused, fused_time = timed(clean_tweets.clean, df)
+    pd.testing.assert_frame_equal(fused, stepwise, check_dtype=False, check_categorical=False)
+
+    print(f"tweets: {args.tweets:,}, kept: {len(fused):,}")
+    print(f"stepwise: {stepwise_time:.2f}s")
+    print(f"fused:    {fused_time:.2f}s ({stepwise_time / fused_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+counts the tweets Clean_Tweets.drop_duplicates leaves, which only drops rows
+identical in every column, against the canonical tweets of dedup.DedupIndex,
+which groups the retweets and near duplicates of a text, and times the index
+on a first ingest and on a second one that reuses its persisted signatures.
+
+usage: python benchmarks/bench_dedup.py [--tweets 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dedup import DedupIndex, deduplicate
+from extract_dataframe import TweetDfExtractor
+from benchmarks.synthetic import make_tweets
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=100_000, help="number of synthetic tweets per ingest")
+    args = parser.parse_args()
+
+    columns = ["created_at", "original_text", "clean_text", "original_author"]
+    first = TweetDfExtractor(list(make_tweets(args.tweets, seed=0)), columns=columns).get_tweet_df()
+    second = TweetDfExtractor(list(make_tweets(args.tweets, seed=1)), columns=columns).get_tweet_df()
+    exact_rows = len(first.drop_duplicates())
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index = DedupIndex(os.path.join(tmpdir, "dedup.sqlite"))
+        first, first_time = timed(deduplicate, first, index)
+        second, second_time = timed(deduplicate, second, index)
+        stats = index.stats()
+        index.close()
+
+    both = pd.concat([first, second])
+    print(f"tweets per ingest: {args.tweets:,}")
+    print(f"rows left by drop_duplicates: {exact_rows:,}")
+    print(f"canonical tweets, first ingest: {int(first['is_canonical'].sum()):,} in {first_time:.2f}s")
+    print(f"canonical tweets, second ingest: {int(second['is_canonical'].sum()):,} new in {second_time:.2f}s")
+    print(f"canonical tweets over both: {stats['canonical']:,} for {len(both):,} tweets, "
+          f"largest group {int(both['duplicate_count'].max()):,}")
+
+
+if __name__ == "__main__":
+    main()
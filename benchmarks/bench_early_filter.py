@@ -0,0 +1,67 @@
+"""
+compares keeping the english tweets of a json lines file the way the
+notebook does, extracting and scoring every tweet and then calling
+Clean_Tweets.remove_non_english_tweets, against reading the file with a
+TweetPredicate and only the columns needed downstream, so that the other
+tweets are skipped before json parsing and sentiment scoring is left out
+when no sentiment column is asked for.
+
+usage: python benchmarks/bench_early_filter.py [--tweets 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from clean_tweets_dataframe import Clean_Tweets
+from extract_dataframe import TweetDfExtractor, TweetPredicate, read_json
+from benchmarks.synthetic import write_json
+
+COLUMNS = ["created_at", "lang", "original_author", "hashtags", "place"]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def filter_late(path: str):
+    _, tweets = read_json(path)
+    df = TweetDfExtractor(tweets).get_tweet_df()
+    return Clean_Tweets(df).remove_non_english_tweets(df)
+
+
+def filter_early(path: str, columns: list = None):
+    _, tweets = read_json(path, TweetPredicate(lang="en"))
+    return TweetDfExtractor(tweets, columns=columns).get_tweet_df()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=100_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_json(os.path.join(tmpdir, "tweets.json"), args.tweets)
+        late, late_time = timed(filter_late, path)
+        early, early_time = timed(filter_early, path)
+        projected, projected_time = timed(filter_early, path, COLUMNS)
+
+    # the categoricals of the early frames don't hold the categories of the skipped tweets
+    pd.testing.assert_frame_equal(late.reset_index(drop=True), early, check_categorical=False)
+    pd.testing.assert_frame_equal(early[COLUMNS], projected, check_categorical=False)
+    print(f"tweets: {args.tweets:,}, english: {len(early):,}")
+    print(f"filter after extraction:  {late_time:.2f}s")
+    print(f"filter while reading:     {early_time:.2f}s ({late_time / early_time:.1f}x)")
+    print(f"  and project {len(COLUMNS)} columns: {projected_time:.2f}s ({late_time / projected_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
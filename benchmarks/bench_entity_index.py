@@ -0,0 +1,78 @@
+"""
+compares entity_index.EntityIndex with the dashboard's list_of_hashtags, which
+split every row in a python loop on every rerun, and with a Counter based top-K
+and co-occurrence count over the same split rows.
+
+usage: python benchmarks/bench_entity_index.py [--tweets 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_index import EntityIndex
+from extract_dataframe import TweetDfExtractor
+from benchmarks.synthetic import make_tweets
+
+
+def legacy_list_of_hashtags(df):
+    hashtags_list_df = df.loc[df["hashtags"] != " "]
+    hashtags_list_df = hashtags_list_df['hashtags']
+    flattened_hashtags = []
+    for hashtags_list in hashtags_list_df:
+        hashtags_list = hashtags_list.split(" ")
+        for hashtag in hashtags_list:
+            flattened_hashtags.append(hashtag)
+    flattened_hashtags_df = pd.DataFrame(flattened_hashtags, columns=['hashtags'])
+
+    return list(flattened_hashtags_df["hashtags"].unique())
+
+
+def legacy_top_and_co_occurring(column, hashtag, k):
+    top, co = Counter(), Counter()
+    for row in column:
+        tags = set(row.split())
+        top.update(tags)
+        if hashtag in tags:
+            co.update(tags - {hashtag})
+    return top.most_common(k), co.most_common(k)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=1_000_000, help="number of synthetic tweets")
+    parser.add_argument("--top", type=int, default=10, help="number of entities per query")
+    args = parser.parse_args()
+
+    df = pd.DataFrame({"hashtags": TweetDfExtractor(list(make_tweets(args.tweets))).find_hashtags()})
+
+    legacy_list, legacy_list_time = timed(legacy_list_of_hashtags, df)
+    index, build_time = timed(EntityIndex, df["hashtags"])
+    assert legacy_list == index.vocabulary.tolist(), "hashtag lists differ"
+
+    hashtag = index.top(1).index[0]
+    (legacy_top, legacy_co), legacy_query_time = timed(legacy_top_and_co_occurring, df["hashtags"], hashtag, args.top)
+    top, top_time = timed(index.top, args.top)
+    co, co_time = timed(index.co_occurring, hashtag, args.top)
+    assert dict(legacy_top) == top.to_dict() and dict(legacy_co) == co.to_dict(), "query results differ"
+
+    print(f"tweets:                   {args.tweets:,}")
+    print(f"hashtags:                 {len(index):,}")
+    print(f"list_of_hashtags:         {legacy_list_time:.2f}s -> index build {build_time:.2f}s (once per data load)")
+    print(f"top-{args.top} and co-occurring: {legacy_query_time:.2f}s -> {(top_time + co_time) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+compares the single pass field extraction of TweetDfExtractor with the
+previous implementation, where every find_* method walked the whole tweet
+list again and the cleaned text was recomputed for the hashtags and mentions.
+sentiment scoring is left out because it is identical in both.
+
+usage: python benchmarks/bench_extraction.py [--tweets 1000000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extract_dataframe import TweetDfExtractor
+from benchmarks.synthetic import make_tweets
+
+
+def _fallback(tweets, outer, key):
+    values = []
+    for x in tweets:
+        try:
+            value = x[outer][key]
+        except KeyError:
+            value = x[key]
+        values.append(value)
+    return values
+
+
+def legacy_columns(tweets: list) -> dict:
+    """the multi pass extraction get_tweet_df used before the field spec"""
+    def full_text():
+        texts = []
+        for x in tweets:
+            try:
+                text = x["retweeted_status"]["extended_tweet"]["full_text"]
+            except KeyError:
+                text = x["text"]
+            texts.append(text)
+        return texts
+
+    def clean_text():
+        clean = [re.sub(r"[^a-zA-Z0-9#@\s’,_]", "", text) for text in full_text()]
+        return [re.sub(r"\s+", " ", text) for text in clean]
+
+    def entities(pattern):
+        return [" ".join(re.findall(pattern, str(text).lower())) or " " for text in clean_text()]
+
+    sensitive = []
+    for x in tweets:
+        try:
+            sensitive.append(x["retweeted_status"]["possibly_sensitive"])
+        except KeyError:
+            sensitive.append(None)
+
+    return {
+        "created_at": [x["created_at"] for x in tweets],
+        "source": [x["source"] for x in tweets],
+        "original_text": full_text(),
+        "clean_text": clean_text(),
+        "lang": [x["lang"] for x in tweets],
+        "favorite_count": _fallback(tweets, "retweeted_status", "favorite_count"),
+        "retweet_count": _fallback(tweets, "retweeted_status", "retweet_count"),
+        "original_author": [x["user"]["screen_name"] for x in tweets],
+        "followers_count": [x["user"]["followers_count"] for x in tweets],
+        "friends_count": [x["user"]["friends_count"] for x in tweets],
+        "possibly_sensitive": sensitive,
+        "hashtags": entities(r"(#[A-Za-z]+[A-Za-z0-9_-]+)"),
+        "user_mentions": entities(r"(@[A-Za-z0-9_]+)"),
+        "place": [x["user"]["location"] for x in tweets],
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=1_000_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    tweets = list(make_tweets(args.tweets))
+    legacy, legacy_time = timed(legacy_columns, tweets)
+    single, single_time = timed(lambda: TweetDfExtractor(tweets).extract_columns())
+
+    assert all(legacy[name] == single[name] for name in legacy), "extraction results differ"
+    print(f"tweets:       {args.tweets:,}")
+    print(f"multi pass:   {legacy_time:.2f}s")
+    print(f"single pass:  {single_time:.2f}s")
+    print(f"speedup:      {legacy_time / single_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
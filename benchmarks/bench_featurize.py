@@ -0,0 +1,64 @@
+"""
+compares the notebook's trigram CountVectorizer, which has to be fitted on
+every text before transforming and keeps its whole vocabulary in memory,
+with featurize.StreamingFeaturizer transforming the same texts chunk by chunk
+with running tf-idf weights, whose state is a fixed size array.
+
+usage: python benchmarks/bench_featurize.py [--tweets 200000] [--chunk-size 10000]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from featurize import StreamingFeaturizer
+from text_processing import process_texts
+from benchmarks.synthetic import make_tweets
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def count_vectorize(texts: list):
+    from sklearn.feature_extraction.text import CountVectorizer
+    vectorizer = CountVectorizer(ngram_range=(1, 3))
+    return vectorizer, vectorizer.fit_transform(texts)
+
+
+def stream_featurize(texts: list, chunk_size: int):
+    featurizer = StreamingFeaturizer(tfidf=True)
+    nnz = 0
+    for start in range(0, len(texts), chunk_size):
+        nnz += featurizer.transform(texts[start:start + chunk_size]).nnz
+    return featurizer, nnz
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=200_000, help="number of synthetic tweets")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="tweets per chunk of the stream")
+    args = parser.parse_args()
+
+    texts, _, _ = process_texts([tweet["text"] for tweet in make_tweets(args.tweets, shared_texts=args.tweets)])
+    (vectorizer, counts), count_time = timed(count_vectorize, texts)
+    (featurizer, nnz), stream_time = timed(stream_featurize, texts, args.chunk_size)
+
+    vocabulary_mib = len(pickle.dumps(vectorizer.vocabulary_)) / 2 ** 20
+    state_mib = featurizer.document_frequency.nbytes / 2 ** 20
+    print(f"tweets: {args.tweets:,}, chunks of {args.chunk_size:,}")
+    print(f"CountVectorizer fit_transform: {count_time:.2f}s, {len(vectorizer.vocabulary_):,} n-grams, "
+          f"vocabulary {vocabulary_mib:.1f} MiB pickled, growing with the data")
+    print(f"streaming hashed tf-idf:       {stream_time:.2f}s, {featurizer.n_features:,} columns, "
+          f"state {state_mib:.1f} MiB whatever the volume")
+    print(f"non zeros: {counts.nnz:,} vs {nnz:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+compares the throughput of the two sentiment backends of TweetDfExtractor:
+TextBlob, through sentiment.score_texts, and the persisted trigram vectorizer
+and classifier of inference.SentimentModel. also reports how often the
+classifier agrees with TextBlob on the tweets TextBlob doesn't call neutral,
+which is optimistic when the texts are the ones the classifier was fitted on.
+
+usage: python benchmarks/bench_inference.py [--tweets 20000] [--batch-size 20000] [--data data/processed_tweets.csv]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from inference import SentimentModel
+from sentiment import score_texts, text_category
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=20_000, help="number of texts scored, the data is repeated as needed")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="texts transformed at a time by the classifier")
+    parser.add_argument("--data", default="data/processed_tweets.csv", help="processed tweets whose texts are scored")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data, usecols=["original_text"])["original_text"].dropna().tolist()
+    texts = (texts * (args.tweets // len(texts) + 1))[:args.tweets]
+    with warnings.catch_warnings():
+        # the vectorizer was pickled by an older scikit-learn
+        warnings.simplefilter("ignore")
+        model, load_time = timed(SentimentModel)
+        model.batch_size = args.batch_size
+        (_, _, classified), model_time = timed(model.score, texts)
+    scores, textblob_time = timed(score_texts, texts)
+
+    textblob = [text_category(polarity) for polarity, _ in scores]
+    polar = [(a, b) for a, b in zip(textblob, classified) if a != "neutral"]
+    agreement = sum(a == b for a, b in polar) / max(len(polar), 1)
+    print(f"texts: {len(texts):,}")
+    print(f"textblob:    {textblob_time:.2f}s ({len(texts) / textblob_time:,.0f} texts/s)")
+    print(f"classifier:  {model_time:.2f}s ({len(texts) / model_time:,.0f} texts/s, {textblob_time / model_time:.1f}x), "
+          f"loaded in {load_time:.2f}s")
+    print(f"agreement with textblob on its non neutral texts: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+times ingest.ingest of synthetic hourly dumps with one process, which runs
+the shards serially in the benchmark's process, against a process pool, and
+checks that both write the same dataset. the pool only pays off with more
+than one cpu, the number of cpus is printed with the timings.
+
+usage: python benchmarks/bench_ingest.py [--files 8] [--tweets 10000] [--processes 4] [--shard-mb 2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ingest import ingest
+from tweet_storage import read_parquet
+from benchmarks.synthetic import write_json
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8, help="number of dump files")
+    parser.add_argument("--tweets", type=int, default=10_000, help="number of synthetic tweets per file")
+    parser.add_argument("--processes", type=int, default=4, help="size of the process pool")
+    parser.add_argument("--shard-mb", type=float, default=2, help="target size of a shard in MiB")
+    args = parser.parse_args()
+
+    shard_bytes = int(args.shard_mb * 2 ** 20)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        inputs = os.path.join(tmpdir, "dumps")
+        os.makedirs(inputs)
+        for i in range(args.files):
+            write_json(os.path.join(inputs, f"2021-06-18-{i:02d}.json"), args.tweets, seed=i)
+
+        serial, serial_time = timed(ingest, inputs, os.path.join(tmpdir, "serial"), 1, shard_bytes)
+        parallel, parallel_time = timed(ingest, inputs, os.path.join(tmpdir, "parallel"), args.processes, shard_bytes)
+        pd.testing.assert_frame_equal(read_parquet(os.path.join(tmpdir, "serial")),
+                                      read_parquet(os.path.join(tmpdir, "parallel")), check_categorical=False)
+
+    print(f"files: {args.files}, shards: {parallel['shards']}, tweets: {parallel['rows']:,}, cpus: {os.cpu_count()}")
+    print(f"1 process:    {serial_time:.2f}s")
+    print(f"{args.processes} processes:  {parallel_time:.2f}s ({serial_time / parallel_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
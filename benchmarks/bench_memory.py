@@ -0,0 +1,39 @@
+"""
+reports the memory used by get_tweet_df's output with the object columns it
+used to build and with the compact dtypes of tweet_schema.apply_schema, per
+column and scaled to 1M tweets.
+
+usage: python benchmarks/bench_memory.py [--tweets 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extract_dataframe import TweetDfExtractor
+from tweet_schema import apply_schema, memory_report
+from benchmarks.synthetic import make_tweets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=200_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    before = TweetDfExtractor(list(make_tweets(args.tweets))).get_tweet_df(typed=False)
+    start = time.perf_counter()
+    after = apply_schema(before.copy())
+    schema_time = time.perf_counter() - start
+
+    with pd.option_context("display.width", 160, "display.max_columns", None, "display.float_format", "{:.1f}".format):
+        print(memory_report(before, after))
+    print(f"tweets: {args.tweets:,}, sizes in MiB per 1M tweets, apply_schema took {schema_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+compares the dashboard chart queries over the raw TweetInformation table with
+the same charts read from the TweetRollupHourly and TweetAuthorRollup summary
+tables, and times an incremental rollup refresh for the newest hour.
+
+needs a running mysql 8 server, configured with the MYSQL_HOST, MYSQL_USER and
+MYSQL_PASSWORD environment variables, and the tweets_bench_new database loaded
+by bench_schema_queries.py. the rollups are rebuilt with
+"Sql and streamlit/migrations/002_rollup_tables.sql".
+
+usage: python benchmarks/bench_rollups.py [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_schema_queries import connect, median_latency
+
+MIGRATION_FILE = os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit', 'migrations', '002_rollup_tables.sql')
+
+# (chart, raw table query, rollup query)
+QUERIES = [
+    ("sentiment vs friends",
+     "SELECT sentiment, possibly_sensitive, COUNT(*), SUM(friends_count) FROM TweetInformation GROUP BY 1, 2",
+     "SELECT sentiment, possibly_sensitive, SUM(tweet_count), SUM(friends_count) FROM TweetRollupHourly GROUP BY 1, 2"),
+    ("author pie",
+     "SELECT original_author, COUNT(*) FROM TweetInformation GROUP BY 1",
+     "SELECT original_author, SUM(tweet_count) FROM TweetAuthorRollup GROUP BY 1"),
+    ("top authors retweets",
+     """SELECT t.original_author, t.sentiment, SUM(t.retweet_count) FROM TweetInformation t
+        JOIN (SELECT original_author FROM TweetInformation GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 10) top
+        ON top.original_author = t.original_author GROUP BY 1, 2""",
+     """SELECT r.original_author, r.sentiment, SUM(r.retweet_count) FROM TweetAuthorRollup r
+        JOIN (SELECT original_author FROM TweetAuthorRollup GROUP BY 1 ORDER BY SUM(tweet_count) DESC LIMIT 10) top
+        ON top.original_author = r.original_author GROUP BY 1, 2"""),
+    ("top sources friends",
+     """SELECT t.source, t.sentiment, t.possibly_sensitive, SUM(t.friends_count) FROM TweetInformation t
+        JOIN (SELECT source FROM TweetInformation GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 3) top
+        ON top.source = t.source GROUP BY 1, 2, 3""",
+     """SELECT r.source, r.sentiment, r.possibly_sensitive, SUM(r.friends_count) FROM TweetRollupHourly r
+        JOIN (SELECT source FROM TweetRollupHourly GROUP BY 1 ORDER BY SUM(tweet_count) DESC LIMIT 3) top
+        ON top.source = r.source GROUP BY 1, 2, 3"""),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query, the median is reported")
+    args = parser.parse_args()
+
+    conn = connect("tweets_bench_new")
+    cur = conn.cursor()
+    start = time.perf_counter()
+    with open(MIGRATION_FILE) as f:
+        for command in f.read().split(";"):
+            if command.strip():
+                cur.execute(command)
+    conn.commit()
+    print(f"full rollup build: {time.perf_counter() - start:.1f}s")
+
+    print(f"{'chart':<25}{'raw table':>12}{'rollup':>12}{'speedup':>10}")
+    for name, raw_query, rollup_query in QUERIES:
+        raw = median_latency(cur, raw_query, (), args.repeat)
+        rollup = median_latency(cur, rollup_query, (), args.repeat)
+        print(f"{name:<25}{raw * 1000:>10.1f}ms{rollup * 1000:>10.1f}ms{raw / rollup:>9.1f}x")
+
+    # the same statements add_data.refresh_rollups runs after a load covering the newest hour
+    cur.execute("SELECT MAX(created_at) FROM TweetInformation")
+    newest = cur.fetchone()[0]
+    since = newest.replace(minute=0, second=0)
+    start = time.perf_counter()
+    cur.execute("DELETE FROM TweetRollupHourly WHERE hour >= %s", (since,))
+    cur.execute("""INSERT INTO TweetRollupHourly (hour, source, sentiment, possibly_sensitive, tweet_count,
+                                                  favorite_count, retweet_count, friends_count)
+                   SELECT TIMESTAMP(DATE(created_at), MAKETIME(HOUR(created_at), 0, 0)), source, COALESCE(sentiment, ''),
+                          COALESCE(possibly_sensitive, -1), COUNT(*), COALESCE(SUM(favorite_count), 0),
+                          COALESCE(SUM(retweet_count), 0), COALESCE(SUM(friends_count), 0)
+                   FROM TweetInformation WHERE created_at >= %s GROUP BY 1, 2, 3, 4""", (since,))
+    author_where = "WHERE original_author IN (SELECT original_author FROM TweetInformation WHERE created_at >= %s)"
+    cur.execute(f"DELETE FROM TweetAuthorRollup {author_where}", (since,))
+    cur.execute(f"""INSERT INTO TweetAuthorRollup (original_author, sentiment, tweet_count, retweet_count)
+                    SELECT COALESCE(original_author, ''), COALESCE(sentiment, ''), COUNT(*), COALESCE(SUM(retweet_count), 0)
+                    FROM TweetInformation {author_where} GROUP BY 1, 2""", (since,))
+    conn.commit()
+    print(f"incremental refresh of the newest hour: {(time.perf_counter() - start) * 1000:.1f}ms")
+    cur.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
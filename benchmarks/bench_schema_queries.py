@@ -0,0 +1,167 @@
+"""
+compares dashboard query latency on the untyped TweetInformation schema with
+the typed and indexed one in "Sql and streamlit/day5_schema.sql". both schemas
+are loaded with the same synthetic rows, each in its own database, and every
+query is timed a few times.
+
+needs a running mysql 8 server, configured with the MYSQL_HOST, MYSQL_USER and
+MYSQL_PASSWORD environment variables. the databases tweets_bench_old and
+tweets_bench_new are dropped and recreated.
+
+usage: python benchmarks/bench_schema_queries.py [--rows 10000000] [--repeat 5]
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+import mysql.connector as mysql
+import numpy as np
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit', 'day5_schema.sql')
+
+OLD_SCHEMA = """CREATE TABLE `TweetInformation`
+(
+    `id` INT NOT NULL AUTO_INCREMENT,
+    `created_at` TEXT NOT NULL,
+    `source` VARCHAR(200) NOT NULL,
+    `clean_text` TEXT DEFAULT NULL,
+    `sentiment` TEXT DEFAULT NULL,
+    `polarity` FLOAT DEFAULT NULL,
+    `subjectivity` FLOAT DEFAULT NULL,
+    `language` TEXT DEFAULT NULL,
+    `favorite_count` INT DEFAULT NULL,
+    `retweet_count` INT DEFAULT NULL,
+    `original_author` TEXT DEFAULT NULL,
+    `followers_count` INT DEFAULT NULL,
+    `friends_count` INT DEFAULT NULL,
+    `possibly_sensitive` TEXT DEFAULT NULL,
+    `hashtags` TEXT DEFAULT NULL,
+    `user_mentions` TEXT DEFAULT NULL,
+    `place` TEXT DEFAULT NULL,
+    `tweet_key` CHAR(40) NOT NULL,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_tweet_key` (`tweet_key`)
+)
+ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci"""
+
+COLUMNS = ["created_at", "source", "clean_text", "sentiment", "polarity", "subjectivity", "language", "favorite_count",
+           "retweet_count", "original_author", "followers_count", "friends_count", "possibly_sensitive", "hashtags",
+           "user_mentions", "place", "tweet_key"]
+
+SOURCES = np.array(["Twitter for iPhone", "Twitter Web App", "Twitter for Android", "TweetDeck", "Hootsuite Inc."])
+LANGUAGES = np.array(["en"] * 8 + ["fr", "es"])
+SENTIMENTS = np.array(["negative", "neutral", "positive"])
+PLACES = np.array(["Not provided", "Mass", "Nairobi Kenya", "United Kingdom", "Addis Ababa Ethiopia", "Lagos Nigeria"])
+HASHTAGS = np.array(["#covid19", "#vaccine", "#africa", "#red4research", "#lockdown", "#delta", "#health", "#who"])
+
+# (name, old schema query, new schema query, parameters)
+QUERIES = [
+    ("language filter", "SELECT COUNT(*) FROM TweetInformation WHERE language = %s",
+     "SELECT COUNT(*) FROM TweetInformation WHERE language = %s", ("fr",)),
+    ("place filter", "SELECT id, clean_text FROM TweetInformation WHERE place = %s LIMIT 1000",
+     "SELECT id, clean_text FROM TweetInformation WHERE place = %s LIMIT 1000", ("Lagos Nigeria",)),
+    ("one hour", "SELECT COUNT(*) FROM TweetInformation WHERE created_at >= %s AND created_at < %s",
+     "SELECT COUNT(*) FROM TweetInformation WHERE created_at >= %s AND created_at < %s",
+     ("2021-06-19 10:00:00", "2021-06-19 11:00:00")),
+    ("sentiment x sensitivity", "SELECT sentiment, possibly_sensitive, COUNT(*) FROM TweetInformation GROUP BY 1, 2",
+     "SELECT sentiment, possibly_sensitive, COUNT(*) FROM TweetInformation GROUP BY 1, 2", ()),
+    ("top 10 authors", "SELECT original_author, COUNT(*) c FROM TweetInformation GROUP BY 1 ORDER BY c DESC LIMIT 10",
+     "SELECT original_author, COUNT(*) c FROM TweetInformation GROUP BY 1 ORDER BY c DESC LIMIT 10", ()),
+    ("hashtag filter", "SELECT COUNT(*) FROM TweetInformation WHERE hashtags LIKE %s",
+     "SELECT COUNT(*) FROM TweetHashtag WHERE hashtag = %s", None),
+]
+
+
+def connect(database=None):
+    return mysql.connect(host=os.environ.get("MYSQL_HOST", "localhost"), user=os.environ.get("MYSQL_USER", "root"),
+                         password=os.environ.get("MYSQL_PASSWORD", ""), database=database)
+
+
+def synthetic_rows(start: int, n: int, rng: np.random.Generator) -> list:
+    seconds = rng.integers(0, 3 * 24 * 3600, n)
+    created_at = (np.datetime64("2021-06-18T00:00:00") + seconds.astype("timedelta64[s]")).astype(str)
+    tags = rng.integers(0, len(HASHTAGS) + 4, (n, 2))
+    polarity = rng.uniform(-1, 1, n).round(3)
+    rows = []
+    for i in range(n):
+        hashtags = " ".join(sorted({str(HASHTAGS[t]) for t in tags[i] if t < len(HASHTAGS)})) or " "
+        key = hashlib.sha1(str(start + i).encode()).hexdigest()
+        rows.append([str(created_at[i]).replace("T", " "), str(SOURCES[i % len(SOURCES)]), f"synthetic tweet {start + i} {hashtags}",
+                     str(SENTIMENTS[int(np.sign(polarity[i])) + 1]), float(polarity[i]), float(abs(polarity[i])),
+                     str(LANGUAGES[(start + i) % len(LANGUAGES)]), int(seconds[i] % 500), int(seconds[i] % 300),
+                     f"user{int(rng.integers(0, 100000))}", int(seconds[i] % 10000), int(seconds[i] % 3000),
+                     int(rng.random() < 0.05), hashtags, " ", str(PLACES[int(rng.integers(0, len(PLACES)))]), key])
+    return rows
+
+
+def load(rows_total: int, batch_size: int = 20000) -> None:
+    conn = connect()
+    cur = conn.cursor()
+    for database in ("tweets_bench_old", "tweets_bench_new"):
+        cur.execute(f"DROP DATABASE IF EXISTS {database}")
+        cur.execute(f"CREATE DATABASE {database} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cur.execute("USE tweets_bench_old")
+    cur.execute(OLD_SCHEMA)
+    cur.execute("USE tweets_bench_new")
+    with open(SCHEMA_FILE) as f:
+        for command in f.read().split(";"):
+            if command.strip():
+                cur.execute(command)
+
+    insert = f"INSERT INTO TweetInformation ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+    rng = np.random.default_rng(0)
+    for start in range(0, rows_total, batch_size):
+        rows = synthetic_rows(start, min(batch_size, rows_total - start), rng)
+        old_rows = [row[:12] + [str(bool(row[12]))] + row[13:] for row in rows]
+        cur.executemany(insert.replace("TweetInformation", "tweets_bench_old.TweetInformation"), old_rows)
+        cur.executemany(insert.replace("TweetInformation", "tweets_bench_new.TweetInformation"), rows)
+        # ids are assigned in insertion order starting at 1
+        links = [(tag, start + i + 1) for i, row in enumerate(rows) for tag in row[13].split()]
+        cur.executemany("INSERT INTO tweets_bench_new.TweetHashtag (hashtag, tweet_id) VALUES (%s, %s)", links)
+        conn.commit()
+        print(f"\rloaded {start + len(rows):,} rows", end="", file=sys.stderr)
+    print(file=sys.stderr)
+    cur.execute("ANALYZE TABLE tweets_bench_old.TweetInformation, tweets_bench_new.TweetInformation, tweets_bench_new.TweetHashtag")
+    cur.fetchall()
+    cur.close()
+    conn.close()
+
+
+def median_latency(cur, query: str, params: tuple, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="number of synthetic rows")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query, the median is reported")
+    parser.add_argument("--skip-load", action="store_true", help="reuse the tables of a previous run")
+    args = parser.parse_args()
+
+    if not args.skip_load:
+        load(args.rows)
+
+    old_conn, new_conn = connect("tweets_bench_old"), connect("tweets_bench_new")
+    old_cur, new_cur = old_conn.cursor(), new_conn.cursor()
+    print(f"{'query':<25}{'old schema':>12}{'new schema':>12}{'speedup':>10}")
+    for name, old_query, new_query, params in QUERIES:
+        old_params, new_params = (params, params) if params is not None else (("%#covid19%",), ("#covid19",))
+        old = median_latency(old_cur, old_query, old_params, args.repeat)
+        new = median_latency(new_cur, new_query, new_params, args.repeat)
+        print(f"{name:<25}{old * 1000:>10.1f}ms{new * 1000:>10.1f}ms{old / new:>9.1f}x")
+    old_conn.close()
+    new_conn.close()
+
+
+if __name__ == "__main__":
+    main()
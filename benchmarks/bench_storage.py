@@ -0,0 +1,66 @@
+"""
+compares reading the processed tweets from csv with reading them from the
+date partitioned parquet dataset written by tweet_storage, for a full load,
+a column projection and a filtered load. the processed csv is repeated to
+reach the requested number of rows.
+
+usage: python benchmarks/bench_storage.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tweet_storage import read_parquet, write_parquet
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed_tweets.csv')
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def disk_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of rows to benchmark with")
+    args = parser.parse_args()
+
+    sample = pd.read_csv(CSV_PATH)
+    df = pd.concat([sample] * (args.rows // len(sample) + 1), ignore_index=True).iloc[:args.rows]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "tweets.csv")
+        parquet_path = os.path.join(tmpdir, "tweets.parquet")
+        df.to_csv(csv_path, index=False)
+        write_parquet(df, parquet_path)
+
+        _, csv_full = timed(pd.read_csv, csv_path)
+        _, parquet_full = timed(read_parquet, parquet_path)
+        _, csv_columns = timed(pd.read_csv, csv_path, usecols=["sentiment", "polarity"])
+        _, parquet_columns = timed(read_parquet, parquet_path, columns=["sentiment", "polarity"])
+        _, csv_filter = timed(lambda: (lambda d: d[(d["lang"] == "en") & d["created_at"].str.startswith("2021-06-19")])(pd.read_csv(csv_path)))
+        _, parquet_filter = timed(read_parquet, parquet_path, filters=[("date", "==", "2021-06-19"), ("lang", "==", "en")])
+
+        print(f"rows:               {len(df):,}")
+        print(f"disk size:          csv {disk_size(csv_path) / 2 ** 20:.1f} MiB, parquet {disk_size(parquet_path) / 2 ** 20:.1f} MiB")
+        print(f"full load:          csv {csv_full:.2f}s, parquet {parquet_full:.2f}s")
+        print(f"two columns:        csv {csv_columns:.2f}s, parquet {parquet_columns:.2f}s")
+        print(f"one day, english:   csv {csv_filter:.2f}s, parquet {parquet_filter:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
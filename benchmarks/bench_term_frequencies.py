@@ -0,0 +1,60 @@
+"""
+compares a word cloud render fed by term_frequencies.TermFrequencies with the
+dashboard's old one, which filtered the frame, concatenated every clean_text
+with += and had WordCloud.generate tokenize and count the whole string again.
+WordCloud itself is left out, only the work before the layout is timed.
+
+usage: python benchmarks/bench_term_frequencies.py [--tweets 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extract_dataframe import TweetDfExtractor
+from term_frequencies import TermFrequencies, tokenize
+from benchmarks.synthetic import make_tweets
+
+
+def legacy_render(df, sentiment):
+    df = df[np.isin(df, sentiment).any(axis=1)].reset_index(drop=True)
+    cleanText = ''
+    for text in df['clean_text']:
+        tokens = str(text).lower().split()
+
+        cleanText += " ".join(tokens) + " "
+    return dict(Counter(tokenize(cleanText)).most_common(200))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=1_000_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    df = TweetDfExtractor(list(make_tweets(args.tweets))).get_tweet_df(typed=False)
+
+    legacy, legacy_time = timed(legacy_render, df, "positive")
+    term_frequencies, build_time = timed(TermFrequencies.from_df, df)
+    frequencies, query_time = timed(term_frequencies.frequencies, "positive")
+    assert legacy == frequencies, "word counts differ"
+
+    print(f"tweets:                 {args.tweets:,}")
+    print(f"legacy render:          {legacy_time:.2f}s per render")
+    print(f"TermFrequencies build:  {build_time:.2f}s (once, or incrementally at ingestion)")
+    print(f"TermFrequencies render: {query_time * 1000:.1f}ms ({legacy_time / query_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+compares text_processing.process_texts with the per-row cleaning it replaced,
+where every row ran uncompiled re.sub/re.findall calls on a lower cased copy
+of the cleaned text, and Clean_Tweets.remove_characters ran a lambda through
+Series.apply.
+
+usage: python benchmarks/bench_text_processing.py [--tweets 1000000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extract_dataframe import TweetDfExtractor
+from text_processing import process_texts, remove_place_characters
+from benchmarks.synthetic import PLACES, make_tweets
+
+
+def legacy_process_texts(texts: list) -> tuple:
+    clean = [re.sub(r"[^a-zA-Z0-9#@\s’,_]", "", text) for text in texts]
+    clean = [re.sub(r"\s+", " ", text) for text in clean]
+    hashtags = [" ".join(re.findall(r"(#[A-Za-z]+[A-Za-z0-9_-]+)", str(text).lower())) or " " for text in clean]
+    mentions = [" ".join(re.findall(r"(@[A-Za-z0-9_]+)", str(text).lower())) or " " for text in clean]
+    return clean, hashtags, mentions
+
+
+def legacy_remove_characters(column: pd.Series) -> pd.Series:
+    return column.apply(lambda text: re.sub(r"[^a-zA-Z0-9\s_-]", "", text))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=1_000_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    texts = TweetDfExtractor(list(make_tweets(args.tweets))).find_full_text()
+    places = pd.Series([place or "🇬🇧 London" for place in PLACES] * (args.tweets // len(PLACES)))
+
+    legacy, legacy_time = timed(legacy_process_texts, texts)
+    fused, fused_time = timed(process_texts, texts)
+    assert legacy == fused, "text processing results differ"
+
+    legacy_places, legacy_places_time = timed(legacy_remove_characters, places)
+    places_result, places_time = timed(remove_place_characters, places)
+    assert legacy_places.equals(places_result), "place cleaning results differ"
+
+    print(f"tweets:                   {args.tweets:,}")
+    print(f"clean/hashtags/mentions:  {legacy_time:.2f}s -> {fused_time:.2f}s ({legacy_time / fused_time:.1f}x)")
+    print(f"remove_characters:        {legacy_places_time:.2f}s -> {places_time:.2f}s ({legacy_places_time / places_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+compares taking a new dump into the topic model the way the notebook does,
+rebuilding the Dictionary and LdaModel over every clean_text seen so far and
+computing the c_v coherence over all of them, with updating an
+topic_model.OnlineTopicModel with the new chunk and computing the coherence on
+its bounded sample.
+
+usage: python benchmarks/bench_topic_model.py [--tweets 50000] [--chunk-size 5000] [--sample-size 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from text_processing import process_texts
+from topic_model import OnlineTopicModel
+from benchmarks.synthetic import make_tweets
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def rebuild(texts: list) -> float:
+    """the notebook's model, fitted from scratch on every text"""
+    from gensim import corpora
+    from gensim.models import CoherenceModel, LdaModel
+    word_list = [text.split() for text in texts]
+    id2word = corpora.Dictionary(word_list)
+    corpus = [id2word.doc2bow(words) for words in word_list]
+    lda_model = LdaModel(corpus, id2word=id2word, num_topics=5, random_state=100, update_every=1, chunksize=100,
+                         passes=10, alpha="auto", per_word_topics=True)
+    return CoherenceModel(model=lda_model, texts=word_list, dictionary=id2word, coherence="c_v").get_coherence()
+
+
+def update(topic_model: OnlineTopicModel, texts: list) -> float:
+    topic_model.update(texts)
+    return topic_model.coherence()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=50_000, help="number of synthetic tweets already seen")
+    parser.add_argument("--chunk-size", type=int, default=5_000, help="tweets of the new dump")
+    parser.add_argument("--sample-size", type=int, default=5_000, help="documents the coherence is computed on")
+    args = parser.parse_args()
+
+    texts, _, _ = process_texts([tweet["text"] for tweet in make_tweets(args.tweets + args.chunk_size)])
+    seen, new = texts[:args.tweets], texts[args.tweets:]
+    topic_model = OnlineTopicModel(sample_size=args.sample_size)
+    for start in range(0, len(seen), args.chunk_size):
+        topic_model.update(seen[start:start + args.chunk_size])
+
+    rebuilt, rebuild_time = timed(rebuild, texts)
+    updated, update_time = timed(update, topic_model, new)
+    print(f"tweets seen: {args.tweets:,}, new dump: {args.chunk_size:,}")
+    print(f"rebuild from scratch: {rebuild_time:.2f}s, coherence {rebuilt:.3f}")
+    print(f"online update:        {update_time:.2f}s, coherence {updated:.3f} ({rebuild_time / update_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
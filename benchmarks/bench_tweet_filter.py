@@ -0,0 +1,60 @@
+"""
+compares tweet_filter.TweetFilter with the np.isin(df, values).any(axis=1)
+filtering the dashboard used, which compared every cell of the frame against
+the selected values on every rerun.
+
+usage: python benchmarks/bench_tweet_filter.py [--tweets 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from extract_dataframe import TweetDfExtractor
+from tweet_filter import TweetFilter
+from benchmarks.synthetic import make_tweets
+
+
+def legacy_filter(df, values):
+    return df[np.isin(df, values).any(axis=1)].reset_index(drop=True)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=1_000_000, help="number of synthetic tweets")
+    args = parser.parse_args()
+
+    df = TweetDfExtractor(list(make_tweets(args.tweets))).get_tweet_df(typed=False)
+    sentiment = ["positive"]
+    lang = [df["lang"].value_counts().index[0]]
+
+    legacy_sentiment, legacy_sentiment_time = timed(legacy_filter, df, sentiment)
+    tweet_filter, build_time = timed(TweetFilter, df)
+    result, filter_time = timed(tweet_filter.filter, sentiment=sentiment)
+    assert legacy_sentiment.equals(result), "sentiment filter results differ"
+
+    combined, combined_time = timed(tweet_filter.filter, sentiment=sentiment, lang=lang)
+    hashtag = tweet_filter.options("hashtags")[0]
+    _, hashtag_time = timed(tweet_filter.filter, hashtags=[hashtag])
+
+    print(f"tweets:                 {args.tweets:,}")
+    print(f"np.isin sentiment:      {legacy_sentiment_time:.3f}s")
+    print(f"TweetFilter build:      {build_time:.3f}s (once per data load)")
+    print(f"sentiment:              {filter_time * 1000:.1f}ms ({legacy_sentiment_time / filter_time:.0f}x)")
+    print(f"sentiment and lang:     {combined_time * 1000:.1f}ms, {len(combined):,} rows")
+    print(f"hashtag {hashtag}: {hashtag_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+synthetic tweets shaped like the twitter streaming api payloads read by
+extract_dataframe.py, used by the benchmarks so they don't need a real dump
+"""
+
+import json
+import random
+
+WORDS = ("covid vaccine africa good bad great terrible happy sad health people world news today wave third "
+         "#covid19 #vaccine #red4research @whoafro @cdcgov @nhsuk the a is of and to in 🚨 😷 ’ https://t.co/CRDhqPHFWM").split()
+SOURCES = ['<a href="http://twitter.com/download/iphone" rel="nofollow">Twitter for iPhone</a>',
+           '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+           '<a href="http://twitter.com/download/android" rel="nofollow">Twitter for Android</a>',
+           '<a href="https://about.twitter.com/products/tweetdeck" rel="nofollow">TweetDeck</a>']
+LANGS = ["en"] * 8 + ["fr", "es"]
+PLACES = ["Mass", "Nairobi, Kenya", None, "", "United Kingdom", "Addis Ababa, Ethiopia"]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25)))
+
+
+def make_tweets(n: int, seed: int = 0, retweet_ratio: float = 0.6, shared_texts: int = 500):
+    """
+    generate n tweet dicts. about retweet_ratio of them are retweets whose
+    full text is drawn from a pool of shared_texts texts, like a real feed
+    """
+    rng = random.Random(seed)
+    pool = [_text(rng) for _ in range(shared_texts)]
+    for i in range(n):
+        tweet = {
+            "created_at": "Fri Jun %d %02d:%02d:%02d +0000 2021" % (18 + (3 * i) // max(n, 1), rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)),
+            "id": 1405000000000000000 + i,
+            "text": _text(rng),
+            "source": rng.choice(SOURCES),
+            "lang": rng.choice(LANGS),
+            "favorite_count": rng.randint(0, 50),
+            "retweet_count": rng.randint(0, 50),
+            "user": {"screen_name": "user%d" % rng.randint(0, 5000), "statuses_count": rng.randint(0, 10 ** 5),
+                     "followers_count": rng.randint(0, 10 ** 5), "friends_count": rng.randint(0, 10 ** 4),
+                     "location": rng.choice(PLACES)},
+        }
+        if rng.random() < retweet_ratio:
+            retweet = {"favorite_count": rng.randint(0, 5000), "retweet_count": rng.randint(0, 5000), "lang": tweet["lang"]}
+            if rng.random() < 0.8:
+                retweet["extended_tweet"] = {"full_text": rng.choice(pool)}
+            if rng.random() < 0.7:
+                retweet["possibly_sensitive"] = rng.random() < 0.1
+            tweet["retweeted_status"] = retweet
+        yield tweet
+
+
+def write_json(path: str, n: int, seed: int = 0, **kwargs) -> str:
+    """write n synthetic tweets as a json lines file and return its path"""
+    with open(path, "w") as f:
+        for tweet in make_tweets(n, seed, **kwargs):
+            f.write(json.dumps(tweet) + "\n")
+    return path
@@ -1,6 +1,23 @@
+import numpy as np
 import pandas as pd
 import re
 
+from text_processing import remove_place_characters
+from tweet_schema import COUNT_COLUMNS, FLOAT_COLUMNS, apply_schema, to_count
+from tweet_storage import parse_created_at
+
+# the cleaning the preprocessing notebook runs, in order: a Clean_Tweets method name and its arguments
+CLEANING_STEPS = (
+    ("drop_duplicates",),
+    ("remove_non_english_tweets",),
+    ("fill_missing", "place", "Not provided"),
+    ("fill_missing", "possibly_sensitive", "unknown"),
+    ("remove_characters", "place"),
+    ("replace_empty_string", "place", "Not provided"),
+    ("convert_to_datetime",),
+    ("extract_device_name", "source"),
+)
+
 class Clean_Tweets:
     """
     The PEP8 Standard AMAZING!!!
@@ -30,27 +47,36 @@ class Clean_Tweets:
 
     def convert_to_datetime(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        convert column to datetime
+        convert column to tz-aware utc datetime
         """
 
-        df['created_at'] = pd.to_datetime(df['created_at'])
+        df['created_at'] = parse_created_at(df['created_at'])
 
         return df
 
     def convert_to_numbers(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         convert columns like polarity, subjectivity, retweet_count
-        favorite_count etc to numbers
+        favorite_count etc to numbers, float32 for the scores and
+        32 bit unsigned integers for the counts
         """
 
-        df["polarity"] = pd.to_numeric(df["polarity"])
-        df["subjectivity"] = pd.to_numeric(df["subjectivity"])
-        df["retweet_count"] = pd.to_numeric(df["retweet_count"])
-        df["favorite_count"] = pd.to_numeric(df["favorite_count"])
-        df["friends_count"] = pd.to_numeric(df["friends_count"])
+        for column in FLOAT_COLUMNS:
+            df[column] = pd.to_numeric(df[column]).astype("float32")
+        for column in COUNT_COLUMNS:
+            if column in df.columns:
+                df[column] = to_count(df[column])
 
         return df
 
+    def convert_to_compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        convert every known column to the compact dtypes of tweet_schema,
+        categoricals for the low cardinality text columns included
+        """
+
+        return apply_schema(df)
+
     def remove_non_english_tweets(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         remove non english tweets from lang
@@ -65,6 +91,8 @@ class Clean_Tweets:
         fill null values of a specific column with the provided value
         """
 
+        if isinstance(df[column].dtype, pd.CategoricalDtype) and value not in df[column].cat.categories:
+            df[column] = df[column].cat.add_categories([value])
         df[column] = df[column].fillna(value)
 
         return df
@@ -84,7 +112,7 @@ class Clean_Tweets:
         from the specified column
         """
 
-        df[column] = df[column].apply(lambda text: re.sub("[^a-zA-Z0-9\s_-]", "", text))
+        df[column] = remove_place_characters(df[column])
 
         return df
 
@@ -93,4 +121,67 @@ class Clean_Tweets:
         returns device name from source text
         """
         res = re.split('<|>', source)[2].strip()
-        return res
\ No newline at end of file
+        return res
+
+    def _value_step(self, name: str, args: tuple):
+        """
+        the function a column step applies to a series of distinct values
+        """
+        if name == "fill_missing":
+            value = args[1]
+            return lambda values: values.fillna(value)
+        if name == "remove_characters":
+            return remove_place_characters
+        if name == "replace_empty_string":
+            value = args[1]
+            return lambda values: values.mask(values == "", value)
+        if name == "extract_device_name":
+            return lambda values: values.map(self.extract_device_name)
+        raise ValueError(f"unknown cleaning step: {name}")
+
+    def clean(self, df: pd.DataFrame, steps: tuple = CLEANING_STEPS) -> pd.DataFrame:
+        """
+        runs cleaning steps, given like CLEANING_STEPS, fused into few passes:
+        drop_duplicates and remove_non_english_tweets become one mask applied
+        once, and the fill_missing, remove_characters, replace_empty_string and
+        extract_device_name steps of a column run once per distinct value of
+        the column before being spread back to the kept rows. the input frame
+        is left untouched and the result matches running the steps one by one
+        """
+
+        keep = np.ones(len(df), dtype=bool)
+        value_steps = {}
+        convert_datetime = False
+        for name, *args in steps:
+            if name == "drop_duplicates":
+                if value_steps or convert_datetime:
+                    raise ValueError("drop_duplicates has to come before the column steps")
+                keep &= ~df.duplicated().to_numpy()
+            elif name == "remove_non_english_tweets":
+                if "lang" in value_steps:
+                    raise ValueError("remove_non_english_tweets has to come before the steps on lang")
+                keep &= (df["lang"] == "en").to_numpy()
+            elif name == "convert_to_datetime":
+                convert_datetime = True
+            else:
+                value_steps.setdefault(args[0], []).append(self._value_step(name, args))
+
+        columns = {}
+        for column in df.columns:
+            values = df[column][keep] if not keep.all() else df[column]
+            if column in value_steps:
+                codes, uniques = pd.factorize(values)
+                uniques = np.asarray(uniques, dtype=object)
+                if (codes == -1).any():
+                    # missing values are coded -1, which picks a missing value appended after the uniques
+                    uniques = np.append(uniques, np.nan)
+                uniques = pd.Series(uniques, dtype=object)
+                for step in value_steps[column]:
+                    uniques = step(uniques)
+                cleaned = pd.Series(uniques.to_numpy(dtype=object)[codes], index=values.index, name=column)
+                values = cleaned.astype("category") if isinstance(values.dtype, pd.CategoricalDtype) else cleaned.astype(values.dtype)
+            elif column == "created_at" and convert_datetime:
+                values = parse_created_at(values)
+            columns[column] = values
+
+        return pd.DataFrame(columns, index=df.index[keep])
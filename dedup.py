@@ -0,0 +1,227 @@
+import hashlib
+import sqlite3
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# modulus of the minhash permutations, the products of two values below it fit in 64 bits
+_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text) -> str:
+    """
+    lower cased text with its whitespace collapsed, the form two tweets
+    are compared in
+    """
+    return " ".join(str(text).lower().split()) if isinstance(text, str) else ""
+
+
+def shingles(text: str) -> list:
+    """
+    word bigrams of a normalized text, or its single word
+    """
+    words = text.split()
+    if len(words) < 2:
+        return words
+    return [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class DedupIndex:
+    """
+    persistent index mapping tweet texts to canonical tweets, shared by every
+    ingest so that a text seen in an earlier dump is recognised in the next.
+
+    a text is first looked up by a hash of its normalized form, which catches
+    exact duplicates such as the retweets of a tweet. a new text is then
+    compared to the canonical texts by minhash signatures of its word bigrams:
+    locality sensitive hashing of the signatures in bands gives the candidates,
+    and the first candidate whose estimated jaccard similarity reaches threshold
+    becomes its canonical. otherwise the text is a new canonical tweet.
+
+    Args:
+    -----
+    db_path: str - sqlite file of the index, None keeps it in memory
+    num_perm: int - number of minhash permutations
+    bands: int - number of lsh bands, num_perm has to be a multiple of it
+    threshold: float - estimated jaccard similarity from which two texts are near duplicates
+    seed: int - random state of the permutations, has to stay the same for a given db_path
+    """
+
+    def __init__(self, db_path: str = None, num_perm: int = 64, bands: int = 8, threshold: float = 0.8,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)[:, None]
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)[:, None]
+        self._db = sqlite3.connect(db_path or ":memory:")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS canonical (id INTEGER PRIMARY KEY, signature BLOB, count INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS exact (key TEXT PRIMARY KEY, canonical_id INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS bucket (bucket INTEGER NOT NULL, canonical_id INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS bucket_index ON bucket (bucket);
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def key(text: str) -> str:
+        """sha1 of a normalized text"""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def signatures(self, texts: list, batch_size: int = 1000) -> np.ndarray:
+        """
+        minhash signatures of normalized texts, one row of num_perm values per
+        text. the texts are hashed batch_size at a time, all the shingles of a
+        batch in one pass, so the permuted hashes take num_perm values per
+        shingle of a single batch. texts without words get an empty row of
+        the largest value, which no near duplicate lookup matches
+        """
+        if len(texts) <= batch_size:
+            return self._signatures(texts)
+        return np.vstack([self._signatures(texts[start:start + batch_size])
+                          for start in range(0, len(texts), batch_size)])
+
+    def _signatures(self, texts: list) -> np.ndarray:
+        hashes = [np.array([zlib.crc32(s.encode("utf-8")) for s in shingles(text)], dtype=np.uint64) for text in texts]
+        lengths = np.array([len(h) for h in hashes])
+        signatures = np.full((len(texts), self.num_perm), _PRIME, dtype=np.uint64)
+        filled = lengths > 0
+        if filled.any():
+            flat = np.concatenate([h for h in hashes if len(h)])
+            permuted = (self._a * (flat[None, :] % _PRIME) + self._b) % _PRIME
+            offsets = np.concatenate([[0], np.cumsum(lengths[filled])[:-1]])
+            signatures[filled] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return signatures
+
+    def _buckets(self, signature: np.ndarray) -> list:
+        # the band number in the high bits keeps equal slices of different bands apart
+        return [(band << 32) | zlib.crc32(band_rows.tobytes())
+                for band, band_rows in enumerate(signature.reshape(self.bands, -1))]
+
+    def _query(self, sql: str, values: list) -> list:
+        rows = []
+        # stay below sqlite's limit on the number of bound parameters
+        for i in range(0, len(values), 500):
+            batch = values[i:i + 500]
+            rows += self._db.execute(sql % ", ".join("?" * len(batch)), batch).fetchall()
+        return rows
+
+    def assign(self, texts) -> tuple:
+        """
+        maps a batch of texts to canonical tweets, adding the new ones to the index
+        Args:
+        -----
+        texts: list - texts of the tweets, e.g. their clean_text
+
+        Returns
+        -------
+        canonical id of every text, and whether each text is the one that
+        created its canonical tweet
+        """
+
+        normalized = [normalize_text(text) for text in texts]
+        keys = [self.key(text) for text in normalized]
+        known = dict(self._query("SELECT key, canonical_id FROM exact WHERE key IN (%s)", list(set(keys))))
+
+        # texts of the batch new to the index, once each in order of first appearance
+        new = {}
+        for key, text in zip(keys, normalized):
+            if key not in known and key not in new and text:
+                new[key] = text
+        new_keys = list(new)
+        signatures = self.signatures([new[key] for key in new_keys])
+        row_buckets = [self._buckets(signature) for signature in signatures]
+        candidates = {}
+        for bucket, canonical_id in self._query("SELECT bucket, canonical_id FROM bucket WHERE bucket IN (%s)",
+                                                list({bucket for buckets in row_buckets for bucket in buckets})):
+            candidates.setdefault(bucket, []).append(canonical_id)
+        canonical_signatures = dict(self._query(
+            "SELECT id, signature FROM canonical WHERE id IN (%s)",
+            list({canonical_id for ids in candidates.values() for canonical_id in ids})))
+        canonical_signatures = {canonical_id: np.frombuffer(blob, dtype=np.uint64)
+                                for canonical_id, blob in canonical_signatures.items()}
+
+        created = set()
+        for key, signature, buckets in zip(new_keys, signatures, row_buckets):
+            canonical_id = None
+            for candidate in sorted({c for bucket in buckets for c in candidates.get(bucket, ())}):
+                if np.mean(canonical_signatures[candidate] == signature) >= self.threshold:
+                    canonical_id = candidate
+                    break
+            if canonical_id is None:
+                canonical_id = self._db.execute("INSERT INTO canonical (signature, count) VALUES (?, 0)",
+                                                (signature.tobytes(),)).lastrowid
+                created.add(key)
+                canonical_signatures[canonical_id] = signature
+                self._db.executemany("INSERT INTO bucket VALUES (?, ?)", [(bucket, canonical_id) for bucket in buckets])
+                # later texts of the batch find it like the canonicals of earlier ingests
+                for bucket in buckets:
+                    candidates.setdefault(bucket, []).append(canonical_id)
+            known[key] = canonical_id
+        self._db.executemany("INSERT INTO exact VALUES (?, ?)", [(key, known[key]) for key in new_keys])
+
+        # texts without words share one canonical tweet
+        if any(not text for text in normalized) and self.key("") not in known:
+            canonical_id = self._db.execute("INSERT INTO canonical (signature, count) VALUES (NULL, 0)").lastrowid
+            self._db.execute("INSERT INTO exact VALUES (?, ?)", (self.key(""), canonical_id))
+            known[self.key("")] = canonical_id
+            created.add(self.key(""))
+
+        canonical_ids = np.array([known[key] for key in keys], dtype=np.int64)
+        is_canonical = np.zeros(len(keys), dtype=bool)
+        seen = set()
+        for i, key in enumerate(keys):
+            if key in created and key not in seen:
+                is_canonical[i] = True
+                seen.add(key)
+        ids, counts = np.unique(canonical_ids, return_counts=True)
+        self._db.executemany("UPDATE canonical SET count = count + ? WHERE id = ?",
+                             zip(counts.tolist(), ids.tolist()))
+        self._db.commit()
+        return canonical_ids, is_canonical
+
+    def counts(self, canonical_ids) -> np.ndarray:
+        """
+        number of tweets mapped to each of canonical_ids over every ingest
+        """
+        canonical_ids = np.asarray(canonical_ids, dtype=np.int64)
+        found = dict(self._query("SELECT id, count FROM canonical WHERE id IN (%s)", np.unique(canonical_ids).tolist()))
+        return np.array([found.get(canonical_id, 0) for canonical_id in canonical_ids.tolist()], dtype=np.int64)
+
+    def stats(self) -> dict:
+        canonical, tweets = self._db.execute("SELECT COUNT(*), COALESCE(SUM(count), 0) FROM canonical").fetchone()
+        return {"canonical": canonical, "tweets": tweets, "texts": self._db.execute("SELECT COUNT(*) FROM exact").fetchone()[0]}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def deduplicate(df: pd.DataFrame, index: DedupIndex, column: str = "clean_text") -> pd.DataFrame:
+    """
+    adds the canonical tweet of every row to a tweets dataframe
+    Args:
+    -----
+    df: pd.DataFrame - tweets, e.g. a chunk of stream_tweet_df
+    index: DedupIndex - index shared by every ingest
+    column: str - column holding the texts compared
+
+    Returns
+    -------
+    copy of df with canonical_id, is_canonical (the row that created its
+    canonical tweet, the only one to process downstream) and duplicate_count
+    (tweets mapped to the canonical over every ingest so far)
+    """
+
+    canonical_ids, is_canonical = index.assign(df[column].to_numpy(dtype=object))
+    df = df.copy()
+    df["canonical_id"] = canonical_ids
+    df["is_canonical"] = is_canonical
+    df["duplicate_count"] = index.counts(canonical_ids)
+    return df
@@ -0,0 +1,168 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# space separated entity columns produced by process_texts
+ENTITY_COLUMNS = ["hashtags", "user_mentions"]
+
+
+class EntityIndex:
+    """
+    inverted index of a space separated entity column such as hashtags or
+    user_mentions.
+
+    the vocabulary keeps the entities in order of first appearance, the tweets
+    holding entity i are rows[indptr[i]:indptr[i + 1]] in increasing order and
+    counts[i] is the number of those tweets. the same entries are also kept
+    grouped by tweet, entry_codes[row_indptr[r]:row_indptr[r + 1]], for the
+    co-occurrence queries.
+
+    Args:
+    -----
+    column: list or pd.Series - space separated entities per tweet, " " or None when there are none
+    """
+
+    def __init__(self, column):
+        tokens = [value.split() if isinstance(value, str) else [] for value in column]
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        flat = np.array(list(itertools.chain.from_iterable(tokens)), dtype=object)
+        entry_rows = np.repeat(np.arange(len(tokens), dtype=np.int64), lengths)
+        codes, vocabulary = pd.factorize(flat)
+
+        # a tweet repeating an entity is counted once, the keys come back sorted by row then entity
+        size = max(len(vocabulary), 1)
+        keys = np.unique(entry_rows * size + codes)
+        self.entry_rows, self.entry_codes = keys // size, keys % size
+        self.row_indptr = np.concatenate([[0], np.cumsum(np.bincount(self.entry_rows, minlength=len(tokens)))])
+
+        # a stable sort keeps the rows of every entity in increasing order
+        self.rows = self.entry_rows[np.argsort(self.entry_codes, kind="stable")]
+        self.counts = np.bincount(self.entry_codes, minlength=len(vocabulary))
+        self.indptr = np.concatenate([[0], np.cumsum(self.counts)])
+        self.vocabulary = pd.Index(vocabulary, dtype=object)
+        self.n_rows = len(tokens)
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """memory held by the arrays and the vocabulary of the index"""
+        arrays = [self.entry_rows, self.entry_codes, self.row_indptr, self.rows, self.counts, self.indptr]
+        return sum(array.nbytes for array in arrays) + int(self.vocabulary.memory_usage(deep=True))
+
+    def postings(self, entity: str) -> np.ndarray:
+        """
+        rows of the tweets holding entity, in increasing order
+        """
+        i = self.vocabulary.get_indexer([entity])[0]
+        if i < 0:
+            return np.array([], dtype=np.int64)
+        return self.rows[self.indptr[i]:self.indptr[i + 1]]
+
+    def top(self, k: int = 10) -> pd.Series:
+        """
+        the k entities found in the most tweets with their tweet counts,
+        ties in order of first appearance
+        """
+        order = np.argsort(-self.counts, kind="stable")[:k]
+        return pd.Series(self.counts[order], index=self.vocabulary[order], name="count")
+
+    def rows_with_any(self, entities: list) -> np.ndarray:
+        """
+        boolean mask of the tweets holding at least one of entities
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for entity in entities:
+            mask[self.postings(entity)] = True
+        return mask
+
+    def rows_with_all(self, entities: list) -> np.ndarray:
+        """
+        boolean mask of the tweets holding every one of entities
+        """
+        postings = sorted((self.postings(entity) for entity in set(entities)), key=len)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if not postings:
+            return ~mask
+        rows = postings[0]
+        # intersecting the shortest posting lists first keeps every step small
+        for other in postings[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        mask[rows] = True
+        return mask
+
+    def co_occurring(self, entities, k: int = 10) -> pd.Series:
+        """
+        the k entities most often found in the tweets that hold all of entities,
+        with the number of those tweets they appear in
+        """
+        if isinstance(entities, str):
+            entities = [entities]
+        selected = self.rows_with_all(entities)[self.entry_rows]
+        counts = np.bincount(self.entry_codes[selected], minlength=len(self.vocabulary))
+        found = self.vocabulary.get_indexer(list(entities))
+        counts[found[found >= 0]] = 0
+        order = np.argsort(-counts, kind="stable")[:k]
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=self.vocabulary[order], name="count")
+
+    def entities_of(self, row: int) -> list:
+        """
+        the distinct entities of one tweet, in order of first appearance in the data
+        """
+        codes = self.entry_codes[self.row_indptr[row]:self.row_indptr[row + 1]]
+        return self.vocabulary[codes].tolist()
+
+
+def build_entity_indexes(df, columns: list = ENTITY_COLUMNS) -> dict:
+    """
+    build an EntityIndex for each entity column
+    Args:
+    -----
+    df: pd.DataFrame or dict - tweets, or the columns of TweetDfExtractor.extract_columns
+    columns: list - entity columns to index
+
+    Returns
+    -------
+    dict of column name to EntityIndex
+    """
+
+    return {column: EntityIndex(df[column]) for column in columns}
+
+
+def save_entity_indexes(indexes: dict, path: str):
+    """
+    write entity indexes to a single uncompressed .npz file, so that they can be
+    loaded without re-splitting the entity columns
+    """
+
+    arrays = {}
+    for column, index in indexes.items():
+        arrays[f"{column}.vocabulary"] = np.array(index.vocabulary.tolist(), dtype=str)
+        for name in ("entry_rows", "entry_codes", "row_indptr", "rows", "counts", "indptr"):
+            arrays[f"{column}.{name}"] = getattr(index, name)
+    np.savez(path, **arrays)
+
+
+def load_entity_indexes(path: str) -> dict:
+    """
+    read entity indexes written by save_entity_indexes
+    Returns
+    -------
+    dict of column name to EntityIndex
+    """
+
+    indexes = {}
+    with np.load(path) as arrays:
+        for key in arrays.files:
+            column, name = key.rsplit(".", 1)
+            index = indexes.setdefault(column, EntityIndex.__new__(EntityIndex))
+            if name == "vocabulary":
+                index.vocabulary = pd.Index(arrays[key].tolist(), dtype=object)
+            else:
+                setattr(index, name, arrays[key])
+    for index in indexes.values():
+        index.n_rows = len(index.row_indptr) - 1
+    return indexes
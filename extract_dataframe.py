@@ -1,185 +1,481 @@
-import re
 import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, NamedTuple
+
 import pandas as pd
-from textblob import TextBlob, sentiments
 
+from entity_index import ENTITY_COLUMNS, build_entity_indexes, save_entity_indexes
+from sentiment import SentimentCache, score_sentiments
+from text_processing import clean_text, extract_hashtags, process_texts
+from tweet_schema import apply_schema
+from tweet_storage import TWITTER_TIME_FORMAT, write_parquet
+
+# columns of get_tweet_df, in order
+TWEET_DF_COLUMNS = ["created_at", "source", "original_text", "clean_text", "sentiment", "polarity", "subjectivity", "lang",
+                    "favorite_count", "retweet_count", "original_author", "followers_count", "friends_count",
+                    "possibly_sensitive", "hashtags", "user_mentions", "place"]
+# columns derived from original_text, by process_texts and by sentiment scoring
+TEXT_COLUMNS = ["clean_text", "hashtags", "user_mentions"]
+SENTIMENT_COLUMNS = ["polarity", "subjectivity", "sentiment"]
+# textblob scores every tweet, sklearn runs the persisted classifier of inference.py
+SENTIMENT_BACKENDS = ["textblob", "sklearn"]
+
+
+def _to_utc(value) -> datetime:
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    return (value.tz_localize("UTC") if value.tzinfo is None else value.tz_convert("UTC")).to_pydatetime()
+
+
+# every "lang" string of a json line whatever its spacing, the tweet's own lang is one of them
+_LANG_VALUE = re.compile(r'"lang"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _json_string(value: str) -> str:
+    """the text of a json string literal's content, e.g. \\u0065n for en"""
+    return json.loads(f'"{value}"') if "\\" in value else value
+
+
+class TweetPredicate:
+    """
+    selects tweets while they are read, before they are extracted, scored
+    and put in a dataframe. every condition given has to hold.
+
+    Args:
+    -----
+    lang: str or list - accepted values of the tweet's lang
+    since: str or datetime - earliest created_at kept, inclusive, utc when naive
+    until: str or datetime - created_at before which tweets are kept, exclusive
+    has_hashtag: bool - keep only tweets with (True) or without (False) a hashtag in their full text
+    """
 
-def read_json(json_file: str) -> list:
+    def __init__(self, lang=None, since=None, until=None, has_hashtag: bool = None):
+        self.lang = None if lang is None else frozenset([lang] if isinstance(lang, str) else lang)
+        self.since = _to_utc(since)
+        self.until = _to_utc(until)
+        self.has_hashtag = has_hashtag
+
+    def line_may_match(self, line: str) -> bool:
+        """
+        cheap test on a raw json line, False only for lines whose tweet can't match,
+        so that most of the unwanted tweets are never parsed
+        """
+        if self.lang is not None and not any(_json_string(value) in self.lang for value in _LANG_VALUE.findall(line)):
+            return False
+        if self.has_hashtag and "#" not in line:
+            return False
+        return True
+
+    def matches(self, tweet: dict) -> bool:
+        if self.lang is not None and tweet.get("lang") not in self.lang:
+            return False
+        if self.since is not None or self.until is not None:
+            created_at = datetime.strptime(tweet["created_at"], TWITTER_TIME_FORMAT)
+            if self.since is not None and created_at < self.since:
+                return False
+            if self.until is not None and created_at >= self.until:
+                return False
+        if self.has_hashtag is not None:
+            # the same hashtags the hashtags column would get
+            text = _first_present(tweet, _ORIGINAL_TEXT.paths)
+            if (extract_hashtags(clean_text(text)) != " ") != self.has_hashtag:
+                return False
+        return True
+
+
+def _parse_lines(lines, predicate: TweetPredicate = None):
+    for line in lines:
+        if predicate is None:
+            yield json.loads(line)
+        elif predicate.line_may_match(line):
+            tweet = json.loads(line)
+            if predicate.matches(tweet):
+                yield tweet
+
+
+def _read_line_range(json_file: str, start: int, end: int) -> list:
+    """the lines between two byte offsets of a file, which have to fall on line starts"""
+    with open(json_file, "rb") as f:
+        f.seek(start)
+        data = f.read(None if end is None else end - start)
+    # split on newlines only, str.splitlines would also split on separators json strings may hold
+    lines = data.decode("utf-8").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def read_json(json_file: str, predicate: TweetPredicate = None, start: int = 0, end: int = None) -> list:
     """
     json file reader to open and read json files into a list
     Args:
     -----
     json_file: str - path of a json file
+    predicate: TweetPredicate - optional filter, the other tweets are skipped while reading
+    start: int - byte offset of the first line read, e.g. a shard boundary from ingest.plan_shards
+    end: int - byte offset where reading stops, None for the end of the file
 
     Returns
     -------
     length of the json file and a list of json
     """
 
-    tweets_data = []
-    for tweets in open(json_file, "r"):
-        tweets_data.append(json.loads(tweets))
+    if start or end is not None:
+        tweets_data = list(_parse_lines(_read_line_range(json_file, start, end), predicate))
+    else:
+        with open(json_file, "r") as f:
+            tweets_data = list(_parse_lines(f, predicate))
 
     return len(tweets_data), tweets_data
 
 
+def iter_json_chunks(json_file: str, chunk_size: int = 10000, predicate: TweetPredicate = None):
+    """
+    lazily read a json lines file in chunks so that only one chunk
+    of tweets is held in memory at a time
+    Args:
+    -----
+    json_file: str - path of a json file
+    chunk_size: int - maximum number of tweets per chunk
+    predicate: TweetPredicate - optional filter, the other tweets are skipped while reading
+
+    Returns
+    -------
+    generator of lists of at most chunk_size json objects
+    """
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    chunk = []
+    with open(json_file, "r") as f:
+        for tweet in _parse_lines(f, predicate):
+            chunk.append(tweet)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_tweet_df(json_file: str, chunk_size: int = 10000, sentiment_processes: int = 1,
+                    sentiment_cache: SentimentCache = None, predicate: TweetPredicate = None, columns: list = None,
+                    sentiment_backend: str = "textblob"):
+    """
+    extract a json lines file into dataframes one chunk at a time.
+    the row index continues across chunks, so concatenating the chunks with
+    tweet_schema.concat_tweet_dfs gives the same dataframe as
+    TweetDfExtractor(tweets).get_tweet_df()
+    Args:
+    -----
+    json_file: str - path of a json file
+    chunk_size: int - maximum number of tweets per chunk
+    sentiment_processes: int - size of the sentiment scoring process pool
+    sentiment_cache: SentimentCache - cache shared by all the chunks
+    predicate: TweetPredicate - optional filter applied while the file is read
+    columns: list - columns of the dataframes, all of TWEET_DF_COLUMNS by default
+    sentiment_backend: str - one of SENTIMENT_BACKENDS
+
+    Returns
+    -------
+    generator of dataframes
+    """
+
+    # one pool scores the sentiments of every chunk, its workers start when a chunk first needs them
+    executor = None
+    if sentiment_backend == "textblob" and (sentiment_processes is None or sentiment_processes > 1):
+        executor = ProcessPoolExecutor(max_workers=sentiment_processes)
+    offset = 0
+    try:
+        for tweets in iter_json_chunks(json_file, chunk_size, predicate):
+            df = TweetDfExtractor(tweets, sentiment_processes, sentiment_cache, columns=columns,
+                                  sentiment_backend=sentiment_backend, sentiment_executor=executor).get_tweet_df()
+            df.index += offset
+            offset += len(df)
+            yield df
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def save_tweet_df_stream(json_file: str, output_file: str, chunk_size: int = 10000, sentiment_processes: int = 1,
+                         sentiment_cache: SentimentCache = None, predicate: TweetPredicate = None,
+                         columns: list = None, sentiment_backend: str = "textblob") -> int:
+    """
+    extract a json lines file chunk by chunk and append every chunk to a csv
+    file, so memory use depends on chunk_size and not on the size of the file
+    Args:
+    -----
+    json_file: str - path of a json file
+    output_file: str - path of the csv file to write
+    chunk_size: int - maximum number of tweets per chunk
+    sentiment_processes: int - size of the sentiment scoring process pool
+    sentiment_cache: SentimentCache - cache shared by all the chunks
+    predicate: TweetPredicate - optional filter applied while the file is read
+    columns: list - columns written, all of TWEET_DF_COLUMNS by default
+    sentiment_backend: str - one of SENTIMENT_BACKENDS
+
+    Returns
+    -------
+    number of rows written
+    """
+
+    rows = 0
+    for df in stream_tweet_df(json_file, chunk_size, sentiment_processes, sentiment_cache, predicate, columns,
+                              sentiment_backend):
+        df.to_csv(output_file, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+        rows += len(df)
+
+    if rows == 0:
+        TweetDfExtractor([], columns=columns).get_tweet_df().to_csv(output_file, index=False)
+
+    return rows
+
+
+_REQUIRED = object()
+
+
+class TweetField(NamedTuple):
+    """
+    declarative description of a column read from every tweet: the value at
+    the first of `paths` that exists in the tweet, otherwise `default`.
+    a field without a default is required and raises KeyError when missing
+    """
+    name: str
+    paths: tuple
+    default: Any = _REQUIRED
+
+
+# retweets carry the full text and the engagement counts of the original tweet,
+# so those fields look inside retweeted_status first and fall back to the tweet
+TWEET_FIELDS = (
+    TweetField("created_at", (("created_at",),)),
+    TweetField("source", (("source",),)),
+    TweetField("original_text", (("retweeted_status", "extended_tweet", "full_text"), ("text",))),
+    TweetField("lang", (("lang",),)),
+    TweetField("favorite_count", (("retweeted_status", "favorite_count"), ("favorite_count",))),
+    TweetField("retweet_count", (("retweeted_status", "retweet_count"), ("retweet_count",))),
+    TweetField("original_author", (("user", "screen_name"),)),
+    TweetField("statuses_count", (("user", "statuses_count"),)),
+    TweetField("followers_count", (("user", "followers_count"),)),
+    TweetField("friends_count", (("user", "friends_count"),)),
+    TweetField("possibly_sensitive", (("retweeted_status", "possibly_sensitive"),), None),
+    TweetField("place", (("user", "location"),), None),
+)
+_ORIGINAL_TEXT = next(field for field in TWEET_FIELDS if field.name == "original_text")
+
+
+def _first_present(tweet: dict, paths: tuple):
+    """the value at the first of paths that exists in tweet"""
+    for path in paths:
+        value = tweet
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, TypeError):
+            continue
+        return value
+    raise KeyError(paths[-1][-1])
+
+
+def _field_getter(field: TweetField):
+    """function returning the value of field in a tweet, a plain itemgetter for a required top level key"""
+    paths, default = field.paths, field.default
+    if default is _REQUIRED and len(paths) == 1 and len(paths[0]) == 1:
+        return itemgetter(paths[0][0])
+
+    def get(tweet: dict):
+        try:
+            return _first_present(tweet, paths)
+        except KeyError:
+            if default is _REQUIRED:
+                raise
+            return default
+
+    return get
+
+
+def compile_fields(fields: tuple = TWEET_FIELDS):
+    """
+    turns a field spec into a function fill_columns(tweets, columns) that
+    visits every tweet once and writes field j of tweet i into columns[j][i]
+    """
+    getters = tuple(_field_getter(field) for field in fields)
+
+    def fill_columns(tweets, columns):
+        for i, tweet in enumerate(tweets):
+            for column, get in zip(columns, getters):
+                column[i] = get(tweet)
+
+    return fill_columns
+
+
+@lru_cache(maxsize=None)
+def _compiled_fields(names: tuple):
+    """compile_fields of the TWEET_FIELDS called names, compiled once per projection"""
+    return compile_fields(tuple(field for field in TWEET_FIELDS if field.name in names))
+
+
 class TweetDfExtractor:
     """
     this function will parse tweets json into a pandas dataframe
 
+    with a predicate only the matching tweets are extracted, and with columns
+    only the fields those columns need are read: the text processing runs only
+    for clean_text, hashtags or user_mentions and the sentiment scoring only
+    for polarity, subjectivity or sentiment. the sentiment_backend picks how
+    the tweets are scored, TextBlob or the persisted classifier of inference.py,
+    which leaves subjectivity missing and doesn't use the sentiment_cache.
+    a sentiment_executor, e.g. the pool stream_tweet_df shares between its
+    chunks, scores the tweets instead of a pool started for this extractor
+
     Return
     ------
     dataframe
     """
 
-    def __init__(self, tweets_list):
+    def __init__(self, tweets_list, sentiment_processes: int = 1, sentiment_cache: SentimentCache = None,
+                 predicate: TweetPredicate = None, columns: list = None, sentiment_backend: str = "textblob",
+                 sentiment_executor=None):
         self.tweets_list = tweets_list
+        self.sentiment_processes = sentiment_processes
+        self.sentiment_cache = sentiment_cache
+        self.sentiment_executor = sentiment_executor
+        self.predicate = predicate
+        if sentiment_backend not in SENTIMENT_BACKENDS:
+            raise ValueError(f"unknown sentiment backend: {sentiment_backend}")
+        self.sentiment_backend = sentiment_backend
+        self.columns = list(TWEET_DF_COLUMNS if columns is None else columns)
+        unknown = set(self.columns) - set(TWEET_DF_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+        self._columns = None
+        self._entity_indexes = None
+
+    def extract_columns(self) -> dict:
+        """
+        single pass extraction of the fields in TWEET_FIELDS the columns need,
+        plus the clean_text, hashtags and user_mentions derived from the full
+        text when asked for. the tweets are visited once on first use and the
+        columns are reused by all the find_* methods afterwards
+        """
+        if self._columns is None:
+            tweets = self.tweets_list
+            if self.predicate is not None:
+                tweets = [tweet for tweet in tweets if self.predicate.matches(tweet)]
+            needs_text = any(column in self.columns for column in TEXT_COLUMNS + SENTIMENT_COLUMNS)
+            names = tuple(field.name for field in TWEET_FIELDS
+                          if field.name in self.columns or (needs_text and field.name == "original_text"))
+            columns = [[None] * len(tweets) for _ in names]
+            _compiled_fields(names)(tweets, columns)
+            self._columns = dict(zip(names, columns))
+            if any(column in self.columns for column in TEXT_COLUMNS):
+                clean, hashtags, mentions = process_texts(self._columns["original_text"])
+                self._columns.update(clean_text=clean, hashtags=hashtags, user_mentions=mentions)
+
+        return self._columns
+
+    def _column(self, name: str) -> list:
+        return list(self.extract_columns()[name])
 
     def find_statuses_count(self) -> list:
-        statuses_count = [x["user"]["statuses_count"] for x in self.tweets_list]
-        return statuses_count
+        return self._column("statuses_count")
 
     def find_full_text(self) -> list:
-        texts = []
-        for x in self.tweets_list:
-            try:
-                text = x["retweeted_status"]["extended_tweet"]["full_text"]
-            except KeyError:
-                text = x["text"]
-            texts.append(text)
-        return texts
+        return self._column("original_text")
 
     def find_clean_text(self) -> list:
-            clean_text = [re.sub("[^a-zA-Z0-9#@\s’,_]", "", text) for text in self.find_full_text()]
-            clean_text = [re.sub("\s+", " ", text) for text in clean_text]
-            return clean_text
+        return self._column("clean_text")
 
     def find_sentiments(self, text) -> list:
-        def text_category(p):
-            """
-            converts polarity into sentiment category
-            """
-            if p > 0:
-                return "positive"
-            elif p < 0:
-                return "negative"
-            else:
-                return "neutral"
-
-        polarity = [TextBlob(x).polarity for x in text]
-        subjectivity = [TextBlob(x).subjectivity for x in text]
-        sentiment = [text_category(x) for x in polarity]
-        return polarity, subjectivity, sentiment
+        if self.sentiment_backend == "sklearn":
+            from inference import get_sentiment_model
+            return get_sentiment_model().score(text)
+        return score_sentiments(text, processes=self.sentiment_processes, cache=self.sentiment_cache,
+                                executor=self.sentiment_executor)
 
     def find_created_time(self) -> list:
-        created_at = [x["created_at"] for x in self.tweets_list]
-        return created_at
+        return self._column("created_at")
 
     def find_source(self) -> list:
-        source = [x["source"] for x in self.tweets_list]
-        return source
+        return self._column("source")
 
     def find_screen_name(self) -> list:
-        screen_name = [x["user"]["screen_name"] for x in self.tweets_list]
-        return screen_name
+        return self._column("original_author")
 
     def find_followers_count(self) -> list:
-        followers_count = [x["user"]["followers_count"] for x in self.tweets_list]
-        return followers_count
+        return self._column("followers_count")
 
     def find_friends_count(self) -> list:
-        friends_count = [x["user"]["friends_count"] for x in self.tweets_list]
-        return friends_count
+        return self._column("friends_count")
 
     def is_sensitive(self) -> list:
-        is_sensitive = []
-        for x in self.tweets_list:
-            try:
-                value = x["retweeted_status"]["possibly_sensitive"]
-            except KeyError:
-                value = None
-            is_sensitive.append(value)
-        return is_sensitive
+        return self._column("possibly_sensitive")
 
     def find_favourite_count(self) -> list:
-        favourite_count = []
-        for x in self.tweets_list:
-            try:
-                value = x["retweeted_status"]["favorite_count"]
-            except KeyError:
-                value = x["favorite_count"]
-            favourite_count.append(value)
-        return favourite_count
+        return self._column("favorite_count")
 
     def find_retweet_count(self) -> list:
-        retweet_count = []
-        for x in self.tweets_list:
-            try:
-                value = x["retweeted_status"]["retweet_count"]
-            except KeyError:
-                value = x["retweet_count"]
-            retweet_count.append(value)
-        return retweet_count
+        return self._column("retweet_count")
 
     def find_hashtags(self) -> list:
-        hashtags = []
-        for text in self.find_clean_text():
-            value = " ".join(re.findall("(#[A-Za-z]+[A-Za-z0-9_-]+)", str(text).lower()))
-            if value == "":
-                value = " "
-            hashtags.append(value)
-        return hashtags
+        return self._column("hashtags")
 
     def find_mentions(self) -> list:
-        mentions = []
-        for text in self.find_clean_text():
-            value = " ".join(re.findall("(@[A-Za-z0-9_]+)", str(text).lower()))
-            if value == "":
-                value = " "
-            mentions.append(value)
-        return mentions
+        return self._column("user_mentions")
 
     def find_location(self) -> list:
-        location = []
-        for x in self.tweets_list:
-            try:
-                value = x["user"]["location"]
-            except TypeError:
-                value = None
-            location.append(value)
-        return location
+        return self._column("place")
 
     def find_lang(self) -> list:
-        lang = [x["lang"] for x in self.tweets_list]
-        return lang
-
-    def get_tweet_df(self, save=False) -> pd.DataFrame:
-        """required column to be generated you should be creative and add more features"""
-
-        columns = ["created_at", "source", "original_text", "clean_text", "sentiment", "polarity", "subjectivity", "lang", "favorite_count", "retweet_count",
-                   "original_author", "followers_count", "friends_count", "possibly_sensitive", "hashtags", "user_mentions", "place"]
-
-        created_at = self.find_created_time()
-        source = self.find_source()
-        text = self.find_full_text()
-        clean_text = self.find_clean_text()
-        polarity, subjectivity, sentiment = self.find_sentiments(text)
-        lang = self.find_lang()
-        fav_count = self.find_favourite_count()
-        retweet_count = self.find_retweet_count()
-        screen_name = self.find_screen_name()
-        follower_count = self.find_followers_count()
-        friends_count = self.find_friends_count()
-        sensitivity = self.is_sensitive()
-        hashtags = self.find_hashtags()
-        mentions = self.find_mentions()
-        location = self.find_location()
-        data = zip(created_at, source, text, clean_text, sentiment, polarity, subjectivity, lang, fav_count, retweet_count,
-                   screen_name, follower_count, friends_count, sensitivity, hashtags, mentions, location)
-        df = pd.DataFrame(data=data, columns=columns)
+        return self._column("lang")
+
+    def get_entity_indexes(self) -> dict:
+        """
+        EntityIndex of the hashtags and user_mentions columns, built once
+        from the extracted columns and aligned with the rows of get_tweet_df
+        """
+        if self._entity_indexes is None:
+            data = self.extract_columns()
+            self._entity_indexes = build_entity_indexes(data, [column for column in ENTITY_COLUMNS if column in data])
+
+        return self._entity_indexes
+
+    def get_tweet_df(self, save=False, file_format="csv", typed=True) -> pd.DataFrame:
+        """
+        required column to be generated you should be creative and add more features.
+        with typed=True the columns get the compact dtypes of tweet_schema.apply_schema,
+        otherwise they are left as the extracted python objects.
+        with save=True the dataframe is written to processed_tweet_data.csv, or to the
+        date partitioned processed_tweet_data.parquet dataset when file_format="parquet".
+        the csv is saved with its entity indexes in processed_tweet_entities.npz
+        """
+
+        columns = self.columns
+
+        data = self.extract_columns()
+        if any(column in columns for column in SENTIMENT_COLUMNS):
+            polarity, subjectivity, sentiment = self.find_sentiments(data["original_text"])
+            data = dict(data, polarity=polarity, subjectivity=subjectivity, sentiment=sentiment)
+        df = pd.DataFrame(data={column: data[column] for column in columns}, columns=columns)
+        if typed:
+            apply_schema(df)
 
         if save:
-            df.to_csv("processed_tweet_data.csv", index=False)
+            if file_format == "parquet":
+                write_parquet(df, "processed_tweet_data.parquet")
+            elif file_format == "csv":
+                df.to_csv("processed_tweet_data.csv", index=False)
+                # the parquet dataset is reordered by its date partitions, the csv keeps the rows aligned
+                if self.get_entity_indexes():
+                    save_entity_indexes(self.get_entity_indexes(), "processed_tweet_entities.npz")
+            else:
+                raise ValueError(f"unsupported file format: {file_format}")
             print("File Successfully Saved.!!!")
 
         return df
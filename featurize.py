@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+def _sklearn():
+    try:
+        import sklearn.feature_extraction.text
+        import sklearn.preprocessing
+    except ImportError as e:
+        raise ImportError("featurization needs scikit-learn, install it with `pip install scikit-learn`") from e
+    return sklearn
+
+
+class StreamingFeaturizer:
+    """
+    turns tweet texts into sparse n-gram features without a vocabulary: the
+    n-grams of the notebook's trigram CountVectorizer are hashed into a fixed
+    number of columns, so memory doesn't grow with the stream and new tweets
+    never need a refit. with tfidf=True the counts are weighted by an idf
+    computed from document frequencies kept up to date as chunks go through,
+    and the rows are l2 normalized like TfidfTransformer does.
+
+    Args:
+    -----
+    n_features: int - number of hashed feature columns
+    ngram_range: tuple - smallest and largest n-gram sizes
+    tfidf: bool - weight the counts by the running inverse document frequency
+    """
+
+    def __init__(self, n_features: int = 2 ** 20, ngram_range: tuple = (1, 3), tfidf: bool = False):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.tfidf = tfidf
+        # the counts stay unnormalized and unsigned so that they can be weighted afterwards
+        self.vectorizer = _sklearn().feature_extraction.text.HashingVectorizer(
+            n_features=n_features, ngram_range=self.ngram_range, alternate_sign=False, norm=None, dtype=np.float32)
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+
+    def counts(self, texts):
+        """
+        csr matrix of hashed n-gram counts, one row per text. like the notebook's
+        vectorizer it expects the clean_text of the tweets
+        """
+        return self.vectorizer.transform([text if isinstance(text, str) else "" for text in texts]).tocsr()
+
+    def partial_fit(self, texts) -> "StreamingFeaturizer":
+        """
+        adds texts to the document frequencies without transforming them
+        """
+        self._update(self.counts(texts))
+        return self
+
+    def _update(self, X):
+        # every stored entry of a row is a distinct feature the document holds
+        self.document_frequency += np.bincount(X.indices, minlength=self.n_features)
+        self.n_documents += X.shape[0]
+
+    def idf(self) -> np.ndarray:
+        """
+        smoothed inverse document frequency of every feature, as TfidfTransformer computes it
+        """
+        return (np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1).astype(np.float32)
+
+    def transform(self, texts, update: bool = True):
+        """
+        features of a batch of texts
+        Args:
+        -----
+        texts: list - tweet texts
+        update: bool - count the batch in the document frequencies before weighting it
+
+        Returns
+        -------
+        csr matrix of shape (len(texts), n_features), float32
+        """
+
+        X = self.counts(texts)
+        if update:
+            self._update(X)
+        if not self.tfidf:
+            return X
+
+        X.data *= self.idf()[X.indices]
+        return _sklearn().preprocessing.normalize(X, copy=False)
+
+    def save(self, path: str):
+        """
+        writes the settings and the document frequencies to a .npz file
+        """
+        np.savez(path, n_features=self.n_features, ngram_range=self.ngram_range, tfidf=self.tfidf,
+                 document_frequency=self.document_frequency, n_documents=self.n_documents)
+
+    @classmethod
+    def load(cls, path: str) -> "StreamingFeaturizer":
+        """
+        reads a featurizer written by save, ready to go on with the stream
+        """
+        with np.load(path) as arrays:
+            featurizer = cls(int(arrays["n_features"]), tuple(arrays["ngram_range"].tolist()), bool(arrays["tfidf"]))
+            featurizer.document_frequency = arrays["document_frequency"].copy()
+            featurizer.n_documents = int(arrays["n_documents"])
+        return featurizer
+
+
+def featurize_chunks(dfs, featurizer: StreamingFeaturizer, column: str = "clean_text"):
+    """
+    adds the features of every chunk of a tweets stream, e.g. the dataframes
+    of extract_dataframe.stream_tweet_df
+    Args:
+    -----
+    dfs: iterable of pd.DataFrame - chunks of tweets
+    featurizer: StreamingFeaturizer - featurizer shared by all the chunks
+    column: str - column holding the texts
+
+    Returns
+    -------
+    generator of (dataframe, csr matrix) pairs with one matrix row per dataframe row
+    """
+
+    for df in dfs:
+        texts = df[column].to_numpy(dtype=object) if isinstance(df, pd.DataFrame) else df[column]
+        yield df, featurizer.transform(texts)
@@ -0,0 +1,143 @@
+"""
+batch sentiment inference with the models of the sentiment analysis notebook:
+the trigram CountVectorizer it saved to data_preprocessors/ and an SGDClassifier
+trained like the notebook's, on the tweets TextBlob calls positive (1) or
+negative (0). scoring a batch is one sparse transform and one matrix product,
+a fast alternative to running TextBlob tweet by tweet.
+
+usage: python inference.py train data/processed_tweets.csv
+"""
+
+import argparse
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from sentiment import text_category
+from text_processing import clean_text
+
+VECTORIZER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_preprocessors", "trigram_vectorizer.joblib")
+CLASSIFIER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_preprocessors", "sentiment_classifier.joblib")
+
+
+def _joblib():
+    try:
+        import joblib
+        import sklearn.linear_model
+    except ImportError as e:
+        raise ImportError("the sklearn sentiment backend needs scikit-learn, install it with `pip install scikit-learn`") from e
+    return joblib
+
+
+@lru_cache(maxsize=None)
+def load_model(path: str):
+    """
+    loads a joblib artifact once per process. its numpy arrays, such as the
+    classifier's coefficients, are memory mapped read only instead of copied
+    """
+    return _joblib().load(path, mmap_mode="r")
+
+
+def train_classifier(texts, polarity, vectorizer_path: str = VECTORIZER_FILE, classifier_path: str = CLASSIFIER_FILE,
+                     seed: int = 0):
+    """
+    fits an SGDClassifier the way the notebook does, on the texts with a non
+    neutral TextBlob polarity, and saves it next to the vectorizer
+    Args:
+    -----
+    texts: list - tweet texts, cleaned with text_processing.clean_text before vectorizing
+    polarity: list - TextBlob polarity of the texts
+    vectorizer_path: str - fitted CountVectorizer the texts are transformed with
+    classifier_path: str - path the classifier is written to
+    seed: int - random state of the classifier
+
+    Returns
+    -------
+    the fitted classifier
+    """
+
+    joblib = _joblib()
+    from sklearn.linear_model import SGDClassifier
+
+    polarity = np.asarray(polarity, dtype=float)
+    selected = polarity != 0
+    texts = [clean_text(str(text)) for text, keep in zip(texts, selected) if keep]
+    classifier = SGDClassifier(random_state=seed)
+    classifier.fit(load_model(vectorizer_path).transform(texts), (polarity[selected] > 0).astype(int))
+    joblib.dump(classifier, classifier_path)
+    load_model.cache_clear()
+    return classifier
+
+
+class SentimentModel:
+    """
+    scores texts with a persisted vectorizer and binary classifier, in batches
+    of batch_size texts so that the sparse matrices stay bounded
+
+    Args:
+    -----
+    vectorizer_path: str - joblib file of the fitted CountVectorizer
+    classifier_path: str - joblib file of the classifier, see train_classifier
+    batch_size: int - number of texts transformed at a time
+    """
+
+    def __init__(self, vectorizer_path: str = VECTORIZER_FILE, classifier_path: str = CLASSIFIER_FILE,
+                 batch_size: int = 20000):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if not os.path.exists(classifier_path):
+            raise FileNotFoundError(f"no sentiment classifier at {classifier_path}, fit one with `python inference.py train`")
+        self.vectorizer = load_model(vectorizer_path)
+        self.classifier = load_model(classifier_path)
+        self.batch_size = batch_size
+
+    def decision_function(self, texts) -> tuple:
+        """
+        signed distance of every text to the classifier's boundary, positive
+        for the positive class, and whether any n-gram of the text is known
+        to the vectorizer
+        """
+        texts = [clean_text(str(text)) for text in texts]
+        scores = np.zeros(len(texts))
+        known = np.zeros(len(texts), dtype=bool)
+        for start in range(0, len(texts), self.batch_size):
+            X = self.vectorizer.transform(texts[start:start + self.batch_size])
+            scores[start:start + X.shape[0]] = self.classifier.decision_function(X)
+            known[start:start + X.shape[0]] = X.getnnz(axis=1) > 0
+        return scores, known
+
+    def score(self, texts) -> tuple:
+        """
+        polarity, subjectivity and sentiment lists shaped like
+        sentiment.score_sentiments. the polarity is the tanh of the decision
+        function, texts without a known n-gram are neutral with polarity 0
+        and the classifier gives no subjectivity, which is left missing
+        """
+        scores, known = self.decision_function(texts)
+        polarity = np.where(known, np.tanh(scores), 0.0).tolist()
+        subjectivity = [np.nan] * len(polarity)
+        return polarity, subjectivity, [text_category(p) for p in polarity]
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_model() -> SentimentModel:
+    """the SentimentModel of the default artifacts, loaded once per process"""
+    return SentimentModel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("tweets", help="processed tweets csv with original_text and polarity columns")
+    parser.add_argument("--classifier", default=CLASSIFIER_FILE, help="path the classifier is written to")
+    args = parser.parse_args()
+
+    import pandas as pd
+    df = pd.read_csv(args.tweets, usecols=["original_text", "polarity"]).dropna()
+    train_classifier(df["original_text"], df["polarity"], classifier_path=args.classifier)
+    print(f"classifier fitted on {int((df['polarity'] != 0).sum()):,} tweets and saved to {args.classifier}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+ingests many json lines dumps into one date partitioned parquet dataset.
+
+the input files are split into shards, a whole small file or a byte range of
+a large one that starts and ends on a line boundary, and the shards are
+extracted by a process pool. every shard is written to its own files, named
+after the input file and the offset of the shard, so the dataset reads back in
+the same order whatever the number of processes and a shard that is written
+again replaces its earlier files. with a single process, e.g. on a single cpu
+machine, the shards are extracted one after the other in this process rather
+than paying for a pool that can't speed them up. a failed shard is retried on
+its own, on a new pool when a worker died and broke the old one, and the
+shards already written are recorded in a manifest so that a rerun with
+--resume only does the missing ones.
+
+usage: python ingest.py "data/dumps/*.json" processed_tweet_data.parquet [--processes 8]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+from extract_dataframe import SENTIMENT_BACKENDS, TweetDfExtractor, TweetPredicate, read_json
+from tweet_storage import write_parquet
+
+MANIFEST_FILE = "_ingest_manifest.json"
+JSON_EXTENSIONS = (".json", ".jsonl")
+
+
+class Shard(NamedTuple):
+    """
+    the lines of path between the byte offsets start and end
+    """
+    path: str
+    start: int
+    end: int
+
+    @property
+    def basename(self) -> str:
+        """file name prefix of the shard's output, unique per input file and offset"""
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        digest = hashlib.sha1(os.path.abspath(self.path).encode("utf-8")).hexdigest()[:8]
+        return f"part-{stem}-{digest}-{self.start:012d}"
+
+    @property
+    def key(self) -> str:
+        """identifies the shard in the manifest, it changes when the file does"""
+        return f"{self.basename}-{self.end}-{os.stat(self.path).st_mtime_ns}"
+
+
+class _SerialExecutor:
+    """
+    runs every submitted call in this process as soon as it is submitted,
+    in place of a process pool of a single worker
+    """
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+def _executor(processes: int):
+    return _SerialExecutor() if processes == 1 else ProcessPoolExecutor(max_workers=processes)
+
+
+def find_inputs(source: str) -> list:
+    """
+    the json lines files of a directory, or the files matching a glob pattern, sorted by path
+    """
+
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source) if name.endswith(JSON_EXTENSIONS)]
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def plan_shards(paths: list, shard_bytes: int = 64 * 2 ** 20) -> list:
+    """
+    splits files into shards of about shard_bytes, a file smaller than that
+    is a single shard. a shard ends after the newline that follows its last
+    byte, so no line is split between two shards
+    Args:
+    -----
+    paths: list - json lines files
+    shard_bytes: int - target size of a shard
+
+    Returns
+    -------
+    list of Shard, in file then offset order
+    """
+
+    if shard_bytes < 1:
+        raise ValueError("shard_bytes must be a positive integer")
+
+    shards = []
+    for path in paths:
+        size = os.path.getsize(path)
+        start = 0
+        with open(path, "rb") as f:
+            while start < size:
+                end = start + shard_bytes
+                if end < size:
+                    # the line holding the byte before end finishes the shard
+                    f.seek(end - 1)
+                    f.readline()
+                    end = f.tell()
+                shards.append(Shard(path, start, min(end, size)))
+                start = end
+    return shards
+
+
+def ingest_shard(shard: Shard, output: str, predicate: TweetPredicate = None, columns: list = None,
+                 sentiment_backend: str = "textblob") -> int:
+    """
+    extracts the tweets of a shard and writes them to the output dataset
+
+    Returns
+    -------
+    number of tweets written
+    """
+
+    _, tweets = read_json(shard.path, predicate, shard.start, shard.end)
+    if not tweets:
+        return 0
+    df = TweetDfExtractor(tweets, columns=columns, sentiment_backend=sentiment_backend).get_tweet_df()
+    write_parquet(df, output, basename=shard.basename)
+    return len(df)
+
+
+def _read_manifest(output: str) -> dict:
+    path = os.path.join(output, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(output: str, manifest: dict):
+    path = os.path.join(output, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def ingest(source: str, output: str, processes: int = None, shard_bytes: int = 64 * 2 ** 20, retries: int = 2,
+           resume: bool = False, predicate: TweetPredicate = None, columns: list = None,
+           sentiment_backend: str = "textblob") -> dict:
+    """
+    ingests every json lines file of source into the parquet dataset output
+    Args:
+    -----
+    source: str - directory or glob pattern of the input files
+    output: str - directory of the parquet dataset
+    processes: int - size of the process pool, None uses every cpu and 1 ingests the shards in this process
+    shard_bytes: int - target size of a shard
+    retries: int - number of times a failing shard is tried again, including the shards lost with a dead worker
+    resume: bool - skip the shards the manifest of output records as written
+    predicate: TweetPredicate - optional filter applied while the shards are read
+    columns: list - columns written, all of TWEET_DF_COLUMNS by default
+    sentiment_backend: str - one of extract_dataframe.SENTIMENT_BACKENDS
+
+    Returns
+    -------
+    dict with the number of shards, skipped shards, tweets written and the failed shards
+    """
+
+    shards = plan_shards(find_inputs(source), shard_bytes)
+    os.makedirs(output, exist_ok=True)
+    manifest = _read_manifest(output) if resume else {}
+    pending = [shard for shard in shards if shard.key not in manifest]
+    summary = {"shards": len(shards), "skipped": len(shards) - len(pending), "rows": 0, "failed": []}
+
+    attempts = {}
+    processes = processes or os.cpu_count() or 1
+    executor = _executor(processes)
+    futures = {}
+    broken = []
+
+    def submit(shard: Shard):
+        try:
+            futures[executor.submit(ingest_shard, shard, output, predicate, columns, sentiment_backend)] = shard
+        except BrokenProcessPool:
+            broken.append(shard)
+
+    try:
+        for shard in pending:
+            submit(shard)
+        while futures or broken:
+            for future in as_completed(list(futures)):
+                shard = futures.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    attempts[shard] = attempts.get(shard, 0) + 1
+                    print(f"Error: shard {shard.basename} of {shard.path} failed: {e}")
+                    if attempts[shard] > retries:
+                        summary["failed"].append(shard)
+                    elif isinstance(e, BrokenProcessPool):
+                        broken.append(shard)
+                    else:
+                        submit(shard)
+                    continue
+                manifest[shard.key] = rows
+                summary["rows"] += rows
+                _write_manifest(output, manifest)
+            if broken:
+                # a worker that died, e.g. killed for running out of memory, breaks the pool and fails
+                # every shard it still held, so they are submitted again to a new pool
+                executor.shutdown()
+                executor = _executor(processes)
+                lost = list(broken)
+                broken.clear()
+                for shard in lost:
+                    submit(shard)
+    finally:
+        executor.shutdown()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory or glob pattern of the json lines files")
+    parser.add_argument("output", help="directory of the parquet dataset written")
+    parser.add_argument("--processes", type=int, default=None, help="size of the process pool, every cpu by default")
+    parser.add_argument("--shard-mb", type=float, default=64, help="target size of a shard in MiB")
+    parser.add_argument("--retries", type=int, default=2, help="times a failing shard is tried again")
+    parser.add_argument("--resume", action="store_true", help="skip the shards already written to output")
+    parser.add_argument("--lang", nargs="+", default=None, help="keep only tweets in these languages")
+    parser.add_argument("--sentiment-backend", choices=SENTIMENT_BACKENDS, default="textblob", help="how tweets are scored")
+    args = parser.parse_args()
+
+    predicate = None if args.lang is None else TweetPredicate(lang=args.lang)
+    summary = ingest(args.source, args.output, args.processes, int(args.shard_mb * 2 ** 20), args.retries,
+                     args.resume, predicate, sentiment_backend=args.sentiment_backend)
+    print(f"shards: {summary['shards']}, skipped: {summary['skipped']}, tweets written: {summary['rows']:,}")
+    if summary["failed"]:
+        raise SystemExit(f"{len(summary['failed'])} shards failed: " +
+                         ", ".join(f"{shard.path}@{shard.start}" for shard in summary["failed"]))
+
+
+if __name__ == "__main__":
+    main()
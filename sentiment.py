@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from textblob import TextBlob
+
+
+def text_category(p: float) -> str:
+    """
+    converts polarity into sentiment category
+    """
+    if p > 0:
+        return "positive"
+    elif p < 0:
+        return "negative"
+    else:
+        return "neutral"
+
+
+def score_texts(texts: list) -> list:
+    """
+    scores each text with a single TextBlob and returns a list
+    of (polarity, subjectivity) tuples
+    """
+    scores = []
+    for text in texts:
+        sentiment = TextBlob(text).sentiment
+        scores.append((sentiment.polarity, sentiment.subjectivity))
+    return scores
+
+
+class SentimentCache:
+    """
+    content addressed cache of (polarity, subjectivity) scores. texts are keyed
+    by a hash of their normalized form, kept in an in-memory LRU tier of at most
+    max_size entries and, when db_path is given, in a sqlite file that persists
+    across runs
+
+    Args:
+    -----
+    max_size: int - maximum number of scores kept in memory
+    db_path: str - optional path of the sqlite file backing the cache
+    """
+
+    def __init__(self, max_size: int = 100000, db_path: str = None):
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS sentiment "
+                             "(key TEXT PRIMARY KEY, polarity REAL NOT NULL, subjectivity REAL NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def key(text: str) -> str:
+        """
+        sha1 of the text after unicode NFC normalization and collapsing
+        whitespace, which TextBlob scoring ignores
+        """
+        normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, score: tuple) -> None:
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: list) -> dict:
+        """
+        returns the cached scores of the given keys, looking in memory
+        first and in the sqlite file for the rest
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            score = self._memory.get(key)
+            if score is None:
+                missing.append(key)
+            else:
+                self._memory.move_to_end(key)
+                found[key] = score
+        self.hits += len(found)
+
+        if self._db is not None and missing:
+            # stay below sqlite's limit on the number of bound parameters
+            for i in range(0, len(missing), 500):
+                batch = missing[i:i + 500]
+                rows = self._db.execute("SELECT key, polarity, subjectivity FROM sentiment WHERE key IN (%s)"
+                                        % ", ".join("?" * len(batch)), batch).fetchall()
+                for key, polarity, subjectivity in rows:
+                    found[key] = (polarity, subjectivity)
+                    self._remember(key, found[key])
+                    self.disk_hits += 1
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scores: dict) -> None:
+        """
+        stores a dict of key -> (polarity, subjectivity)
+        """
+        for key, score in scores.items():
+            self._remember(key, score)
+        if self._db is not None and scores:
+            self._db.executemany("INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                                 [(key, p, s) for key, (p, s) in scores.items()])
+            self._db.commit()
+
+    def stats(self) -> dict:
+        """
+        returns hit and miss counts, disk hits are included in hits
+        """
+        hits = self.hits + self.disk_hits
+        lookups = hits + self.misses
+        return {"hits": hits, "memory_hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0, "size": len(self._memory)}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _score_unique(texts: list, processes: int, batch_size: int, executor=None) -> list:
+    """scores texts in a process pool when it's worth it, otherwise serially"""
+    if processes > 1 and len(texts) > batch_size:
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if executor is not None:
+            return [score for batch in executor.map(score_texts, batches) for score in batch]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return [score for batch in executor.map(score_texts, batches) for score in batch]
+    return score_texts(texts)
+
+
+def score_sentiments(texts: list, processes: int = 1, batch_size: int = 1000, cache: SentimentCache = None,
+                     executor=None) -> tuple:
+    """
+    computes polarity, subjectivity and sentiment category of every text.
+    repeated texts are scored once, and with a cache only texts never seen
+    before are scored. with more than one process the texts to score are
+    split into batches of batch_size that are scored by a process pool
+    Args:
+    -----
+    texts: list - texts to score
+    processes: int - size of the process pool, None uses every cpu
+    batch_size: int - number of texts sent to a worker at a time
+    cache: SentimentCache - optional cache shared between calls
+    executor: ProcessPoolExecutor - optional pool shared between calls, e.g. by the chunks
+              of a stream, instead of a pool started and shut down by every call
+
+    Returns
+    -------
+    polarity, subjectivity and sentiment lists
+    """
+
+    texts = list(texts)
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    keys = [cache.key(text) for text in texts] if cache is not None else texts
+    unique = {}
+    for key, text in zip(keys, texts):
+        unique.setdefault(key, text)
+    scores = cache.get_many(list(unique)) if cache is not None else {}
+    missing = [key for key in unique if key not in scores]
+    new_scores = dict(zip(missing, _score_unique([unique[key] for key in missing], processes, batch_size, executor)))
+    if cache is not None:
+        cache.put_many(new_scores)
+    scores.update(new_scores)
+
+    polarity = [scores[key][0] for key in keys]
+    subjectivity = [scores[key][1] for key in keys]
+    sentiment = [text_category(p) for p in polarity]
+    return polarity, subjectivity, sentiment
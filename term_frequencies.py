@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+import pandas as pd
+
+# the words WordCloud.generate would count: a word character followed by word characters or apostrophes
+TOKEN = re.compile(r"\w[\w']*")
+# possibly_sensitive as stored in the processed files and the database, mapped to the dashboard labels
+SENSITIVITY_LABELS = {True: "True", False: "False", "True": "True", "False": "False"}
+
+
+def tokenize(text: str) -> list:
+    """
+    lower cased words of a text, without numbers and trailing 's,
+    the same way WordCloud.generate splits its input
+    """
+
+    words = TOKEN.findall(str(text).lower())
+    return [word[:-2] if word.endswith("'s") else word for word in words if not word.isdigit()]
+
+
+def sensitivity_label(value) -> str:
+    """
+    "True", "False" or "unknown" for a possibly_sensitive value
+    """
+
+    try:
+        return SENSITIVITY_LABELS.get(value, "unknown")
+    except TypeError:
+        return "unknown"
+
+
+class TermFrequencies:
+    """
+    word counts of the tweets' clean_text, kept per (sentiment, possibly_sensitive)
+    pair and updated as tweets are ingested. a word cloud for any sentiment and
+    sensitivity is then a sum over a few counters, proportional to the vocabulary
+    rather than to the number of tweets, and feeds WordCloud.generate_from_frequencies
+    without building and re-tokenizing one big string.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self.n_tweets = 0
+
+    def update(self, texts, sentiments, sensitivities):
+        """
+        add tweets to the counts
+        Args:
+        -----
+        texts: list - clean_text of the tweets
+        sentiments: list - sentiment category of the tweets
+        sensitivities: list - possibly_sensitive of the tweets
+        """
+
+        groups = {}
+        for text, sentiment, sensitive in zip(texts, sentiments, sensitivities):
+            groups.setdefault((str(sentiment), sensitivity_label(sensitive)), []).append(text if isinstance(text, str) else "")
+            self.n_tweets += 1
+        for key, group in groups.items():
+            # one pass over each group's joined texts instead of one per tweet
+            self._counts.setdefault(key, Counter()).update(tokenize(" ".join(group)))
+
+    def update_df(self, df: pd.DataFrame):
+        """
+        add the tweets of a processed tweets dataframe to the counts
+        """
+
+        self.update(df["clean_text"], df["sentiment"], df["possibly_sensitive"])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        estimated memory of the counts: every counter's table, its words and their counts
+        """
+
+        return sum(sys.getsizeof(counts) + sum(sys.getsizeof(word) + sys.getsizeof(n) for word, n in counts.items())
+                   for counts in self._counts.values())
+
+    def sentiments(self) -> list:
+        return sorted({sentiment for sentiment, _ in self._counts})
+
+    def sensitivities(self, sentiment: str = None) -> list:
+        return sorted({sensitive for key_sentiment, sensitive in self._counts
+                       if sentiment is None or key_sentiment == sentiment})
+
+    def frequencies(self, sentiment: str = None, sensitive: str = None, stopwords=(), max_words: int = 200) -> dict:
+        """
+        the most frequent words of the tweets matching a sentiment and a sensitivity label
+        Args:
+        -----
+        sentiment: str - sentiment category, None for every sentiment
+        sensitive: str - "True", "False" or "unknown", None for every sensitivity
+        stopwords: set - words left out of the result, e.g. wordcloud.STOPWORDS
+        max_words: int - number of words returned, None for all of them
+
+        Returns
+        -------
+        dict of word to count, the input of WordCloud.generate_from_frequencies
+        """
+
+        total = Counter()
+        for (key_sentiment, key_sensitive), counts in self._counts.items():
+            if sentiment in (None, key_sentiment) and sensitive in (None, key_sensitive):
+                total.update(counts)
+        for word in set(stopwords) & total.keys():
+            del total[word]
+        return dict(total.most_common(max_words))
+
+    def save(self, path: str):
+        """
+        write the counts to a json file, replacing it atomically
+        """
+
+        data = {"n_tweets": self.n_tweets,
+                "counts": [{"sentiment": sentiment, "possibly_sensitive": sensitive, "words": dict(counts)}
+                           for (sentiment, sensitive), counts in self._counts.items()]}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TermFrequencies":
+        """
+        read counts written by save
+        """
+
+        with open(path) as f:
+            data = json.load(f)
+        term_frequencies = cls()
+        term_frequencies.n_tweets = data["n_tweets"]
+        for group in data["counts"]:
+            term_frequencies._counts[(group["sentiment"], group["possibly_sensitive"])] = Counter(group["words"])
+        return term_frequencies
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "TermFrequencies":
+        term_frequencies = cls()
+        term_frequencies.update_df(df)
+        return term_frequencies
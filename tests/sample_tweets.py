@@ -0,0 +1,34 @@
+"""Small hand-written tweets shared by the unit tests that can't rely on data/covid19.json."""
+
+import json
+
+SAMPLE_TWEETS = [
+    {"created_at": "Fri Jun 18 17:55:49 +0000 2021", "source": '<a href="http://twitter.com/download/iphone" rel="nofollow">Twitter for iPhone</a>',
+     "text": "RT @WHOAFRO: Africa is in the midst of a third wave", "lang": "en", "favorite_count": 0, "retweet_count": 0,
+     "user": {"screen_name": "ketuesriche", "statuses_count": 204051, "followers_count": 551, "friends_count": 351, "location": "Mass"},
+     "retweeted_status": {"extended_tweet": {"full_text": "🚨Africa is \"in the midst of a full-blown third wave\" of coronavirus, the head of @WHOAFRO has warned #Covid19"},
+                          "favorite_count": 548, "retweet_count": 612, "possibly_sensitive": False}},
+    {"created_at": "Fri Jun 18 17:55:59 +0000 2021", "source": '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+     "text": "Great news for vaccine production in Africa today!", "lang": "en", "favorite_count": 3, "retweet_count": 1,
+     "user": {"screen_name": "Grid1949", "statuses_count": 3462, "followers_count": 66, "friends_count": 92, "location": "Edinburgh, Scotland"}},
+    {"created_at": "Fri Jun 18 17:56:07 +0000 2021", "source": '<a href="http://twitter.com/download/android" rel="nofollow">Twitter for Android</a>',
+     "text": "Merci @research2note pour la campagne #red4research", "lang": "fr", "favorite_count": 2, "retweet_count": 0,
+     "user": {"screen_name": "LeeTomlinson8", "statuses_count": 6727, "followers_count": 1195, "friends_count": 1176, "location": None},
+     "retweeted_status": {"favorite_count": 20, "retweet_count": 7}},
+    {"created_at": "Fri Jun 18 17:56:10 +0000 2021", "source": '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+     "text": "RT @WHOAFRO: Africa is in the midst of a third wave", "lang": "en", "favorite_count": 0, "retweet_count": 0,
+     "user": {"screen_name": "RIPNY08", "statuses_count": 45477, "followers_count": 2666, "friends_count": 2704, "location": "United Kingdom"},
+     "retweeted_status": {"extended_tweet": {"full_text": "🚨Africa is \"in the midst of a full-blown third wave\" of coronavirus, the head of @WHOAFRO has warned #Covid19"},
+                          "favorite_count": 549, "retweet_count": 613, "possibly_sensitive": True}},
+    {"created_at": "Sat Jun 19 08:01:00 +0000 2021", "source": '<a href="http://twitter.com/download/iphone" rel="nofollow">Twitter for iPhone</a>',
+     "text": "Terrible queues at the #vaccine centre, thanks @NHSuk", "lang": "en", "favorite_count": 12, "retweet_count": 4,
+     "user": {"screen_name": "pash22", "statuses_count": 277957, "followers_count": 28250, "friends_count": 30819, "location": ""}},
+]
+
+
+def write_sample_json(path: str, tweets: list = SAMPLE_TWEETS) -> str:
+    """write tweets as a json lines file and return its path"""
+    with open(path, "w") as f:
+        for tweet in tweets:
+            f.write(json.dumps(tweet) + "\n")
+    return path
@@ -0,0 +1,384 @@
+import importlib.util
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit')))
+
+# sqlite versions of the day5_schema.sql tables, the unsigned columns of mysql reject negative counts
+SQLITE_SCHEMA = """
+CREATE TABLE TweetInformation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT NOT NULL, source TEXT NOT NULL, clean_text TEXT,
+    sentiment TEXT, polarity REAL, subjectivity REAL, language TEXT,
+    favorite_count INTEGER CHECK (favorite_count >= 0), retweet_count INTEGER CHECK (retweet_count >= 0),
+    original_author TEXT, followers_count INTEGER CHECK (followers_count >= 0),
+    friends_count INTEGER CHECK (friends_count >= 0), possibly_sensitive INTEGER, hashtags TEXT,
+    user_mentions TEXT, place TEXT, tweet_key TEXT NOT NULL UNIQUE);
+CREATE TABLE TweetHashtag (hashtag TEXT NOT NULL, tweet_id INTEGER NOT NULL, PRIMARY KEY (hashtag, tweet_id));
+CREATE TABLE TweetMention (mention TEXT NOT NULL, tweet_id INTEGER NOT NULL, PRIMARY KEY (mention, tweet_id));
+CREATE TABLE IngestWatermark (table_name TEXT PRIMARY KEY, high_water_mark TEXT NOT NULL,
+                              updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE TweetRollupHourly (hour TEXT NOT NULL, source TEXT NOT NULL, sentiment TEXT NOT NULL,
+                                possibly_sensitive INTEGER NOT NULL, tweet_count INTEGER NOT NULL,
+                                favorite_count INTEGER NOT NULL, retweet_count INTEGER NOT NULL,
+                                friends_count INTEGER NOT NULL,
+                                PRIMARY KEY (hour, source, sentiment, possibly_sensitive));
+CREATE TABLE TweetAuthorRollup (original_author TEXT NOT NULL, sentiment TEXT NOT NULL, tweet_count INTEGER NOT NULL,
+                                retweet_count INTEGER NOT NULL, PRIMARY KEY (original_author, sentiment));
+"""
+
+
+def to_sqlite(query: str) -> str:
+    """rewrites the mysql statements of add_data in sqlite's dialect"""
+    query = query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE").replace("GREATEST(", "MAX(")
+    match = re.search(r"ON DUPLICATE KEY UPDATE (.*?);?\s*$", query, re.S)
+    if match:
+        updates = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", match.group(1))
+        query = f"{query[:match.start()]}ON CONFLICT DO UPDATE SET {updates};"
+    return query
+
+
+def _sql_value(value):
+    # DATETIME parameters are stored the way mysql returns them
+    return value.strftime("%Y-%m-%d %H:%M:%S") if hasattr(value, "strftime") else value
+
+
+class SqliteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        return self._cursor.execute(to_sqlite(query), [_sql_value(v) for v in params or ()])
+
+    def executemany(self, query, rows):
+        return self._cursor.executemany(to_sqlite(query), [[_sql_value(v) for v in row] for row in rows])
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SqliteConnection:
+    """a sqlite connection taking the mysql statements of add_data"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.create_function("HOUR", 1, lambda value: int(value[11:13]))
+        self._conn.create_function("MAKETIME", 3, lambda h, m, s: f"{h:02d}:{m:02d}:{s:02d}")
+        self._conn.create_function("TIMESTAMP", 2, lambda date, time: f"{date} {time}")
+
+    def cursor(self):
+        return SqliteCursor(self._conn.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def processed_df(rows: list) -> pd.DataFrame:
+    """a processed tweets dataframe, in the column order of the processed csv, from partial rows"""
+    defaults = {"source": "Twitter Web App", "original_text": "", "clean_text": "", "sentiment": "neutral",
+                "polarity": 0.0, "subjectivity": 0.0, "lang": "en", "favorite_count": 0, "retweet_count": 0,
+                "original_author": "someone", "followers_count": 1, "friends_count": 1, "possibly_sensitive": False,
+                "hashtags": "", "user_mentions": "", "place": ""}
+    columns = ["created_at"] + list(defaults)
+    return pd.DataFrame([{**defaults, **row} for row in rows], columns=columns)
+
+
+TWEETS = processed_df([
+    {"created_at": "2021-06-18 17:55:49+00:00", "clean_text": "africa third wave", "original_author": "ketuesriche",
+     "retweet_count": 612, "hashtags": "#Covid19", "user_mentions": "@WHOAFRO"},
+    {"created_at": "2021-06-18 17:55:59+00:00", "clean_text": "great news vaccine", "original_author": "Grid1949",
+     "sentiment": "positive", "favorite_count": 3, "retweet_count": 1},
+    {"created_at": "2021-06-18 18:56:07+00:00", "clean_text": "merci campagne", "original_author": "LeeTomlinson8",
+     "lang": "fr", "favorite_count": 20, "hashtags": "#red4research #Covid19", "user_mentions": "@research2note"},
+    {"created_at": "2021-06-19 08:01:00+00:00", "clean_text": "terrible queues", "original_author": "pash22",
+     "sentiment": "negative", "favorite_count": 12, "retweet_count": 4, "hashtags": "#vaccine"},
+])
+
+
+@unittest.skipUnless(importlib.util.find_spec("mysql"), "mysql-connector-python is not installed")
+class AddDataTestCase(unittest.TestCase):
+    """
+        Runs the loaders of Sql and streamlit/add_data.py against a sqlite database
+        put in the pool of the "tweets" database
+    """
+
+    def setUp(self):
+        import add_data
+        from db_pool import ConnectionPool
+        self.add_data = add_data
+        self.tmpdir = tempfile.mkdtemp()
+        self.reject_file = os.path.join(self.tmpdir, "rejected_rows.csv")
+        db_path = os.path.join(self.tmpdir, "tweets.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(SQLITE_SCHEMA)
+        add_data.close_pools()
+        add_data._pools[("tweets", False)] = ConnectionPool(lambda: SqliteConnection(db_path), size=2, timeout=5)
+
+    def tearDown(self):
+        self.add_data.close_pools()
+        shutil.rmtree(self.tmpdir)
+
+    def fetch(self, query: str) -> list:
+        return self.add_data.db_execute_fetch(query, rdf=False, dbName="tweets")
+
+
+class TestInsertToTweetTable(AddDataTestCase):
+    """
+        A class for unit-testing the batched inserts of Sql and streamlit/add_data.py
+    """
+
+    def test_batches(self):
+        inserted, rejected = self.add_data.insert_to_tweet_table("tweets", TWEETS, "TweetInformation", batch_size=3,
+                                                                 reject_file=self.reject_file)
+        self.assertEqual((inserted, rejected), (4, 0))
+        self.assertFalse(os.path.exists(self.reject_file))
+        self.assertEqual(self.fetch("SELECT created_at, original_author, language, possibly_sensitive "
+                                    "FROM TweetInformation ORDER BY id"),
+                         [("2021-06-18 17:55:49", "ketuesriche", "en", 0), ("2021-06-18 17:55:59", "Grid1949", "en", 0),
+                          ("2021-06-18 18:56:07", "LeeTomlinson8", "fr", 0), ("2021-06-19 08:01:00", "pash22", "en", 0)])
+
+    def test_bad_row_is_rejected_alone(self):
+        df = pd.concat([TWEETS, processed_df([{"created_at": "2021-06-18 19:00:00+00:00", "clean_text": "bad count",
+                                               "favorite_count": -1}])], ignore_index=True)
+        # the failing batch is retried row by row, the other batch goes through with executemany
+        inserted, rejected = self.add_data.insert_to_tweet_table("tweets", df, "TweetInformation", batch_size=2,
+                                                                 reject_file=self.reject_file)
+        self.assertEqual((inserted, rejected), (4, 1))
+        self.assertEqual(self.fetch("SELECT COUNT(*) FROM TweetInformation"), [(4,)])
+        rejects = pd.read_csv(self.reject_file)
+        self.assertEqual(rejects["clean_text"].tolist(), ["bad count"])
+        self.assertEqual(rejects["favorite_count"].tolist(), [-1])
+        self.assertIn("CHECK constraint failed", rejects["error"][0])
+
+        # later rejects are appended under the same header
+        self.add_data.insert_to_tweet_table("tweets", df.iloc[[4]], "TweetInformation", reject_file=self.reject_file)
+        self.assertEqual(len(pd.read_csv(self.reject_file)), 2)
+
+    def test_missing_values_are_null(self):
+        df = processed_df([{"created_at": "2021-06-18 19:00:00+00:00", "clean_text": "no place",
+                            "sentiment": None, "original_author": None, "place": None}])
+        self.add_data.insert_to_tweet_table("tweets", df, "TweetInformation", reject_file=self.reject_file)
+        self.assertEqual(self.fetch("SELECT sentiment, original_author, place, favorite_count FROM TweetInformation"),
+                         [(None, None, None, 0)])
+        key = self.add_data.tweet_key("2021-06-18 19:00:00", "", "no place")
+        self.assertEqual(self.fetch("SELECT tweet_key FROM TweetInformation"), [(key,)])
+
+
+class TestIncrementalIngest(AddDataTestCase):
+    """
+        A class for unit-testing the tweet_key upserts and the high-water mark of Sql and streamlit/add_data.py
+    """
+
+    def snapshot(self) -> tuple:
+        return tuple(self.fetch(f"SELECT * FROM {table} ORDER BY 1, 2") for table in
+                     ["TweetInformation", "TweetHashtag", "TweetMention", "IngestWatermark",
+                      "TweetRollupHourly", "TweetAuthorRollup"])
+
+    def test_upsert_on_tweet_key(self):
+        self.add_data.insert_to_tweet_table("tweets", TWEETS, "TweetInformation", reject_file=self.reject_file)
+        updated = TWEETS.assign(favorite_count=TWEETS["favorite_count"] + 10)
+        self.add_data.insert_to_tweet_table("tweets", updated, "TweetInformation", reject_file=self.reject_file)
+        self.assertEqual(self.fetch("SELECT id, favorite_count FROM TweetInformation ORDER BY id"),
+                         [(1, 10), (2, 13), (3, 30), (4, 22)])
+        self.assertEqual(self.fetch("SELECT hashtag, tweet_id FROM TweetHashtag ORDER BY tweet_id, hashtag"),
+                         [("#Covid19", 1), ("#Covid19", 3), ("#red4research", 3), ("#vaccine", 4)])
+
+    def test_watermark_never_goes_back(self):
+        self.assertIsNone(self.add_data.get_watermark("tweets", "TweetInformation"))
+        self.add_data.set_watermark("tweets", "TweetInformation", pd.Timestamp("2021-06-18 17:55:59", tz="UTC"))
+        self.add_data.set_watermark("tweets", "TweetInformation", pd.Timestamp("2021-06-18 12:00:00", tz="UTC"))
+        self.assertEqual(self.add_data.get_watermark("tweets", "TweetInformation"),
+                         pd.Timestamp("2021-06-18 17:55:59", tz="UTC"))
+        self.assertIsNone(self.add_data.get_watermark("tweets", "TweetHashtag"))
+
+    def test_same_batch_again_is_a_no_op(self):
+        frequencies_file = os.path.join(self.tmpdir, "term_frequencies.json")
+        self.assertEqual(self.add_data.ingest_incremental("tweets", TWEETS.iloc[:3], "TweetInformation",
+                                                          reject_file=self.reject_file,
+                                                          frequencies_file=frequencies_file), (3, 0))
+        self.add_data.ingest_incremental("tweets", TWEETS, "TweetInformation", reject_file=self.reject_file,
+                                         frequencies_file=frequencies_file)
+        tables = self.snapshot()
+        with open(frequencies_file) as f:
+            frequencies = f.read()
+
+        # only the tweet of the watermark second is loaded again, and it is left unchanged
+        self.assertEqual(self.add_data.ingest_incremental("tweets", TWEETS, "TweetInformation",
+                                                          reject_file=self.reject_file,
+                                                          frequencies_file=frequencies_file), (1, 0))
+        self.assertEqual(self.snapshot(), tables)
+        with open(frequencies_file) as f:
+            self.assertEqual(f.read(), frequencies)
+        self.assertEqual(len(tables[0]), 4)
+        self.assertEqual(tables[3][0][:2], ("TweetInformation", "2021-06-19 08:01:00"))
+
+    def test_rejected_rows_are_retried(self):
+        frequencies_file = os.path.join(self.tmpdir, "term_frequencies.json")
+        bad = TWEETS.copy()
+        bad.loc[2, "favorite_count"] = -1
+        self.assertEqual(self.add_data.ingest_incremental("tweets", bad, "TweetInformation",
+                                                          reject_file=self.reject_file,
+                                                          frequencies_file=frequencies_file), (3, 1))
+        self.assertEqual(self.add_data.get_watermark("tweets", "TweetInformation"),
+                         pd.Timestamp("2021-06-18 18:56:06", tz="UTC"))
+
+        # once fixed, the rejected tweet and those after it are loaded and counted once
+        self.assertEqual(self.add_data.ingest_incremental("tweets", TWEETS, "TweetInformation",
+                                                          reject_file=self.reject_file,
+                                                          frequencies_file=frequencies_file), (2, 0))
+        self.assertEqual(self.add_data.get_watermark("tweets", "TweetInformation"),
+                         pd.Timestamp("2021-06-19 08:01:00", tz="UTC"))
+        self.assertEqual(self.fetch("SELECT COUNT(*) FROM TweetInformation"), [(4,)])
+
+        from term_frequencies import TermFrequencies
+        frequencies = TermFrequencies.load(frequencies_file)
+        self.assertEqual(frequencies.n_tweets, 4)
+        self.assertEqual(frequencies.frequencies()["merci"], 1)
+
+    def test_frequencies_saved_after_watermark(self):
+        frequencies_file = os.path.join(self.tmpdir, "term_frequencies.json")
+        with mock.patch.object(self.add_data, "set_watermark", side_effect=RuntimeError("lost connection")):
+            with self.assertRaises(RuntimeError):
+                self.add_data.ingest_incremental("tweets", TWEETS, "TweetInformation", reject_file=self.reject_file,
+                                                 frequencies_file=frequencies_file)
+        self.assertFalse(os.path.exists(frequencies_file))
+
+        # the run is done again in full and counts every tweet once
+        self.add_data.ingest_incremental("tweets", TWEETS, "TweetInformation", reject_file=self.reject_file,
+                                         frequencies_file=frequencies_file)
+        from term_frequencies import TermFrequencies
+        self.assertEqual(TermFrequencies.load(frequencies_file).n_tweets, 4)
+
+
+@unittest.skipUnless(importlib.util.find_spec("mysql"), "mysql-connector-python is not installed")
+class TestPreprocessDf(unittest.TestCase):
+    """
+        A class for unit-testing the coercions of preprocess_df in Sql and streamlit/add_data.py
+    """
+
+    def test_sensitivity_and_missing_values(self):
+        from add_data import preprocess_df
+        df = processed_df([{"created_at": "2021-06-18 17:55:49+00:00", "possibly_sensitive": True},
+                           {"created_at": "2021-06-18 19:55:49+02:00", "possibly_sensitive": "False"},
+                           {"created_at": "2021-06-18 17:55:49+00:00", "possibly_sensitive": "True",
+                            "hashtags": None, "user_mentions": None, "favorite_count": None},
+                           {"created_at": "2021-06-18 17:55:49+00:00", "possibly_sensitive": None}])
+        result = preprocess_df(df)
+        self.assertNotIn("original_text", result.columns)
+        self.assertEqual(result["possibly_sensitive"].tolist(), [1, 0, 1, pd.NA])
+        self.assertEqual(str(result["possibly_sensitive"].dtype), "Int8")
+        self.assertEqual(result["created_at"].tolist(), ["2021-06-18 17:55:49"] * 4)
+        self.assertEqual(result.loc[2, ["hashtags", "user_mentions", "favorite_count"]].tolist(), ["", "", 0])
+
+    def test_varchar_truncation(self):
+        from add_data import VARCHAR_LENGTHS, preprocess_df
+        long_values = {column: "x" * (length + 10) for column, length in VARCHAR_LENGTHS.items()}
+        result = preprocess_df(processed_df([{"created_at": "2021-06-18 17:55:49+00:00", **long_values}]))
+        for column, length in VARCHAR_LENGTHS.items():
+            self.assertEqual(result.loc[0, column], "x" * length)
+
+    def test_categoricals(self):
+        from add_data import preprocess_df
+        df = processed_df([{"created_at": "2021-06-18 17:55:49+00:00", "hashtags": None, "sentiment": None}])
+        df = df.astype({"hashtags": "category", "sentiment": "category"})
+        result = preprocess_df(df)
+        self.assertEqual(result.loc[0, "hashtags"], "")
+        self.assertTrue(pd.isna(result.loc[0, "sentiment"]))
+
+    def test_missing_text_kept_null(self):
+        from add_data import preprocess_df
+        df = processed_df([{"created_at": "2021-06-18 17:55:49+00:00", "sentiment": None, "place": None,
+                            "original_author": None, "subjectivity": None}])
+        result = preprocess_df(df)
+        self.assertTrue(result.loc[0, ["sentiment", "place", "original_author", "subjectivity"]].isna().all())
+
+
+class TestInsertLinks(AddDataTestCase):
+    """
+        A class for unit-testing the hashtag and mention link tables filled by Sql and streamlit/add_data.py
+    """
+
+    def test_links(self):
+        self.add_data.insert_to_tweet_table("tweets", TWEETS, "TweetInformation", reject_file=self.reject_file,
+                                            link_entities=False)
+        self.assertEqual(self.fetch("SELECT COUNT(*) FROM TweetHashtag"), [(0,)])
+
+        rows = list(self.add_data.tweet_rows(TWEETS).itertuples(index=False, name=None))
+        long_mention = "@" + "m" * 60
+        unknown = rows[0][:-1] + ("0" * 40,)
+        rows = [row[:14] + (f"{row[14]} {long_mention}",) + row[15:] if i == 1 else row for i, row in enumerate(rows)]
+        with self.add_data.get_pool("tweets").cursor() as (conn, cur):
+            self.add_data._insert_links(conn, cur, "TweetInformation", rows + [unknown])
+            # links already there are left alone
+            self.add_data._insert_links(conn, cur, "TweetInformation", rows[:1])
+
+        self.assertEqual(self.fetch("SELECT tweet_id, hashtag FROM TweetHashtag ORDER BY tweet_id, hashtag"),
+                         [(1, "#Covid19"), (3, "#Covid19"), (3, "#red4research"), (4, "#vaccine")])
+        self.assertEqual(self.fetch("SELECT tweet_id, mention FROM TweetMention ORDER BY tweet_id, mention"),
+                         [(1, "@WHOAFRO"), (2, long_mention[:50]), (3, "@research2note")])
+
+
+class TestRefreshRollups(AddDataTestCase):
+    """
+        A class for unit-testing the rollup tables kept up to date by Sql and streamlit/add_data.py
+    """
+
+    def rollups(self) -> tuple:
+        return (self.fetch("SELECT * FROM TweetRollupHourly ORDER BY 1, 2, 3, 4"),
+                self.fetch("SELECT * FROM TweetAuthorRollup ORDER BY 1, 2"))
+
+    def test_partial_refresh_matches_full_rebuild(self):
+        self.add_data.ingest_incremental("tweets", TWEETS.iloc[:2], "TweetInformation", reject_file=self.reject_file)
+        # counts of the watermark second's tweet are upserted, and an author of the first load tweets again
+        later = pd.concat([TWEETS.iloc[1:].assign(retweet_count=TWEETS["retweet_count"].iloc[1:] + 5),
+                           processed_df([{"created_at": "2021-06-19 08:30:00+00:00", "clean_text": "third wave again",
+                                          "original_author": "ketuesriche", "retweet_count": 3}])],
+                          ignore_index=True)
+        self.add_data.ingest_incremental("tweets", later, "TweetInformation", reject_file=self.reject_file)
+        hourly, authors = self.rollups()
+
+        self.add_data.refresh_rollups("tweets", "TweetInformation")
+        self.assertEqual(self.rollups(), (hourly, authors))
+        self.assertEqual(hourly, [("2021-06-18 17:00:00", "Twitter Web App", "neutral", 0, 1, 0, 612, 1),
+                                  ("2021-06-18 17:00:00", "Twitter Web App", "positive", 0, 1, 3, 6, 1),
+                                  ("2021-06-18 18:00:00", "Twitter Web App", "neutral", 0, 1, 20, 5, 1),
+                                  ("2021-06-19 08:00:00", "Twitter Web App", "negative", 0, 1, 12, 9, 1),
+                                  ("2021-06-19 08:00:00", "Twitter Web App", "neutral", 0, 1, 0, 3, 1)])
+        self.assertIn(("ketuesriche", "neutral", 2, 615), authors)
+
+    def test_insert_refreshes_rollups(self):
+        self.add_data.insert_to_tweet_table("tweets", TWEETS.iloc[:2], "TweetInformation", reject_file=self.reject_file)
+        self.add_data.insert_to_tweet_table("tweets", TWEETS.iloc[1:], "TweetInformation", reject_file=self.reject_file)
+        hourly, authors = self.rollups()
+        self.assertEqual(len(hourly), 4)
+        self.assertEqual(len(authors), 4)
+
+        self.add_data.refresh_rollups("tweets", "TweetInformation")
+        self.assertEqual(self.rollups(), (hourly, authors))
+
+    def test_partial_refresh_statements(self):
+        with mock.patch.object(self.add_data, "get_pool") as get_pool:
+            cur = mock.MagicMock()
+            get_pool.return_value.cursor.return_value.__enter__.return_value = (mock.MagicMock(), cur)
+            self.add_data.refresh_rollups("tweets", "TweetInformation", pd.Timestamp("2021-06-18 19:55:59+02:00"))
+        (delete_hours, hours), (insert_hours, hours_again), (delete_authors, since), (insert_authors, since_again) = \
+            [call.args for call in cur.execute.call_args_list]
+        self.assertEqual(hours, (pd.Timestamp("2021-06-18 17:00:00").to_pydatetime(),))
+        self.assertEqual(since, (pd.Timestamp("2021-06-18 17:55:59").to_pydatetime(),))
+        self.assertEqual((hours_again, since_again), (hours, since))
+        self.assertIn("WHERE hour >= %s", delete_hours)
+        self.assertIn("WHERE created_at >= %s", insert_hours)
+        for query in (delete_authors, insert_authors):
+            self.assertIn("WHERE original_author IN (SELECT original_author FROM TweetInformation WHERE created_at >= %s)",
+                          query)
+
+
+if __name__ == "__main__":
+    unittest.main()
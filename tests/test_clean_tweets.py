@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from clean_tweets_dataframe import Clean_Tweets
+from extract_dataframe import TweetDfExtractor
+from sample_tweets import SAMPLE_TWEETS
+
+
+def clean_stepwise(clean_tweets: Clean_Tweets, df: pd.DataFrame) -> pd.DataFrame:
+    # the cleaning as the preprocessing notebook runs it
+    df = df.copy()
+    clean_tweets.drop_duplicates(df)
+    df = clean_tweets.remove_non_english_tweets(df)
+    df = clean_tweets.fill_missing(df, "place", "Not provided")
+    df = clean_tweets.fill_missing(df, "possibly_sensitive", "unknown")
+    df = clean_tweets.remove_characters(df, "place")
+    df = clean_tweets.replace_empty_string(df, "place", "Not provided")
+    df = clean_tweets.convert_to_datetime(df)
+    df["source"] = df["source"].apply(clean_tweets.extract_device_name)
+    return df
+
+
+class TestCleanTweets(unittest.TestCase):
+    """
+        A class for unit-testing the fused cleaning of Clean_Tweets.clean
+    """
+
+    def setUp(self):
+        # the first two tweets again, as duplicates
+        self.tweets = SAMPLE_TWEETS + SAMPLE_TWEETS[:2]
+
+    def test_clean_matches_stepwise(self):
+        for typed in (False, True):
+            df = TweetDfExtractor(self.tweets).get_tweet_df(typed=typed)
+            clean_tweets = Clean_Tweets(df)
+            pd.testing.assert_frame_equal(clean_tweets.clean(df), clean_stepwise(clean_tweets, df),
+                                          check_dtype=False, check_categorical=False)
+
+    def test_clean_leaves_input_untouched(self):
+        df = TweetDfExtractor(self.tweets).get_tweet_df()
+        before = df.copy()
+        Clean_Tweets(df).clean(df)
+        pd.testing.assert_frame_equal(df, before)
+
+    def test_clean_keeps_categoricals(self):
+        df = TweetDfExtractor(self.tweets).get_tweet_df()
+        cleaned = Clean_Tweets(df).clean(df)
+        for column in ["source", "place", "possibly_sensitive"]:
+            self.assertIsInstance(cleaned[column].dtype, pd.CategoricalDtype)
+        self.assertEqual(cleaned["source"].iloc[0], "Twitter for iPhone")
+
+    def test_clean_rejects_filter_after_column_step(self):
+        df = TweetDfExtractor(self.tweets).get_tweet_df()
+        with self.assertRaises(ValueError):
+            Clean_Tweets(df).clean(df, steps=(("fill_missing", "place", "Not provided"), ("drop_duplicates",)))
+        with self.assertRaises(ValueError):
+            Clean_Tweets(df).clean(df, steps=(("unknown_step", "place"),))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import importlib.util
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit')))
+
+
+@unittest.skipUnless(importlib.util.find_spec("mysql"), "mysql-connector-python is not installed")
+class TestBuildWhere(unittest.TestCase):
+    """
+        A class for unit-testing the sql filters in Sql and streamlit/dashboard_queries.py
+    """
+
+    def test_no_filters(self):
+        from dashboard_queries import build_where
+        self.assertEqual(build_where({}), ("", ()))
+        self.assertEqual(build_where({"place": [], "language": []}), ("", ()))
+
+    def test_column_and_hashtag_filters(self):
+        from dashboard_queries import build_where
+        where, params = build_where({"hashtags": ["#covid19", "#vaccine"], "language": ["en"]})
+        self.assertEqual(where, "WHERE EXISTS (SELECT 1 FROM TweetHashtag h WHERE h.tweet_id = t.id AND h.hashtag IN (%s, %s))"
+                                " AND t.language IN (%s)")
+        self.assertEqual(params, ("#covid19", "#vaccine", "en"))
+
+    def test_unknown_column(self):
+        from dashboard_queries import build_where
+        with self.assertRaises(ValueError):
+            build_where({"clean_text; DROP TABLE TweetInformation": ["x"]})
+
+
+@unittest.skipUnless(importlib.util.find_spec("mysql"), "mysql-connector-python is not installed")
+class TestStratifiedSample(unittest.TestCase):
+    """
+        A class for unit-testing the profiling samples in Sql and streamlit/dashboard_queries.py
+    """
+
+    def test_allocation_is_proportional_and_keeps_small_strata(self):
+        import pandas as pd
+        from dashboard_queries import allocate_sample
+        counts = pd.Series([1000, 10, 0, 5], index=["positive", "negative", "neutral", "unknown"])
+        self.assertEqual(allocate_sample(counts, 100).to_dict(), {"positive": 98, "negative": 1, "unknown": 1})
+        self.assertEqual(allocate_sample(counts, 5000).to_dict(), {"positive": 1000, "negative": 10, "unknown": 5})
+        self.assertEqual(allocate_sample(counts, 2).sum(), 2)
+
+    def test_stratified_sample(self):
+        import pandas as pd
+        from dashboard_queries import stratified_sample
+        df = pd.DataFrame({"sentiment": ["positive"] * 900 + ["negative"] * 90 + [None] * 10,
+                           "possibly_sensitive": [1, 0] * 500})
+        sample = stratified_sample(df, 100)
+        self.assertEqual(len(sample), 100)
+        sizes = sample.groupby(["sentiment", "possibly_sensitive"], dropna=False).size()
+        self.assertEqual(sizes.sum(), 100)
+        self.assertEqual(len(sizes), 6)
+        pd.testing.assert_frame_equal(sample, stratified_sample(df, 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit')))
+
+from db_pool import ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+        A class for unit-testing the connection pool in Sql and streamlit/db_pool.py,
+        with sqlite standing in for mysql
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, "tweets.db")
+        self.pool = ConnectionPool(lambda: sqlite3.connect(db_path, check_same_thread=False), size=2, timeout=5)
+        with self.pool.cursor() as (conn, cur):
+            cur.execute("CREATE TABLE TweetInformation (id INTEGER PRIMARY KEY, clean_text TEXT)")
+            conn.commit()
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmpdir.cleanup()
+
+    def test_connections_are_reused(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            self.assertIs(first, second)
+        self.assertEqual(self.pool.metrics()["created"], 1)
+        self.assertEqual(self.pool.metrics()["idle"], 1)
+
+    def test_error_rolls_back_and_releases(self):
+        with self.assertRaises(ValueError):
+            with self.pool.cursor() as (conn, cur):
+                cur.execute("INSERT INTO TweetInformation (clean_text) VALUES ('lost')")
+                raise ValueError("boom")
+        with self.pool.cursor() as (conn, cur):
+            cur.execute("SELECT COUNT(*) FROM TweetInformation")
+            self.assertEqual(cur.fetchone()[0], 0)
+        self.assertEqual(self.pool.metrics()["in_use"], 0)
+
+    def test_next_acquire_sees_other_writes(self):
+        db_path = os.path.join(self.tmpdir.name, "wal.db")
+
+        def connect():
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            return conn
+
+        pool = ConnectionPool(connect, size=1)
+        with pool.cursor() as (conn, cur):
+            cur.execute("CREATE TABLE TweetInformation (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            # a read opening a transaction, the way mysql connections do without autocommit
+            cur.execute("BEGIN")
+            cur.execute("SELECT COUNT(*) FROM TweetInformation")
+            self.assertEqual(cur.fetchone()[0], 0)
+            cur.execute("INSERT INTO TweetInformation VALUES (1)")
+        with sqlite3.connect(db_path) as other:
+            other.execute("INSERT INTO TweetInformation VALUES (2)")
+        with pool.cursor() as (conn, cur):
+            cur.execute("SELECT id FROM TweetInformation")
+            self.assertEqual(cur.fetchall(), [(2,)])
+        pool.close()
+
+    def test_pool_size_is_bounded(self):
+        barrier = threading.Barrier(4)
+
+        def work():
+            barrier.wait()
+            for _ in range(20):
+                with self.pool.cursor() as (conn, cur):
+                    cur.execute("INSERT INTO TweetInformation (clean_text) VALUES ('x')")
+                    conn.commit()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = self.pool.metrics()
+        self.assertLessEqual(metrics["created"], 2)
+        self.assertEqual(metrics["acquired"], metrics["released"])
+        with self.pool.cursor() as (conn, cur):
+            cur.execute("SELECT COUNT(*) FROM TweetInformation")
+            self.assertEqual(cur.fetchone()[0], 80)
+
+    def test_acquire_times_out(self):
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), size=1, timeout=0.05)
+        with pool.connection():
+            with self.assertRaises(TimeoutError):
+                pool.acquire()
+        self.assertEqual(pool.metrics()["waits"], 1)
+        pool.close()
+
+    def test_invalid_connections_are_replaced(self):
+        stale = set()
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), size=1, validate=lambda conn: conn not in stale)
+        with pool.connection() as first:
+            stale.add(first)
+        with pool.connection() as second:
+            self.assertIsNot(first, second)
+        self.assertEqual(pool.metrics()["discarded"], 1)
+        self.assertEqual(pool.metrics()["open"], 1)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from dedup import DedupIndex, deduplicate, normalize_text, shingles
+from extract_dataframe import TweetDfExtractor
+from sample_tweets import SAMPLE_TWEETS
+
+WAVE = "Africa is in the midst of a fullblown third wave of coronavirus, the head of @WHOAFRO has warned"
+
+
+class TestDedup(unittest.TestCase):
+    """
+        A class for unit-testing the duplicate detection in dedup.py
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "dedup.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Third\nWAVE  of covid "), "third wave of covid")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_retweets_share_a_canonical(self):
+        df = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+        deduplicated = deduplicate(df, DedupIndex())
+        # the first and fourth tweets retweet the same full text
+        self.assertEqual(deduplicated["canonical_id"].iloc[0], deduplicated["canonical_id"].iloc[3])
+        self.assertEqual(deduplicated["canonical_id"].nunique(), 4)
+        self.assertEqual(deduplicated["is_canonical"].tolist(), [True, True, True, False, True])
+        self.assertEqual(deduplicated["duplicate_count"].tolist(), [2, 1, 1, 2, 1])
+
+    def test_near_duplicates(self):
+        texts = [WAVE, WAVE.upper(), WAVE + " today", WAVE.replace("third", "second"), "Great news for vaccine production"]
+        canonical_ids, is_canonical = DedupIndex().assign(texts)
+        self.assertEqual(len(set(canonical_ids[:3])), 1)
+        self.assertNotEqual(canonical_ids[0], canonical_ids[4])
+        self.assertEqual(is_canonical.tolist()[:3], [True, False, False])
+
+    def test_signatures_estimate_jaccard(self):
+        index = DedupIndex(num_perm=256, bands=32)
+        a, b = normalize_text(WAVE), normalize_text(WAVE + " today and tomorrow")
+        signatures = index.signatures([a, b])
+        jaccard = len(set(shingles(a)) & set(shingles(b))) / len(set(shingles(a)) | set(shingles(b)))
+        self.assertAlmostEqual(np.mean(signatures[0] == signatures[1]), jaccard, delta=0.1)
+
+    def test_signatures_in_batches(self):
+        index = DedupIndex()
+        texts = [normalize_text(text) for text in [WAVE, "", "great news", WAVE + " today", "vaccine"] * 3]
+        signatures = index.signatures(texts)
+        np.testing.assert_array_equal(index.signatures(texts, batch_size=4), signatures)
+        np.testing.assert_array_equal(index.signatures(texts, batch_size=1), signatures)
+        self.assertEqual(index.signatures([]).shape, (0, index.num_perm))
+
+    def test_index_persists_across_ingests(self):
+        index = DedupIndex(self.db_path)
+        first = deduplicate(pd.DataFrame({"clean_text": [WAVE, "Great news"]}), index)
+        index.close()
+        index = DedupIndex(self.db_path)
+        second = deduplicate(pd.DataFrame({"clean_text": [WAVE + " today", "Terrible queues", "Great news"]}), index)
+        self.assertEqual(second["canonical_id"].iloc[0], first["canonical_id"].iloc[0])
+        self.assertEqual(second["canonical_id"].iloc[2], first["canonical_id"].iloc[1])
+        self.assertEqual(second["is_canonical"].tolist(), [False, True, False])
+        self.assertEqual(second["duplicate_count"].tolist(), [2, 1, 2])
+        self.assertEqual(index.stats(), {"canonical": 3, "tweets": 5, "texts": 4})
+        index.close()
+
+    def test_rejects_bad_bands(self):
+        with self.assertRaises(ValueError):
+            DedupIndex(num_perm=64, bands=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from entity_index import EntityIndex, load_entity_indexes, save_entity_indexes
+from extract_dataframe import TweetDfExtractor
+from sample_tweets import SAMPLE_TWEETS
+
+HASHTAGS = ["#covid19 #vaccine", " ", "#covid19 #covid19", "#vaccine #red4research #covid19", None, "#red4research"]
+
+
+class TestEntityIndex(unittest.TestCase):
+    """
+        A class for unit-testing the hashtag and mention index in entity_index.py
+    """
+
+    def setUp(self):
+        self.index = EntityIndex(HASHTAGS)
+
+    def test_vocabulary_and_postings(self):
+        self.assertEqual(self.index.vocabulary.tolist(), ["#covid19", "#vaccine", "#red4research"])
+        self.assertEqual(self.index.postings("#covid19").tolist(), [0, 2, 3])
+        self.assertEqual(self.index.postings("#unknown").tolist(), [])
+        self.assertEqual(self.index.entities_of(3), ["#covid19", "#vaccine", "#red4research"])
+
+    def test_top_counts_tweets(self):
+        top = self.index.top(2)
+        self.assertEqual(top.index.tolist(), ["#covid19", "#vaccine"])
+        self.assertEqual(top.tolist(), [3, 2])
+
+    def test_any_and_all(self):
+        self.assertEqual(np.flatnonzero(self.index.rows_with_any(["#vaccine", "#red4research"])).tolist(), [0, 3, 5])
+        self.assertEqual(np.flatnonzero(self.index.rows_with_all(["#vaccine", "#covid19"])).tolist(), [0, 3])
+        self.assertFalse(self.index.rows_with_all(["#vaccine", "#unknown"]).any())
+
+    def test_co_occurring(self):
+        co = self.index.co_occurring("#vaccine")
+        self.assertEqual(co.to_dict(), {"#covid19": 2, "#red4research": 1})
+        self.assertTrue(self.index.co_occurring("#unknown").empty)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "entities.npz")
+            save_entity_indexes({"hashtags": self.index, "user_mentions": EntityIndex([" ", None])}, path)
+            loaded = load_entity_indexes(path)
+        self.assertEqual(loaded["hashtags"].vocabulary.tolist(), self.index.vocabulary.tolist())
+        self.assertEqual(loaded["hashtags"].co_occurring("#vaccine").to_dict(), {"#covid19": 2, "#red4research": 1})
+        self.assertEqual(len(loaded["user_mentions"]), 0)
+        self.assertEqual(loaded["user_mentions"].n_rows, 2)
+
+    def test_extractor_indexes_match_columns(self):
+        extractor = TweetDfExtractor(SAMPLE_TWEETS)
+        indexes = extractor.get_entity_indexes()
+        for column, find in (("hashtags", extractor.find_hashtags), ("user_mentions", extractor.find_mentions)):
+            for row, entities in enumerate(find()):
+                self.assertEqual(sorted(indexes[column].entities_of(row)), sorted(set(entities.split())))
+
+
+if __name__ == '__main__':
+    unittest.main()
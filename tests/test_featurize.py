@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor, stream_tweet_df
+from sample_tweets import SAMPLE_TWEETS, write_sample_json
+
+
+@unittest.skipUnless(importlib.util.find_spec("sklearn"), "featurization needs scikit-learn")
+class TestFeaturize(unittest.TestCase):
+    """
+        A class for unit-testing the streaming featurization in featurize.py
+    """
+
+    def setUp(self):
+        self.texts = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()["clean_text"].tolist()
+
+    def test_counts_match_count_vectorizer(self):
+        from featurize import StreamingFeaturizer
+        from sklearn.feature_extraction.text import CountVectorizer
+        X = StreamingFeaturizer().transform(self.texts)
+        counts = CountVectorizer(ngram_range=(1, 3)).fit_transform(self.texts)
+        self.assertEqual(X.format, "csr")
+        self.assertEqual(X.shape, (len(self.texts), 2 ** 20))
+        for i in range(len(self.texts)):
+            self.assertEqual(sorted(X[i].data), sorted(counts[i].data))
+
+    def test_tfidf_matches_tfidf_transformer(self):
+        from featurize import StreamingFeaturizer
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        featurizer = StreamingFeaturizer(tfidf=True).partial_fit(self.texts)
+        X = featurizer.transform(self.texts, update=False)
+        expected = TfidfVectorizer(ngram_range=(1, 3)).fit_transform(self.texts)
+        self.assertEqual(featurizer.n_documents, len(self.texts))
+        for i in range(len(self.texts)):
+            np.testing.assert_allclose(sorted(X[i].data), sorted(expected[i].data), rtol=1e-5)
+        np.testing.assert_allclose(np.asarray(X.multiply(X).sum(axis=1)).ravel(), 1, rtol=1e-5)
+
+    def test_chunks_update_document_frequencies(self):
+        from featurize import StreamingFeaturizer, featurize_chunks
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_file = write_sample_json(os.path.join(tmpdir, "tweets.json"))
+            featurizer = StreamingFeaturizer(tfidf=True)
+            chunks = list(featurize_chunks(stream_tweet_df(json_file, 2), featurizer))
+        self.assertEqual([X.shape[0] for _, X in chunks], [2, 2, 1])
+        self.assertEqual(featurizer.n_documents, 5)
+        self.assertEqual(featurizer.document_frequency.sum(), StreamingFeaturizer().transform(self.texts).nnz)
+
+    def test_save_and_load(self):
+        from featurize import StreamingFeaturizer
+        featurizer = StreamingFeaturizer(n_features=2 ** 12, ngram_range=(1, 2), tfidf=True).partial_fit(self.texts)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "featurizer.npz")
+            featurizer.save(path)
+            loaded = StreamingFeaturizer.load(path)
+        self.assertEqual((loaded.n_features, loaded.ngram_range, loaded.tfidf, loaded.n_documents), (2 ** 12, (1, 2), True, 5))
+        np.testing.assert_array_equal(loaded.document_frequency, featurizer.document_frequency)
+        np.testing.assert_array_equal(loaded.transform(self.texts, update=False).toarray(),
+                                      featurizer.transform(self.texts, update=False).toarray())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor
+from sample_tweets import SAMPLE_TWEETS
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "processed_tweets.csv")
+
+
+@unittest.skipUnless(importlib.util.find_spec("sklearn"), "the sklearn backend needs scikit-learn")
+class TestInference(unittest.TestCase):
+    """
+        A class for unit-testing the batch sentiment inference in inference.py
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from inference import SentimentModel, train_classifier
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.classifier_file = os.path.join(cls.tmpdir.name, "classifier.joblib")
+        df = pd.read_csv(DATA_FILE, usecols=["original_text", "polarity"], nrows=2000).dropna()
+        with warnings.catch_warnings():
+            # the vectorizer was pickled by an older scikit-learn
+            warnings.simplefilter("ignore")
+            train_classifier(df["original_text"], df["polarity"], classifier_path=cls.classifier_file)
+            cls.model = SentimentModel(classifier_path=cls.classifier_file)
+        cls.texts = df["original_text"].tolist()[:500]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_score_shape(self):
+        polarity, subjectivity, sentiment = self.model.score(self.texts)
+        self.assertEqual(len(polarity), len(self.texts))
+        self.assertTrue(all(-1 <= p <= 1 for p in polarity))
+        self.assertTrue(np.isnan(subjectivity).all())
+        self.assertLessEqual(set(sentiment), {"positive", "negative", "neutral"})
+
+    def test_batches_give_the_same_scores(self):
+        from inference import SentimentModel
+        small_batches = SentimentModel(classifier_path=self.classifier_file, batch_size=7)
+        self.assertEqual(small_batches.score(self.texts), self.model.score(self.texts))
+
+    def test_unknown_words_are_neutral(self):
+        polarity, _, sentiment = self.model.score(["zzqx qqzx", ""])
+        self.assertEqual(polarity, [0.0, 0.0])
+        self.assertEqual(sentiment, ["neutral", "neutral"])
+
+    def test_missing_classifier(self):
+        from inference import SentimentModel
+        with self.assertRaises(FileNotFoundError):
+            SentimentModel(classifier_path=os.path.join(self.tmpdir.name, "missing.joblib"))
+
+    def test_extractor_backend(self):
+        with self.assertRaises(ValueError):
+            TweetDfExtractor(SAMPLE_TWEETS, sentiment_backend="vader")
+        from inference import get_sentiment_model
+        extractor = TweetDfExtractor(SAMPLE_TWEETS, sentiment_backend="sklearn")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            df = extractor.get_tweet_df()
+        # the classifier persisted in data_preprocessors
+        polarity, _, sentiment = get_sentiment_model().score(extractor.find_full_text())
+        np.testing.assert_allclose(df["polarity"], polarity, rtol=1e-6)
+        self.assertEqual(df["sentiment"].tolist(), sentiment)
+
+
+if __name__ == '__main__':
+    unittest.main()
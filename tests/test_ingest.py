@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor, TweetPredicate, read_json
+from ingest import find_inputs, ingest, plan_shards
+from sample_tweets import SAMPLE_TWEETS, write_sample_json
+from tweet_storage import read_parquet
+
+
+class KillingPredicate(TweetPredicate):
+    """
+    exits the process reading the first tweet, once: the marker file it creates stops the next ones
+    """
+
+    def __init__(self, marker: str):
+        super().__init__()
+        self.marker = marker
+
+    def matches(self, tweet: dict) -> bool:
+        if not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            os._exit(1)
+        return super().matches(tweet)
+
+
+class TestIngest(unittest.TestCase):
+    """
+        A class for unit-testing the sharded ingestion in ingest.py
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.inputs = os.path.join(self.tmpdir.name, "dumps")
+        self.output = os.path.join(self.tmpdir.name, "tweets.parquet")
+        os.makedirs(self.inputs)
+        # two hourly dumps, the second one holding the first tweets again
+        self.files = [write_sample_json(os.path.join(self.inputs, "2021-06-18-17.json")),
+                      write_sample_json(os.path.join(self.inputs, "2021-06-18-18.json"), SAMPLE_TWEETS[:3])]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def expected_authors(self) -> list:
+        tweets = [tweet for path in self.files for tweet in read_json(path)[1]]
+        df = TweetDfExtractor(tweets).get_tweet_df()
+        # the dataset reads back by date partition, then in file and offset order
+        return df.sort_values("created_at", key=lambda created_at: created_at.dt.date, kind="stable")["original_author"].tolist()
+
+    def test_find_inputs(self):
+        self.assertEqual(find_inputs(self.inputs), self.files)
+        self.assertEqual(find_inputs(os.path.join(self.inputs, "*-18.json")), self.files[1:])
+
+    def test_shards_split_on_lines(self):
+        for shard_bytes in (1, 100, 700, 10 ** 6):
+            shards = plan_shards(self.files, shard_bytes)
+            for path in self.files:
+                file_shards = [shard for shard in shards if shard.path == path]
+                self.assertEqual(file_shards[0].start, 0)
+                self.assertEqual(file_shards[-1].end, os.path.getsize(path))
+                self.assertTrue(all(a.end == b.start for a, b in zip(file_shards, file_shards[1:])))
+                tweets = [tweet for shard in file_shards for tweet in read_json(path, None, shard.start, shard.end)[1]]
+                self.assertEqual(tweets, read_json(path)[1])
+
+    def test_ingest_is_deterministic(self):
+        summary = ingest(self.inputs, self.output, processes=2, shard_bytes=600)
+        self.assertEqual(summary["rows"], 8)
+        self.assertEqual(summary["failed"], [])
+        self.assertEqual(read_parquet(self.output)["original_author"].tolist(), self.expected_authors())
+
+        # a single shard per file gives the same dataset
+        single = os.path.join(self.tmpdir.name, "single.parquet")
+        ingest(self.inputs, single, processes=1)
+        pd.testing.assert_frame_equal(read_parquet(single), read_parquet(self.output), check_categorical=False)
+
+    def test_ingest_with_predicate(self):
+        summary = ingest(self.inputs, self.output, processes=1, predicate=TweetPredicate(lang="fr"))
+        self.assertEqual(summary["rows"], 2)
+        self.assertEqual(set(read_parquet(self.output)["lang"]), {"fr"})
+
+    def test_single_process_runs_serially(self):
+        parallel = os.path.join(self.tmpdir.name, "parallel")
+        ingest(self.inputs, parallel, processes=2, shard_bytes=600)
+        with mock.patch("ingest.ProcessPoolExecutor", side_effect=AssertionError("process pool")), \
+                mock.patch("ingest.os.cpu_count", return_value=1):
+            summary = ingest(self.inputs, self.output, shard_bytes=600)
+            pd.testing.assert_frame_equal(read_parquet(self.output), read_parquet(parallel), check_categorical=False)
+            self.assertEqual(summary["rows"], len(SAMPLE_TWEETS) + 3)
+
+            with open(self.files[1], "a") as f:
+                f.write("{not json\n")
+            summary = ingest(self.inputs, self.output, processes=1, shard_bytes=600, retries=1)
+        self.assertEqual([shard.path for shard in summary["failed"]], [self.files[1]])
+
+    def test_failed_shard_is_retried_alone(self):
+        with open(self.files[1], "a") as f:
+            f.write("{not json\n")
+        summary = ingest(self.inputs, self.output, processes=2, shard_bytes=600, retries=1)
+        self.assertEqual([shard.path for shard in summary["failed"]], [self.files[1]])
+
+        with open(self.files[1], "w") as f:
+            f.write("".join(json.dumps(tweet) + "\n" for tweet in SAMPLE_TWEETS[:3]))
+        summary = ingest(self.inputs, self.output, processes=2, shard_bytes=600, resume=True)
+        self.assertEqual(summary["failed"], [])
+        # the shards of the untouched file are not redone, those of the rewritten one are
+        self.assertEqual(summary["skipped"], len(plan_shards(self.files[:1], 600)))
+        self.assertEqual(summary["rows"], 3)
+        self.assertEqual(read_parquet(self.output)["original_author"].tolist(), self.expected_authors())
+
+    def test_dead_worker_is_replaced(self):
+        predicate = KillingPredicate(os.path.join(self.tmpdir.name, "killed"))
+        summary = ingest(self.inputs, self.output, processes=2, shard_bytes=600, retries=1, predicate=predicate)
+        self.assertTrue(os.path.exists(predicate.marker))
+        self.assertEqual(summary["failed"], [])
+        self.assertEqual(summary["rows"], len(SAMPLE_TWEETS) + 3)
+        self.assertEqual(read_parquet(self.output)["original_author"].tolist(), self.expected_authors())
+
+
+if __name__ == '__main__':
+    unittest.main()
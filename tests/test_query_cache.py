@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Sql and streamlit')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from query_cache import QueryCache, _sizeof, shared_cache
+
+
+class TestQueryCache(unittest.TestCase):
+    """
+        A class for unit-testing the dashboard cache in Sql and streamlit/query_cache.py
+    """
+
+    def test_cached_calls_once_per_arguments(self):
+        cache = QueryCache()
+        calls = []
+
+        @cache.cached(ttl=60)
+        def query(column, limit=10):
+            calls.append((column, limit))
+            return [column] * limit
+
+        self.assertEqual(query("place", limit=2), ["place", "place"])
+        self.assertEqual(query("place", limit=2), ["place", "place"])
+        query("source", limit=2)
+        self.assertEqual(calls, [("place", 2), ("source", 2)])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_ttl_expires(self):
+        cache = QueryCache()
+        cache.put("key", 1, ttl=0.01)
+        self.assertEqual(cache.get("key"), 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["expired"], 1)
+
+    def test_lru_eviction_under_max_bytes(self):
+        df = pd.DataFrame({"x": range(1000)})
+        cache = QueryCache(max_bytes=int(df.memory_usage(deep=True).sum()) * 2)
+        cache.put("a", df)
+        cache.put("b", df)
+        cache.get("a")
+        cache.put("c", df)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evicted"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], cache.max_bytes)
+
+    def test_version_change_invalidates(self):
+        version = [1]
+        cache = QueryCache(version=lambda: version[0], check_interval=0)
+        cache.put("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+        version[0] = 2
+        self.assertIsNone(cache.get("key"))
+
+    def test_failing_version_keeps_entries(self):
+        def version():
+            raise ConnectionError("database is down")
+
+        cache = QueryCache(version=version, check_interval=0)
+        cache.put("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+
+    def test_snapshot_warms_a_new_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.pkl")
+            cache = QueryCache(snapshot_file=path, version=lambda: "v1", check_interval=0)
+            cache.get("missing")
+            cache.put("kept", pd.DataFrame({"x": [1, 2]}))
+            cache.put("expired", 1, ttl=0)
+            cache.close()
+
+            warm = QueryCache(snapshot_file=path, version=lambda: "v1", check_interval=0)
+            self.assertEqual(warm.get("kept")["x"].tolist(), [1, 2])
+            self.assertIsNone(warm.get("expired"))
+            warm.close()
+
+            changed = QueryCache(snapshot_file=path, version=lambda: "v2", check_interval=0)
+            self.assertIsNone(changed.get("kept"))
+            self.assertEqual(changed.stats()["invalidations"], 1)
+            changed.close()
+
+    def test_snapshot_saved_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.pkl")
+            cache = QueryCache(snapshot_file=path, snapshot_interval=0)
+            cache.put("kept", [1, 2])
+            cache._saver.join()
+            self.assertTrue(os.path.exists(path))
+            cache.close()
+            warm = QueryCache(snapshot_file=path)
+            self.assertEqual(warm.get("kept"), [1, 2])
+            warm.close()
+
+    def test_sizes_are_estimated_without_pickling(self):
+        from extract_dataframe import TweetDfExtractor
+        from sample_tweets import SAMPLE_TWEETS
+        from term_frequencies import TermFrequencies
+        from tweet_filter import TweetFilter
+
+        df = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+        tweet_filter = TweetFilter(df)
+        tweet_filter.filter(hashtags=["#covid19"])
+        with mock.patch("query_cache.pickle.dumps", side_effect=AssertionError("pickled")):
+            sizes = {"filter": _sizeof(tweet_filter), "index": _sizeof(tweet_filter._indexes["hashtags"]),
+                     "frequencies": _sizeof(TermFrequencies.from_df(df)), "df": _sizeof(df),
+                     "rows": _sizeof([("a", 1), ("b", 2)])}
+        self.assertGreater(sizes["filter"], sizes["df"] + sizes["index"])
+        self.assertTrue(all(size > 0 for size in sizes.values()))
+
+    def test_shared_cache_is_reused(self):
+        self.assertIs(shared_cache("test", max_bytes=1024), shared_cache("test"))
+
+
+if __name__ == '__main__':
+    unittest.main()
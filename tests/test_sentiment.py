@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sentiment import SentimentCache, score_sentiments, text_category
+
+TEXTS = ["What a great and happy day", "This is a terrible, sad outcome", "The meeting is on Friday"] * 4
+
+
+class TestSentiment(unittest.TestCase):
+    """
+        A class for unit-testing the sentiment scoring in sentiment.py
+    """
+
+    def test_text_category(self):
+        self.assertEqual([text_category(p) for p in [0.5, -0.1, 0]], ["positive", "negative", "neutral"])
+
+    def test_score_sentiments(self):
+        polarity, subjectivity, sentiment = score_sentiments(TEXTS[:3])
+        self.assertEqual(sentiment, ["positive", "negative", "neutral"])
+        self.assertEqual(len(polarity), 3)
+        self.assertEqual(len(subjectivity), 3)
+
+    def test_process_pool_keeps_order(self):
+        self.assertEqual(score_sentiments(TEXTS, processes=2, batch_size=5), score_sentiments(TEXTS))
+
+    def test_shared_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor, \
+                mock.patch("sentiment.ProcessPoolExecutor", side_effect=AssertionError("new pool")):
+            for _ in range(2):
+                self.assertEqual(score_sentiments(TEXTS, processes=2, batch_size=5, executor=executor),
+                                 score_sentiments(TEXTS))
+
+
+    def test_cache_key_normalizes_whitespace(self):
+        self.assertEqual(SentimentCache.key(" great\n\nnews "), SentimentCache.key("great news"))
+        self.assertNotEqual(SentimentCache.key("great news"), SentimentCache.key("Great news"))
+
+    def test_cache_scores_repeated_texts_once(self):
+        cache = SentimentCache()
+        self.assertEqual(score_sentiments(TEXTS, cache=cache), score_sentiments(TEXTS))
+        self.assertEqual(cache.stats()["misses"], 3)
+        score_sentiments(TEXTS[:2], cache=cache)
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_cache_lru_eviction(self):
+        cache = SentimentCache(max_size=2)
+        cache.put_many({"a": (0.1, 0.2), "b": (0.3, 0.4)})
+        cache.get_many(["a"])
+        cache.put_many({"c": (0.5, 0.6)})
+        self.assertEqual(sorted(cache.get_many(["a", "b", "c"])), ["a", "c"])
+
+    def test_cache_persists_on_disk(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "sentiment.db")
+            cache = SentimentCache(db_path=db_path)
+            expected = score_sentiments(TEXTS, cache=cache)
+            cache.close()
+
+            cache = SentimentCache(db_path=db_path)
+            self.assertEqual(score_sentiments(TEXTS, cache=cache), expected)
+            self.assertEqual(cache.stats()["disk_hits"], 3)
+            self.assertEqual(cache.stats()["misses"], 0)
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
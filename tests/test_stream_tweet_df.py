@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor, iter_json_chunks, read_json, save_tweet_df_stream, stream_tweet_df
+from sample_tweets import write_sample_json
+from tweet_schema import concat_tweet_dfs
+
+
+class TestStreamTweetDf(unittest.TestCase):
+    """
+        A class for unit-testing the chunked readers in extract_dataframe.py
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_file = write_sample_json(os.path.join(self.tmpdir.name, "tweets.json"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_iter_json_chunks(self):
+        self.assertEqual([len(chunk) for chunk in iter_json_chunks(self.json_file, 2)], [2, 2, 1])
+
+    def test_iter_json_chunks_rejects_bad_size(self):
+        with self.assertRaises(ValueError):
+            next(iter_json_chunks(self.json_file, 0))
+
+    def test_stream_matches_get_tweet_df(self):
+        _, tweets = read_json(self.json_file)
+        expected = TweetDfExtractor(tweets).get_tweet_df()
+        pd.testing.assert_frame_equal(concat_tweet_dfs(stream_tweet_df(self.json_file, 2)), expected)
+
+    def test_stream_shares_one_process_pool(self):
+        _, tweets = read_json(self.json_file)
+        expected = TweetDfExtractor(tweets).get_tweet_df()
+        with mock.patch("extract_dataframe.ProcessPoolExecutor") as pool_class:
+            dfs = list(stream_tweet_df(self.json_file, 2, sentiment_processes=2))
+        pool_class.assert_called_once_with(max_workers=2)
+        pool_class.return_value.shutdown.assert_called_once_with()
+        # the chunks are smaller than a scoring batch, so they are scored without the pool
+        pd.testing.assert_frame_equal(concat_tweet_dfs(dfs), expected)
+
+    def test_save_tweet_df_stream(self):
+        output_file = os.path.join(self.tmpdir.name, "out.csv")
+        self.assertEqual(save_tweet_df_stream(self.json_file, output_file, 2), 5)
+        _, tweets = read_json(self.json_file)
+        expected_file = os.path.join(self.tmpdir.name, "expected.csv")
+        TweetDfExtractor(tweets).get_tweet_df().to_csv(expected_file, index=False)
+        with open(output_file) as out, open(expected_file) as expected:
+            self.assertEqual(out.read(), expected.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from term_frequencies import TermFrequencies, sensitivity_label, tokenize
+
+df = pd.DataFrame({
+    "clean_text": ["Vaccines work vaccines", "WHO's update 2021", None, "stay safe", "vaccines"],
+    "sentiment": ["positive", "negative", "neutral", "positive", "positive"],
+    "possibly_sensitive": [False, True, None, "False", float("nan")],
+})
+
+
+class TestTermFrequencies(unittest.TestCase):
+    """
+        A class for unit-testing the word cloud counts in term_frequencies.py
+    """
+
+    def setUp(self):
+        self.term_frequencies = TermFrequencies.from_df(df)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("WHO's update 2021, it's #covid19"), ["who", "update", "it", "covid19"])
+
+    def test_sensitivity_label(self):
+        self.assertEqual([sensitivity_label(value) for value in df["possibly_sensitive"]],
+                         ["False", "True", "unknown", "False", "unknown"])
+
+    def test_frequencies_by_sentiment_and_sensitivity(self):
+        self.assertEqual(self.term_frequencies.sentiments(), ["negative", "neutral", "positive"])
+        self.assertEqual(self.term_frequencies.sensitivities("positive"), ["False", "unknown"])
+        self.assertEqual(self.term_frequencies.frequencies("positive"), {"vaccines": 3, "work": 1, "stay": 1, "safe": 1})
+        self.assertEqual(self.term_frequencies.frequencies("positive", "False", stopwords={"work"}, max_words=2),
+                         {"vaccines": 2, "stay": 1})
+        self.assertEqual(self.term_frequencies.frequencies("neutral"), {})
+
+    def test_incremental_updates_match_one_pass(self):
+        term_frequencies = TermFrequencies()
+        term_frequencies.update_df(df.iloc[:2])
+        term_frequencies.update_df(df.iloc[2:])
+        self.assertEqual(term_frequencies.frequencies(max_words=None), self.term_frequencies.frequencies(max_words=None))
+        self.assertEqual(term_frequencies.n_tweets, len(df))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "term_frequencies.json")
+            self.term_frequencies.save(path)
+            loaded = TermFrequencies.load(path)
+        self.assertEqual(loaded.n_tweets, len(df))
+        self.assertEqual(loaded.frequencies("positive", "unknown"), {"vaccines": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
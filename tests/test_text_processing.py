@@ -0,0 +1,46 @@
+import os
+import re
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from text_processing import clean_text, extract_hashtags, extract_mentions, process_texts, remove_place_characters
+
+TEXTS = ['🚨Africa is "in the midst of a full-blown third wave" of coronavirus, the head of @WHOAFRO has warned\n\n@jriggers reports ~ 🧵\nhttps://t.co/CRDhqPHFWM',
+         "Thank you @research2note for creating this amazing campaign &amp; turning social media #red4research today.",
+         " leading and trailing　", "   ", "", "#A #b1 #1x @_ok it’s", "\x85 #Covid19-news\x1c"]
+
+
+class TestTextProcessing(unittest.TestCase):
+    """
+        A class for unit-testing the column cleaning in text_processing.py
+    """
+
+    def test_clean_text_matches_regex(self):
+        for text in TEXTS:
+            expected = re.sub(r"\s+", " ", re.sub(r"[^a-zA-Z0-9#@\s’,_]", "", text))
+            self.assertEqual(clean_text(text), expected)
+
+    def test_entities(self):
+        self.assertEqual(extract_hashtags("#A #b1 #1x #Covid19-news"), "#b1 #covid19-news")
+        self.assertEqual(extract_mentions("hi @WHOAFRO and @_ok"), "@whoafro @_ok")
+        self.assertEqual(extract_hashtags("no tags"), " ")
+        self.assertEqual(extract_mentions("@"), " ")
+
+    def test_process_texts(self):
+        clean, hashtags, mentions = process_texts(pd.Series(TEXTS))
+        self.assertEqual(clean, [clean_text(text) for text in TEXTS])
+        self.assertEqual(hashtags[1], "#red4research")
+        self.assertEqual(mentions[0], "@whoafro @jriggers")
+
+    def test_remove_place_characters(self):
+        places = pd.Series(["🇬🇧 London", "Addis Ababa, Ethiopia", None])
+        self.assertEqual(remove_place_characters(places).tolist()[:2], [" London", "Addis Ababa Ethiopia"])
+        self.assertTrue(pd.isna(remove_place_characters(places)[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "processed_tweets.csv")
+
+
+@unittest.skipUnless(importlib.util.find_spec("gensim"), "topic modelling needs gensim")
+class TestTopicModel(unittest.TestCase):
+    """
+        A class for unit-testing the online topic model in topic_model.py
+    """
+
+    def setUp(self):
+        texts = pd.read_csv(DATA_FILE, usecols=["clean_text"], nrows=1200)["clean_text"]
+        self.chunks = [pd.DataFrame({"clean_text": texts[start:start + 400]}) for start in range(0, len(texts), 400)]
+
+    def test_update_and_topics(self):
+        from topic_model import OnlineTopicModel, update_from_chunks
+        model = update_from_chunks(self.chunks, OnlineTopicModel(num_topics=3, sample_size=500))
+        self.assertEqual(model.n_documents, sum(chunk["clean_text"].str.split().str.len().gt(0).sum() for chunk in self.chunks))
+        topics = model.topics(5)
+        self.assertEqual([len(topic) for topic in topics], [5, 5, 5])
+        self.assertTrue(all(isinstance(word, str) for topic in topics for word, _ in topic))
+        self.assertTrue(np.isfinite(model.log_perplexity()))
+        self.assertTrue(-1 <= model.coherence() <= 1)
+
+    def test_sample_is_bounded(self):
+        from topic_model import OnlineTopicModel
+        model = OnlineTopicModel(num_topics=2, sample_size=100)
+        for chunk in self.chunks:
+            model.update(chunk["clean_text"])
+            self.assertEqual(len(model.sample), min(100, model.n_documents))
+        self.assertTrue(any(words in [text.split() for text in self.chunks[-1]["clean_text"].dropna()]
+                            for words in model.sample))
+
+    def test_word_table_is_bounded(self):
+        from topic_model import OnlineTopicModel
+        model = OnlineTopicModel(num_topics=2, id_range=64, sample_size=100)
+        for chunk in self.chunks:
+            model.update(chunk["clean_text"])
+        self.assertLessEqual(len(model.id2word), 64)
+        self.assertEqual(model.dictionary.id2token, {})
+        words = {word for topic in model.topics(10) for word, _ in topic}
+        self.assertTrue(words <= {word for word, _ in model.id2word.values()})
+
+    def test_checkpoint_resumes_the_stream(self):
+        from topic_model import OnlineTopicModel, update_from_chunks
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint = os.path.join(tmpdir, "topics.pkl")
+            update_from_chunks(self.chunks[:2], OnlineTopicModel(num_topics=3, sample_size=200), checkpoint=checkpoint)
+            resumed = update_from_chunks(self.chunks[2:], OnlineTopicModel.load(checkpoint), checkpoint=checkpoint)
+            self.assertEqual(OnlineTopicModel.load(checkpoint).n_documents, resumed.n_documents)
+        straight = update_from_chunks(self.chunks, OnlineTopicModel(num_topics=3, sample_size=200))
+        self.assertEqual(resumed.n_documents, straight.n_documents)
+        self.assertEqual(resumed.sample, straight.sample)
+        np.testing.assert_allclose(resumed.model.get_topics(), straight.model.get_topics(), rtol=1e-4)
+
+    def test_coherence_needs_documents(self):
+        from topic_model import OnlineTopicModel
+        with self.assertRaises(ValueError):
+            OnlineTopicModel().update([None, ""]).coherence()
+
+
+if __name__ == '__main__':
+    unittest.main()
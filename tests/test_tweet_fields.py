@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor, TweetField, compile_fields
+from sample_tweets import SAMPLE_TWEETS
+
+
+class TestTweetFields(unittest.TestCase):
+    """
+        A class for unit-testing the single pass field extraction in extract_dataframe.py
+    """
+
+    def test_compile_fields_fallbacks(self):
+        fill_columns = compile_fields((
+            TweetField("text", (("retweeted_status", "text"), ("text",))),
+            TweetField("place", (("user", "location"),), "unknown"),
+        ))
+        tweets = [{"text": "a", "retweeted_status": {"text": "b"}}, {"text": "c", "user": None}]
+        columns = [[None] * 2, [None] * 2]
+        fill_columns(tweets, columns)
+        self.assertEqual(columns, [["b", "c"], ["unknown", "unknown"]])
+
+    def test_required_field_raises(self):
+        fill_columns = compile_fields((TweetField("lang", (("lang",),)),))
+        with self.assertRaises(KeyError):
+            fill_columns([{}], [[None]])
+
+    def test_keys_are_used_as_is(self):
+        # keys that aren't identifiers, or that look like code, are plain dict keys
+        fill_columns = compile_fields((TweetField("odd", (("a'b", "]\n"),), None),
+                                       TweetField("count", (("__import__('os')",),), 0)))
+        columns = [[None] * 2, [None] * 2]
+        fill_columns([{"a'b": {"]\n": 1}, "__import__('os')": 2}, {}], columns)
+        self.assertEqual(columns, [[1, None], [2, 0]])
+
+    def test_find_methods_share_one_extraction(self):
+        extractor = TweetDfExtractor(SAMPLE_TWEETS)
+        self.assertIs(extractor.extract_columns(), extractor.extract_columns())
+        self.assertEqual(extractor.find_favourite_count(), [548, 3, 20, 549, 12])
+        self.assertEqual(extractor.is_sensitive(), [False, None, None, True, None])
+        self.assertEqual(extractor.find_hashtags(), ['#covid19', ' ', '#red4research', '#covid19', '#vaccine'])
+        self.assertEqual(extractor.find_mentions(), ['@whoafro', ' ', '@research2note', '@whoafro', '@nhsuk'])
+
+    def test_find_methods_return_copies(self):
+        extractor = TweetDfExtractor(SAMPLE_TWEETS)
+        extractor.find_lang().clear()
+        self.assertEqual(extractor.find_lang(), ['en', 'en', 'fr', 'en', 'en'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tweet_filter import TweetFilter
+
+df = pd.DataFrame({
+    "sentiment": ["positive", "negative", "neutral", "positive", None],
+    "lang": ["en", "en", "fr", "es", "en"],
+    "hashtags": ["#covid19 #vaccine", " ", "#covid19", "#red4research", None],
+    "user_mentions": ["@who", "@who @cdc", " ", " ", "@cdc"],
+})
+
+
+class TestTweetFilter(unittest.TestCase):
+    """
+        A class for unit-testing the in memory filtering in tweet_filter.py
+    """
+
+    def setUp(self):
+        self.tweet_filter = TweetFilter(df)
+
+    def test_category_filter_matches_isin(self):
+        for values in (["positive"], ["neutral", "negative"]):
+            expected = df[np.isin(df, values).any(axis=1)].reset_index(drop=True)
+            pd.testing.assert_frame_equal(self.tweet_filter.filter(sentiment=values), expected)
+
+    def test_entity_filter(self):
+        self.assertEqual(self.tweet_filter.mask(hashtags=["#covid19"]).tolist(), [True, False, True, False, False])
+        self.assertEqual(self.tweet_filter.mask(user_mentions=["@cdc", "@nobody"]).tolist(), [False, True, False, False, True])
+
+    def test_filters_combine(self):
+        mask = self.tweet_filter.mask(sentiment=["positive"], lang=["en"], hashtags=[])
+        self.assertEqual(mask.tolist(), [True, False, False, False, False])
+
+    def test_unknown_values_and_columns(self):
+        self.assertFalse(self.tweet_filter.mask(lang=["de"]).any())
+        with self.assertRaises(ValueError):
+            self.tweet_filter.mask(clean_text=["hello"])
+
+    def test_options(self):
+        self.assertEqual(self.tweet_filter.options("lang"), ["en", "es", "fr"])
+        self.assertEqual(self.tweet_filter.options("hashtags")[0], "#covid19")
+
+
+if __name__ == '__main__':
+    unittest.main()
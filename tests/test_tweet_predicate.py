@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor, TweetPredicate, iter_json_chunks, read_json, stream_tweet_df
+from sample_tweets import SAMPLE_TWEETS, write_sample_json
+from tweet_schema import concat_tweet_dfs
+
+
+class TestTweetPredicate(unittest.TestCase):
+    """
+        A class for unit-testing the early filtering and projection in extract_dataframe.py
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.json_file = write_sample_json(os.path.join(self.tmpdir.name, "tweets.json"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def authors(self, predicate: TweetPredicate) -> list:
+        _, tweets = read_json(self.json_file, predicate)
+        return [tweet["user"]["screen_name"] for tweet in tweets]
+
+    def test_lang(self):
+        self.assertEqual(len(self.authors(TweetPredicate(lang="en"))), 4)
+        self.assertEqual(len(self.authors(TweetPredicate(lang=["fr", "es"]))), 1)
+
+    def test_date_range(self):
+        self.assertEqual(self.authors(TweetPredicate(since="2021-06-19")), ["pash22"])
+        self.assertEqual(len(self.authors(TweetPredicate(until="2021-06-18 17:56:00"))), 2)
+        # since is inclusive and until exclusive
+        self.assertEqual(len(self.authors(TweetPredicate(since="2021-06-18 17:55:59", until="2021-06-18 17:56:10"))), 2)
+
+    def test_has_hashtag(self):
+        with_hashtag = self.authors(TweetPredicate(has_hashtag=True))
+        without_hashtag = self.authors(TweetPredicate(has_hashtag=False))
+        df = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+        self.assertEqual(with_hashtag, df.loc[df["hashtags"] != " ", "original_author"].tolist())
+        self.assertEqual(without_hashtag, df.loc[df["hashtags"] == " ", "original_author"].tolist())
+
+    def test_lang_written_differently(self):
+        # spacing of a pretty printer, a unicode escape and a compact dump
+        lines = [json.dumps(SAMPLE_TWEETS[0], separators=(", ", " : ")),
+                 json.dumps(SAMPLE_TWEETS[1]).replace('"lang": "en"', '"lang":\t"\\u0065n"'),
+                 json.dumps(SAMPLE_TWEETS[2], separators=(",", ":")),
+                 json.dumps(SAMPLE_TWEETS[4], separators=(",", ":"))]
+        with open(self.json_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        self.assertEqual(self.authors(TweetPredicate(lang="en")), ["ketuesriche", "Grid1949", "pash22"])
+        self.assertEqual(self.authors(TweetPredicate(lang="fr")), ["LeeTomlinson8"])
+        predicate = TweetPredicate(lang=["en", "fr"])
+        self.assertTrue(all(predicate.line_may_match(line) for line in lines))
+
+    def test_skipped_lines_are_not_parsed(self):
+        with mock.patch("extract_dataframe.json.loads", side_effect=json.loads) as loads:
+            read_json(self.json_file, TweetPredicate(lang="fr"))
+        self.assertEqual(loads.call_count, 1)
+
+    def test_extractor_predicate_matches_read_json(self):
+        predicate = TweetPredicate(lang="en", has_hashtag=True)
+        _, tweets = read_json(self.json_file, predicate)
+        pd.testing.assert_frame_equal(TweetDfExtractor(SAMPLE_TWEETS, predicate=predicate).get_tweet_df(),
+                                      TweetDfExtractor(tweets).get_tweet_df())
+
+    def test_stream_with_predicate(self):
+        predicate = TweetPredicate(lang="en")
+        self.assertEqual([len(chunk) for chunk in iter_json_chunks(self.json_file, 3, predicate)], [3, 1])
+        df = concat_tweet_dfs(stream_tweet_df(self.json_file, 3, predicate=predicate))
+        self.assertEqual(list(df.index), [0, 1, 2, 3])
+        self.assertEqual(set(df["lang"]), {"en"})
+
+    def test_projection(self):
+        columns = ["created_at", "lang", "hashtags"]
+        full = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+        with mock.patch("extract_dataframe.score_sentiments") as score_sentiments:
+            projected = TweetDfExtractor(SAMPLE_TWEETS, columns=columns).get_tweet_df()
+        score_sentiments.assert_not_called()
+        pd.testing.assert_frame_equal(projected, full[columns])
+
+    def test_projection_rejects_unknown_columns(self):
+        with self.assertRaises(ValueError):
+            TweetDfExtractor(SAMPLE_TWEETS, columns=["created_at", "likes"])
+
+
+if __name__ == '__main__':
+    unittest.main()
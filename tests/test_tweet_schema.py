@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor
+from tweet_schema import apply_schema, concat_tweet_dfs, memory_report
+from sample_tweets import SAMPLE_TWEETS
+
+
+class TestTweetSchema(unittest.TestCase):
+    """
+        A class for unit-testing the compact dtypes in tweet_schema.py
+    """
+
+    def setUp(self):
+        self.untyped = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df(typed=False)
+        self.typed = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+
+    def test_dtypes(self):
+        dtypes = self.typed.dtypes
+        for column in ["source", "lang", "sentiment", "possibly_sensitive", "place"]:
+            self.assertIsInstance(dtypes[column], pd.CategoricalDtype)
+        self.assertEqual(list(dtypes["sentiment"].categories), ["negative", "neutral", "positive"])
+        for column in ["favorite_count", "retweet_count", "followers_count", "friends_count"]:
+            self.assertEqual(dtypes[column], np.uint32)
+        self.assertEqual(dtypes["polarity"], np.float32)
+        self.assertEqual(str(dtypes["created_at"].tz), "UTC")
+
+    def test_values_are_unchanged(self):
+        self.assertEqual(self.typed["possibly_sensitive"].isna().tolist(), self.untyped["possibly_sensitive"].isna().tolist())
+        self.assertEqual(self.typed["place"].astype(object).fillna("missing").tolist(),
+                         self.untyped["place"].astype(object).fillna("missing").tolist())
+        self.assertEqual(self.typed["followers_count"].tolist(), self.untyped["followers_count"].tolist())
+        np.testing.assert_allclose(self.typed["polarity"], self.untyped["polarity"], rtol=1e-6)
+        self.assertEqual(self.typed["created_at"].dt.strftime("%a %b %d %H:%M:%S +0000 %Y").tolist(),
+                         self.untyped["created_at"].tolist())
+
+    def test_missing_counts_become_nullable(self):
+        df = apply_schema(pd.DataFrame({"retweet_count": [1.0, None], "friends_count": ["3", "4"]}))
+        self.assertEqual(str(df["retweet_count"].dtype), "UInt32")
+        self.assertEqual(df["friends_count"].dtype, np.uint32)
+
+    def test_concat_merges_categories(self):
+        df = concat_tweet_dfs([apply_schema(self.untyped.iloc[:2].copy()), apply_schema(self.untyped.iloc[2:].copy())])
+        pd.testing.assert_frame_equal(df, self.typed)
+
+    def test_memory_report(self):
+        report = memory_report(self.untyped, self.typed)
+        self.assertEqual(report.index[-1], "total")
+        self.assertLess(report.loc["total", "mib_after"], report.loc["total", "mib_before"])
+
+
+if __name__ == '__main__':
+    unittest.main()
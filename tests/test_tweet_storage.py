@@ -0,0 +1,74 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from extract_dataframe import TweetDfExtractor
+from tweet_storage import csv_to_parquet, parse_created_at, read_parquet, read_tweets, write_parquet
+from sample_tweets import SAMPLE_TWEETS
+
+
+class TestParseCreatedAt(unittest.TestCase):
+
+    def test_formats(self):
+        api = parse_created_at(pd.Series(["Fri Jun 18 17:55:49 +0000 2021"]))
+        processed = parse_created_at(pd.Series(["2021-06-18 17:55:49+00:00"]))
+        self.assertEqual(api[0], processed[0])
+        self.assertEqual(str(api.dt.tz), "UTC")
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestTweetStorage(unittest.TestCase):
+    """
+        A class for unit-testing the parquet storage in tweet_storage.py
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tweets.parquet")
+        self.df = TweetDfExtractor(SAMPLE_TWEETS).get_tweet_df()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_partitions_by_date(self):
+        write_parquet(self.df, self.path)
+        self.assertEqual(sorted(os.listdir(self.path)), ["date=2021-06-18", "date=2021-06-19"])
+        df = read_parquet(self.path).sort_values("created_at", kind="stable").reset_index(drop=True)
+        self.assertEqual(df["original_author"].tolist(), self.df["original_author"].tolist())
+        self.assertIsInstance(df["source"].dtype, pd.CategoricalDtype)
+
+    def test_projection_and_filters(self):
+        write_parquet(self.df.iloc[:2], self.path)
+        write_parquet(self.df.iloc[2:], self.path)
+        df = read_tweets(self.path, columns=["original_author"], filters=[("date", "==", "2021-06-18"), ("lang", "==", "en")])
+        self.assertEqual(list(df.columns), ["original_author"])
+        self.assertEqual(sorted(df["original_author"]), ["Grid1949", "RIPNY08", "ketuesriche"])
+
+    def test_chunks_with_missing_columns(self):
+        # the second chunk has no place, sensitivity, hashtags or counts at all
+        csv_path = os.path.join(self.tmpdir.name, "processed.csv")
+        df = self.df.iloc[:4].copy()
+        df["possibly_sensitive"] = df["possibly_sensitive"].astype(object)
+        for column in ["place", "possibly_sensitive", "hashtags", "favorite_count"]:
+            df.loc[2:, column] = None
+        df.to_csv(csv_path, index=False)
+        csv_to_parquet(csv_path, self.path, chunksize=2)
+        write_parquet(df.iloc[2:], self.path)
+
+        df = read_parquet(self.path)
+        self.assertEqual(len(df), 6)
+        self.assertIsInstance(df["place"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["place"].isna().sum(), 4)
+        self.assertEqual(df["possibly_sensitive"].isna().sum(), 4 + self.df["possibly_sensitive"].iloc[:2].isna().sum())
+        self.assertEqual(df["favorite_count"].isna().sum(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
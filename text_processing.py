@@ -0,0 +1,95 @@
+import re
+
+import pandas as pd
+
+# compiled once at import instead of looked up in re's cache for every row
+TEXT_CHARACTERS = re.compile(r"[^a-zA-Z0-9#@\s’,_]")
+PLACE_CHARACTERS = re.compile(r"[^a-zA-Z0-9\s_-]")
+WHITESPACE = re.compile(r"\s+")
+HASHTAG = re.compile(r"(#[A-Za-z]+[A-Za-z0-9_-]+)")
+MENTION = re.compile(r"(@[A-Za-z0-9_]+)")
+
+
+class _TextCharacterTable(dict):
+    """
+    str.translate table that deletes the characters TEXT_CHARACTERS matches.
+    each code point is classified with the pattern the first time it's seen,
+    after that translate looks it up without calling back into python
+    """
+
+    def __missing__(self, code: int):
+        self[code] = None if TEXT_CHARACTERS.match(chr(code)) else code
+        return self[code]
+
+
+_TEXT_CHARACTER_TABLE = _TextCharacterTable()
+
+
+def _collapse_whitespace(text: str) -> str:
+    """same as WHITESPACE.sub(" ", text), both use str.isspace's notion of whitespace"""
+    collapsed = " ".join(text.split())
+    # split drops the leading and trailing runs that the substitution keeps
+    if text[:1].isspace():
+        collapsed = " " + collapsed
+    if text[-1:].isspace() and collapsed != " ":
+        collapsed += " "
+    return collapsed
+
+
+def clean_text(text: str) -> str:
+    """
+    removes every character except alphanumerics, #, @, whitespace, ’, comma
+    and underscore, then collapses runs of whitespace into a single space
+    """
+    return _collapse_whitespace(text.translate(_TEXT_CHARACTER_TABLE))
+
+
+def extract_hashtags(text: str) -> str:
+    """
+    returns the lower cased hashtags of a cleaned text joined by spaces,
+    or a single space when there are none
+    """
+    text = str(text)
+    if "#" not in text:
+        return " "
+    # the pattern only matches ascii letters, so lower casing the matches
+    # gives the same result as lower casing the whole text first
+    return " ".join(HASHTAG.findall(text)).lower() or " "
+
+
+def extract_mentions(text: str) -> str:
+    """
+    returns the lower cased user mentions of a cleaned text joined by spaces,
+    or a single space when there are none
+    """
+    text = str(text)
+    if "@" not in text:
+        return " "
+    return " ".join(MENTION.findall(text)).lower() or " "
+
+
+def process_texts(texts) -> tuple:
+    """
+    cleans a column of tweet texts and extracts its hashtags and user
+    mentions in one pass over the column
+    Args:
+    -----
+    texts: list or pd.Series of str
+
+    Returns
+    -------
+    clean_text, hashtags and user_mentions lists
+    """
+
+    clean = [clean_text(text) for text in texts]
+    hashtags = [extract_hashtags(text) for text in clean]
+    mentions = [extract_mentions(text) for text in clean]
+    return clean, hashtags, mentions
+
+
+def remove_place_characters(column: pd.Series) -> pd.Series:
+    """
+    removes non-alphanumeric characters with the exception of underscore
+    hyphen and whitespace from a whole column, missing values stay missing
+    """
+    return column.str.replace(PLACE_CHARACTERS, "", regex=True)
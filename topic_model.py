@@ -0,0 +1,176 @@
+import os
+import pickle
+import random
+
+
+def _gensim():
+    try:
+        import gensim.corpora
+        import gensim.models
+    except ImportError as e:
+        raise ImportError("topic modelling needs gensim, install it with `pip install gensim`") from e
+    return gensim
+
+
+class OnlineTopicModel:
+    """
+    the notebook's LDA topic model, kept up to date chunk by chunk instead of
+    rebuilt over the whole clean_text column for every new dump.
+
+    the words are mapped to ids by a HashDictionary, whose id space is fixed so
+    that the online LdaModel, which can't grow its vocabulary, is updated with
+    the documents of every new chunk. a reservoir keeps a uniform sample of at
+    most sample_size documents of the stream, on which the coherence is computed,
+    so an update costs in proportion to the new chunk and not to the whole stream.
+    the dictionary doesn't keep the words behind its ids, which would grow with
+    every new word of the stream: each id remembers a single word, the one most
+    of the documents hashed to it hold, so that table has at most id_range entries.
+
+    Args:
+    -----
+    num_topics: int - number of topics
+    id_range: int - number of word ids, words beyond that share ids
+    sample_size: int - number of documents kept for the coherence
+    seed: int - random state of the model and of the sample
+    chunksize: int - documents per online update step of the LdaModel
+    """
+
+    def __init__(self, num_topics: int = 5, id_range: int = 2 ** 16, sample_size: int = 5000, seed: int = 100,
+                 chunksize: int = 100):
+        gensim = _gensim()
+        self.num_topics = num_topics
+        self.sample_size = sample_size
+        self.seed = seed
+        self.chunksize = chunksize
+        self.dictionary = gensim.corpora.HashDictionary(id_range=id_range, debug=False)
+        # word id -> [word, votes], the words shown in the topics and scored by the coherence
+        self.id2word = {}
+        self.model = None
+        self.sample = []
+        self.n_documents = 0
+        self._random = random.Random(seed)
+
+    def update(self, texts) -> "OnlineTopicModel":
+        """
+        adds a chunk of clean_text to the dictionary, the model and the sample
+        """
+        word_lists = [text.split() for text in texts if isinstance(text, str)]
+        word_lists = [words for words in word_lists if words]
+        if not word_lists:
+            return self
+
+        self._vote_words(word_lists)
+        corpus = [self.dictionary.doc2bow(words) for words in word_lists]
+        if self.model is None:
+            self.model = _gensim().models.LdaModel(corpus, id2word=self.dictionary, num_topics=self.num_topics,
+                                                   random_state=self.seed, update_every=1, chunksize=self.chunksize,
+                                                   alpha="auto", per_word_topics=True)
+        else:
+            self.model.update(corpus)
+
+        for words in word_lists:
+            # algorithm R: after n documents each one is in the sample with probability sample_size / n
+            self.n_documents += 1
+            if len(self.sample) < self.sample_size:
+                self.sample.append(words)
+            else:
+                i = self._random.randrange(self.n_documents)
+                if i < self.sample_size:
+                    self.sample[i] = words
+        return self
+
+    def _vote_words(self, word_lists: list):
+        # boyer-moore majority vote per id over the documents: a word held by more than half
+        # of the documents whose words share its id is the one kept
+        for words in word_lists:
+            for word in dict.fromkeys(words):
+                word_id = self.dictionary.restricted_hash(word)
+                entry = self.id2word.get(word_id)
+                if entry is None or entry[1] == 0:
+                    self.id2word[word_id] = [word, 1]
+                elif entry[0] == word:
+                    entry[1] += 1
+                else:
+                    entry[1] -= 1
+
+    def _word(self, word_id: int) -> str:
+        entry = self.id2word.get(word_id)
+        return str(word_id) if entry is None else entry[0]
+
+    def topics(self, num_words: int = 10) -> list:
+        """
+        the num_words most likely words of every topic, as lists of (word, probability)
+        """
+        if self.model is None:
+            return []
+        return [[(self._word(word_id), float(p)) for word_id, p in self.model.get_topic_terms(topic, num_words)]
+                for topic in range(self.num_topics)]
+
+    def coherence(self, coherence: str = "c_v", num_words: int = 10) -> float:
+        """
+        coherence of the topics measured on the sampled documents, c_v by default like the notebook.
+        nan when none of the topics' words is in the sample
+        """
+        if self.model is None:
+            raise ValueError("the model has not seen any document yet")
+        gensim = _gensim()
+        dictionary = gensim.corpora.Dictionary(self.sample)
+        # words missing from the sample can't be scored, a topic without any is left out
+        topics = [[word for word, _ in topic if word in dictionary.token2id] for topic in self.topics(num_words)]
+        topics = [topic for topic in topics if topic]
+        if not topics:
+            return float("nan")
+        return gensim.models.CoherenceModel(topics=topics, texts=self.sample, dictionary=dictionary,
+                                            coherence=coherence).get_coherence()
+
+    def log_perplexity(self) -> float:
+        """
+        per word likelihood bound of the model on the sampled documents
+        """
+        return self.model.log_perplexity([self.dictionary.doc2bow(words) for words in self.sample])
+
+    def save(self, path: str):
+        """
+        checkpoints the model, the dictionary and the sample to a single file, replaced atomically
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineTopicModel":
+        """
+        reads a checkpoint written by save, ready to go on with the stream
+        """
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def update_from_chunks(dfs, topic_model: OnlineTopicModel, column: str = "clean_text", checkpoint: str = None,
+                       checkpoint_every: int = 1) -> OnlineTopicModel:
+    """
+    updates a topic model with every chunk of a tweets stream, e.g. the
+    dataframes of extract_dataframe.stream_tweet_df
+    Args:
+    -----
+    dfs: iterable of pd.DataFrame - chunks of tweets
+    topic_model: OnlineTopicModel - the model updated, e.g. OnlineTopicModel.load of the last checkpoint
+    column: str - column holding the texts
+    checkpoint: str - optional path the model is saved to
+    checkpoint_every: int - number of chunks between two checkpoints
+
+    Returns
+    -------
+    the updated model
+    """
+
+    chunks = 0
+    for df in dfs:
+        topic_model.update(df[column])
+        chunks += 1
+        if checkpoint is not None and chunks % checkpoint_every == 0:
+            topic_model.save(checkpoint)
+    if checkpoint is not None and chunks % checkpoint_every != 0:
+        topic_model.save(checkpoint)
+    return topic_model
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from entity_index import ENTITY_COLUMNS, EntityIndex
+
+# low cardinality columns filtered through their categorical codes
+CATEGORY_COLUMNS = ["place", "source", "lang", "language", "sentiment", "possibly_sensitive", "original_author"]
+
+
+class TweetFilter:
+    """
+    Filters a tweets dataframe on specific columns without scanning the others.
+
+    Categorical codes are computed once for the CATEGORY_COLUMNS and an inverted
+    index is built once for the ENTITY_COLUMNS, so every later filter is a table
+    lookup over small integer arrays instead of comparing every cell of the
+    frame like np.isin(df, values).any(axis=1) did.
+
+    Args:
+    -----
+    df: pd.DataFrame - tweets, from get_tweet_df, the processed csv or the database
+    entity_indexes: dict - prebuilt EntityIndex per entity column, e.g. from
+                           TweetDfExtractor.get_entity_indexes, built on first use otherwise
+    """
+
+    def __init__(self, df: pd.DataFrame, entity_indexes: dict = None):
+        self.df = df
+        self._categories = {column: pd.Categorical(df[column]) for column in CATEGORY_COLUMNS if column in df.columns}
+        self._indexes = dict(entity_indexes or {})
+
+    @property
+    def nbytes(self) -> int:
+        """memory held by the dataframe, its categorical codes and the entity indexes built so far"""
+        categories = sum(values.codes.nbytes + int(values.categories.memory_usage(deep=True))
+                         for values in self._categories.values())
+        return int(self.df.memory_usage(deep=True).sum()) + categories + sum(index.nbytes for index in self._indexes.values())
+
+    def _index(self, column: str) -> EntityIndex:
+        if column not in self._indexes:
+            self._indexes[column] = EntityIndex(self.df[column])
+        return self._indexes[column]
+
+    def column_mask(self, column: str, values: list) -> np.ndarray:
+        """
+        rows whose column equals one of values, or for an entity column
+        rows holding any of values
+        """
+        if column in ENTITY_COLUMNS:
+            return self._index(column).rows_with_any(values)
+        if column not in self._categories:
+            raise ValueError(f"can't filter on {column}")
+        categorical = self._categories[column]
+        wanted = np.zeros(len(categorical.categories) + 1, dtype=bool)
+        found = categorical.categories.get_indexer(list(values))
+        wanted[found[found >= 0]] = True
+        # missing values have code -1, which picks the always False last slot
+        return wanted[categorical.codes]
+
+    def mask(self, **filters) -> np.ndarray:
+        """
+        boolean mask of the rows matching every non empty filter,
+        e.g. mask(sentiment=["positive"], hashtags=["#covid19"])
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, values in filters.items():
+            if values is not None and len(values):
+                mask &= self.column_mask(column, values)
+        return mask
+
+    def filter(self, **filters) -> pd.DataFrame:
+        """
+        rows matching every non empty filter, with a fresh index
+        """
+        return self.df[self.mask(**filters)].reset_index(drop=True)
+
+    def options(self, column: str) -> list:
+        """
+        values a column can be filtered on, the most frequent first
+        """
+        if column in ENTITY_COLUMNS:
+            index = self._index(column)
+            return index.top(len(index)).index.tolist()
+        categorical = self._categories[column]
+        counts = np.bincount(categorical.codes[categorical.codes >= 0], minlength=len(categorical.categories))
+        return categorical.categories[np.argsort(-counts, kind="stable")].tolist()
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from tweet_storage import parse_created_at
+
+# low cardinality columns held as categoricals, sentiment with fixed categories so that every chunk agrees
+CATEGORY_COLUMNS = ["source", "lang", "sentiment", "possibly_sensitive", "place"]
+SENTIMENT_CATEGORIES = ["negative", "neutral", "positive"]
+# non negative counts, which fit in 32 bits
+COUNT_COLUMNS = ["favorite_count", "retweet_count", "followers_count", "friends_count", "statuses_count"]
+FLOAT_COLUMNS = ["polarity", "subjectivity"]
+
+
+def to_category(column: pd.Series) -> pd.Series:
+    if column.name == "sentiment":
+        return column.astype(pd.CategoricalDtype(SENTIMENT_CATEGORIES))
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    # missing values would otherwise turn the boolean possibly_sensitive column to object
+    return pd.Series(pd.Categorical(column.to_numpy(dtype=object)), index=column.index, name=column.name)
+
+
+def to_count(column: pd.Series) -> pd.Series:
+    column = pd.to_numeric(column)
+    return column.astype("UInt32" if column.hasnans else "uint32")
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    converts the columns of a tweets dataframe that are present to compact
+    dtypes: categoricals for the CATEGORY_COLUMNS, 32 bit unsigned integers for
+    the COUNT_COLUMNS (nullable when values are missing), float32 for polarity
+    and subjectivity and a tz-aware utc datetime for created_at
+    Args:
+    -----
+    df: pd.DataFrame - tweets from get_tweet_df or the processed csv
+
+    Returns
+    -------
+    the same dataframe, converted in place
+    """
+
+    if "created_at" in df.columns:
+        df["created_at"] = parse_created_at(df["created_at"])
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = to_category(df[column])
+    for column in COUNT_COLUMNS:
+        if column in df.columns:
+            df[column] = to_count(df[column])
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column]).astype(np.float32)
+
+    return df
+
+
+def concat_tweet_dfs(dfs: list) -> pd.DataFrame:
+    """
+    concatenates typed tweets dataframes, e.g. the chunks of stream_tweet_df,
+    merging the categories of every categorical column instead of falling back
+    to object columns like pd.concat does when the categories differ
+    """
+
+    dfs = [df.copy() for df in dfs]
+    if not dfs:
+        return pd.DataFrame()
+    for column in dfs[0].columns:
+        if isinstance(dfs[0][column].dtype, pd.CategoricalDtype):
+            # the categories get the same order and dtype as to_category gives the whole frame
+            values = np.concatenate([df[column].cat.categories.to_numpy(dtype=object) for df in dfs])
+            dtype = pd.CategoricalDtype(pd.Categorical(values).categories, ordered=dfs[0][column].cat.ordered)
+            for df in dfs:
+                df[column] = df[column].astype(dtype)
+
+    return pd.concat(dfs)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame, per_rows: int = 1_000_000) -> pd.DataFrame:
+    """
+    deep memory use per column of the same tweets before and after apply_schema
+    Args:
+    -----
+    before: pd.DataFrame - untyped tweets
+    after: pd.DataFrame - the same tweets, typed
+    per_rows: int - number of tweets the sizes are scaled to
+
+    Returns
+    -------
+    dataframe of dtype and MiB per column before and after, the reduction
+    factor, and a total row
+    """
+
+    scale = per_rows / max(len(before), 1) / 2 ** 20
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "mib_before": before.memory_usage(deep=True, index=False) * scale,
+        "mib_after": after.memory_usage(deep=True, index=False) * scale,
+    })
+    report.loc["total"] = ["", "", report["mib_before"].sum(), report["mib_after"].sum()]
+    report["reduction"] = report["mib_before"] / report["mib_after"]
+
+    return report
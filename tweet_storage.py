@@ -0,0 +1,153 @@
+import os
+import uuid
+
+import pandas as pd
+
+# format of created_at in the twitter api payloads, e.g. Fri Jun 18 17:55:49 +0000 2021
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+# low cardinality text columns stored dictionary encoded and read back as categoricals
+DICTIONARY_COLUMNS = ["source", "lang", "sentiment", "place"]
+# free text columns, stored as plain strings
+TEXT_COLUMNS = ["original_text", "clean_text", "original_author", "hashtags", "user_mentions"]
+PARTITION_COLUMN = "date"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("parquet storage needs pyarrow, install it with `pip install pyarrow`") from e
+    return pyarrow
+
+
+def parse_created_at(created_at: pd.Series) -> pd.Series:
+    """
+    converts created_at strings, either in the twitter api format or already
+    formatted by pandas, to tz-aware utc datetimes
+    """
+    if pd.api.types.is_datetime64_any_dtype(created_at):
+        return created_at.dt.tz_localize("UTC") if created_at.dt.tz is None else created_at.dt.tz_convert("UTC")
+    try:
+        return pd.to_datetime(created_at, format=TWITTER_TIME_FORMAT, utc=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(created_at, utc=True)
+
+
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    prepares a tweets dataframe for parquet: created_at becomes a utc
+    timestamp, the DICTIONARY_COLUMNS become categoricals and a date
+    column (YYYY-MM-DD) is added to partition on
+    """
+    df = df.copy()
+    df["created_at"] = parse_created_at(df["created_at"])
+    for column in DICTIONARY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    if "possibly_sensitive" in df.columns:
+        df["possibly_sensitive"] = df["possibly_sensitive"].astype(object).astype("boolean")
+    df[PARTITION_COLUMN] = df["created_at"].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def parquet_schema(df: pd.DataFrame):
+    """
+    arrow schema of a dataframe returned by to_columnar. the tweet columns get
+    fixed types, so every chunk of a dataset is written with the same schema
+    even when one of its columns is entirely missing and pandas read it as
+    float. other columns keep the type arrow infers from their dtype
+    """
+    # imported here since tweet_schema imports this module
+    from tweet_schema import COUNT_COLUMNS, FLOAT_COLUMNS
+
+    pa = _pyarrow()
+    types = {
+        "created_at": pa.timestamp("ns", tz="UTC"),
+        "possibly_sensitive": pa.bool_(),
+        PARTITION_COLUMN: pa.string(),
+        **{column: pa.string() for column in TEXT_COLUMNS},
+        **{column: pa.dictionary(pa.int32(), pa.string()) for column in DICTIONARY_COLUMNS},
+        **{column: pa.uint32() for column in COUNT_COLUMNS},
+        **{column: pa.float32() for column in FLOAT_COLUMNS},
+    }
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([pa.field(field.name, types.get(field.name, field.type)) for field in inferred])
+
+
+def write_parquet(df: pd.DataFrame, path: str, basename: str = None, schema=None) -> str:
+    """
+    writes tweets to a parquet dataset at path, partitioned by date in
+    hive style (path/date=2021-06-18/...). every call adds new files, so
+    chunks of a stream can be written one after the other
+    Args:
+    -----
+    df: pd.DataFrame - tweets as returned by get_tweet_df or the processed csv
+    path: str - directory of the dataset
+    basename: str - prefix of the file names, a random one by default. writing
+    again with the same basename replaces the files of the earlier write
+    schema: pyarrow.Schema - schema of the written table, parquet_schema of
+    the dataframe by default
+
+    Returns
+    -------
+    path of the dataset
+    """
+
+    pa = _pyarrow()
+    df = to_columnar(df)
+    table = pa.Table.from_pandas(df, schema=schema or parquet_schema(df), preserve_index=False)
+    pa.dataset.write_dataset(
+        table, path, format="parquet",
+        partitioning=pa.dataset.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"),
+        basename_template=f"{basename or 'part-' + uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=pa.dataset.ParquetFileFormat().make_write_options(
+            use_dictionary=[c for c in DICTIONARY_COLUMNS if c in table.column_names], compression="zstd"))
+    return path
+
+
+def read_parquet(path: str, columns: list = None, filters=None) -> pd.DataFrame:
+    """
+    reads a tweets parquet dataset, only the requested columns are read and
+    the filters are pushed down to skip whole date partitions and row groups
+    Args:
+    -----
+    path: str - directory of the dataset
+    columns: list - columns to read, None reads all of them
+    filters: list - pyarrow filters such as [("date", ">=", "2021-06-19"), ("lang", "==", "en")]
+
+    Returns
+    -------
+    dataframe
+    """
+
+    pa = _pyarrow()
+    partitioning = pa.dataset.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive")
+    table = pa.parquet.read_table(path, columns=columns, filters=filters, partitioning=partitioning)
+    return table.to_pandas()
+
+
+def read_tweets(path: str, columns: list = None, filters=None) -> pd.DataFrame:
+    """
+    reads processed tweets from a parquet dataset directory or a csv file.
+    filters are only supported for parquet
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        return read_parquet(path, columns, filters)
+    if filters is not None:
+        raise ValueError("filters need a parquet dataset")
+    return pd.read_csv(path, usecols=columns)
+
+
+def csv_to_parquet(csv_path: str, path: str, chunksize: int = 100000) -> str:
+    """
+    converts a processed tweets csv file to a parquet dataset chunk by chunk,
+    all written with the schema of the first chunk
+    """
+    schema = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        schema = schema or parquet_schema(to_columnar(chunk))
+        write_parquet(chunk, path, schema=schema)
+    return path